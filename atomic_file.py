@@ -0,0 +1,25 @@
+import json
+import os
+
+
+def write_json(path, data):
+    # 쓰는 도중에 종료되어도 이전 파일이 깨지지 않도록 임시 파일에 쓰고 디스크에 내린(fsync) 뒤 바꿔치기합니다.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    # 바꾼 이름도 전원이 나가기 전에 남도록 폴더도 fsync합니다. (윈도우는 폴더를 열 수 없으므로 건너뜀)
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
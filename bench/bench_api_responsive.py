@@ -0,0 +1,153 @@
+# 크롤링이 실행되는 동안 FastAPI 서버가 계속 응답하는지 확인합니다.
+#   python bench/bench_api_responsive.py [--latency 20] [--max-p99 100]
+# 재생 서버(bench/replay_server.py)를 상대로 목록을 받아 BeautifulSoup으로 파싱하는 블로킹 크롤링을
+#   1) 예전처럼 이벤트 루프 안에서 바로 실행하는 경우
+#   2) crawl_job.CrawlJobRunner의 스레드에서 실행하는 경우 (POST /crawl)
+# 로 나눠서, 그동안 GET /crawl 응답 시간의 p50/p99/최댓값을 잽니다.
+# 2)의 p99가 max-p99(ms)를 넘거나 취소가 동작하지 않으면 종료 코드 1을 돌려줍니다.
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import requests
+import uvicorn
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import load_manifest  # noqa: E402
+from crawl_job import CrawlJob, CrawlJobRunner, get_crawl_router  # noqa: E402
+from fetcher import HttpListingFetcher  # noqa: E402
+from listing_parser import SoupListingParser  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+
+
+def get_crawl(base):
+    # 다나와 크롤러처럼 요청 → 파싱을 페이지마다 반복하는 블로킹 함수
+    manifest = load_manifest()
+    parser = SoupListingParser()
+
+    def crawl(job):
+        for cate_name, entry in manifest.items():
+            fetcher = HttpListingFetcher(list_url=base + "/list/?cate=", ajax_url=base + "/ajax")
+            fetcher.open_category(entry["cate"])
+            job.update(category=cate_name, cat=entry["cate"], total_products=entry["total"])
+            for page in range(1, entry["pages"] + 1):
+                job.check_cancelled()
+                rows = parser.parse_products(fetcher.fetch_page(page))
+                job.update(page=page, products=job.products + len(rows))
+            fetcher.close()
+    return crawl
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def probe(url, running, interval=0.01):
+    # running()이 참인 동안 GET 요청을 보내고 응답 시간(ms)을 모읍니다.
+    latencies = []
+    with requests.Session() as session:
+        while running():
+            start = time.perf_counter()
+            session.get(url, timeout=60)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(interval)
+    return latencies
+
+
+def summary(latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return p99, (f"요청 {len(latencies)}회, p50 {statistics.median(latencies):7.1f}ms, "
+                 f"p99 {p99:7.1f}ms, 최대 {latencies[-1]:7.1f}ms")
+
+
+def run_inline(crawl):
+    # 예전 방식: async 함수 안에서 블로킹 크롤링을 그대로 실행
+    app = FastAPI()
+    done = threading.Event()
+
+    @app.get("/crawl")
+    async def status():
+        return {"done": done.is_set()}
+
+    @app.post("/crawl")
+    async def trigger():
+        crawl(CrawlJob(0))
+        done.set()
+        return {}
+
+    server, url = serve(app)
+    threading.Thread(target=requests.post, args=(url + "/crawl",), daemon=True).start()
+    time.sleep(0.05)
+    latencies = probe(url + "/crawl", lambda: not done.is_set())
+    server.should_exit = True
+    return latencies
+
+
+def run_with_runner(crawl):
+    app = FastAPI()
+    runner = CrawlJobRunner(crawl)
+    app.include_router(get_crawl_router(runner))
+    server, url = serve(app)
+    job = requests.post(url + "/crawl").json()
+    latencies = probe(url + "/crawl", lambda: runner.current is not None)
+    finished = requests.get(f"{url}/crawl/{job['id']}").json()
+
+    # 취소: 시작 직후 취소를 요청하면 다음 페이지 전에 멈춰야 합니다.
+    requests.post(url + "/crawl")
+    conflict = requests.post(url + "/crawl").status_code
+    requests.post(url + "/crawl/cancel")
+    while runner.current is not None:
+        time.sleep(0.01)
+    cancelled = requests.get(url + "/crawl").json()
+    runner.shutdown()
+    server.should_exit = True
+    return latencies, finished, conflict, cancelled
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=20, help="재생 서버 응답 지연 (ms)")
+    parser.add_argument("--max-p99", type=float, default=100, help="허용할 p99 응답 시간 (ms)")
+    args = parser.parse_args()
+
+    replay = ReplayServer(latency=args.latency / 1000)
+    crawl = get_crawl(replay.start())
+    try:
+        _, text = summary(run_inline(crawl))
+        print(f"이벤트 루프에서 실행: {text}")
+        latencies, finished, conflict, cancelled = run_with_runner(crawl)
+        p99, text = summary(latencies)
+        print(f"스레드에서 실행:     {text}")
+        print(f"크롤링 결과: {finished['state']}, 상품 {finished['products']}개, {finished['elapsed']}초")
+        print(f"실행 중 다시 시작: {conflict}, 취소 후 상태: {cancelled['state']} (페이지 {cancelled['page']})")
+    finally:
+        replay.stop()
+
+    failed = p99 > args.max_p99 or finished["state"] != "done" or conflict != 409 or cancelled["state"] != "cancelled"
+    if failed:
+        print("실패")
+        sys.exit(1)
+    print("통과")
+
+
+if __name__ == "__main__":
+    main()
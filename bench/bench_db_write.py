@@ -0,0 +1,104 @@
+# 행마다 MERGE ... FROM dual 방식과 스테이징 테이블 + MERGE 한 번 방식을 비교합니다.
+# 실제 Oracle 없이 왕복 횟수와 서버에서 실행되는 문장 수를 세는 가짜 커서를 사용합니다.
+#   python bench/bench_db_write.py [상품 수]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import script  # noqa: E402
+from bulk_writer import BulkMergeWriter  # noqa: E402
+from sinks import write_merge  # noqa: E402
+
+# 왕복 한 번, 서버에서 문장 한 번 실행하는 데 걸린다고 가정하는 시간 (초)
+ROUND_TRIP_COST = 0.002
+STATEMENT_COST = 0.00005
+
+
+class CountingCursor:
+    def __init__(self, stats):
+        self.stats = stats
+        self.rowcount = 0
+        self._result = None
+
+    def _round_trip(self, statements):
+        self.stats["round_trips"] += 1
+        self.stats["statements"] += statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def setinputsizes(self, *args, **kwargs):
+        pass
+
+    def execute(self, query, params=None):
+        self._round_trip(1)
+        if "COUNT(*)" in query:
+            self._result = (self.stats["existing"],)
+        self.rowcount = self.stats["staged"] if query.lstrip().startswith("MERGE") else 0
+
+    def executemany(self, query, values):
+        # MERGE ... FROM dual은 행마다 한 번씩 실행되고, INSERT는 배열 DML로 한 번에 실행됩니다.
+        per_row = query.lstrip().startswith("MERGE")
+        self._round_trip(len(values) if per_row else 1)
+        self.stats["staged"] += 0 if per_row else len(values)
+        self.rowcount = len(values)
+
+    def fetchone(self):
+        return self._result
+
+
+class CountingDB:
+    def __init__(self, existing=0):
+        self.stats = {"round_trips": 0, "statements": 0, "staged": 0, "existing": existing}
+
+    def cursor(self):
+        return CountingCursor(self.stats)
+
+    def execute_many(self, query, values_list):
+        cursor = self.cursor()
+        cursor.executemany(query, values_list)
+        return cursor.rowcount
+
+    def commit_transaction(self):
+        self.stats["round_trips"] += 1
+
+    def rollback_transaction(self):
+        pass
+
+
+def make_products(count):
+    return [
+        script.Product(f"제품 {i}", 100000 + i, f"https://prod.danawa.com/info/?pcode={i}")
+        for i in range(count)
+    ]
+
+
+def run(name, db, write, products):
+    start = time.perf_counter()
+    write(products)
+    elapsed = time.perf_counter() - start
+    stats = db.stats
+    estimated = stats["round_trips"] * ROUND_TRIP_COST + stats["statements"] * STATEMENT_COST
+    print(f"{name:>6}: 왕복 {stats['round_trips']:>6}회, 실행 문장 {stats['statements']:>7}개, "
+          f"파이썬 {elapsed * 1000:8.1f}ms, 예상 DB 시간 {estimated:8.2f}s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    products = make_products(count)
+
+    db = CountingDB()
+    run("merge", db, lambda rows: write_merge(db, 1, rows), products)
+
+    db = CountingDB(existing=count // 2)
+    writer = BulkMergeWriter(db, batch_size=script.db_batch_size)
+    run("bulk", db, lambda rows: writer.write(1, rows), products)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# CSV와 Parquet(압축 방식별) 파일의 쓰기 시간, 파일 크기, 읽기 시간을 비교합니다.
+#   python bench/bench_export.py [--scale 20] [--repeat 3]
+# bench/corpus의 상품을 scale배로 늘려서 씁니다. (실제 카테고리 하나가 수만 개 정도)
+# 읽기는 전체 행을 읽는 경우와 가격 열만 읽는 경우(분석에서 흔한 경우)를 따로 잽니다.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import load_manifest, read_page  # noqa: E402
+from listing_parser import LxmlListingParser  # noqa: E402
+from parquet_sink import ParquetSink, parquet_available  # noqa: E402
+from product import Product  # noqa: E402
+from sinks import CsvSink, read_csv_products  # noqa: E402
+
+if parquet_available():
+    import pyarrow.parquet as pq
+
+
+def load_products(scale):
+    parser = LxmlListingParser()
+    products = []
+    for cate_name, entry in load_manifest().items():
+        for page in range(1, entry["pages"] + 1):
+            for name, price, link in parser.parse_products(read_page(cate_name, page)):
+                if not link.startswith('/'):
+                    products.append(Product(name, price, link))
+    # 이름을 조금씩 바꿔서 늘립니다. (같은 행이 반복되면 압축률이 실제보다 좋게 나옴)
+    return [Product(f"{product.name} {copy}", product.price + copy, product.link)
+            for copy in range(scale) for product in products]
+
+
+def median(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def write_csv(path, products):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write("제품명,가격,링크\r\n")
+        sink = CsvSink(f)
+        sink.write(products)
+        sink.close()
+
+
+def write_parquet(path, products, compression):
+    sink = ParquetSink(path, "monitor", 1, datetime.now().replace(microsecond=0), compression)
+    sink.write(products)
+    sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    products = load_products(args.scale)
+    print(f"상품 {len(products)}개")
+    print(f"{'형식':>14} {'크기(KB)':>10} {'쓰기(ms)':>10} {'전체 읽기(ms)':>14} {'가격만(ms)':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "products.csv")
+        write_ms = median(lambda: write_csv(path, products), args.repeat) * 1000
+        read_ms = median(lambda: list(read_csv_products(path)), args.repeat) * 1000
+        # CSV는 한 열만 필요해도 줄 전체를 나눠야 합니다.
+        price_ms = median(lambda: [product.price for product in read_csv_products(path)], args.repeat) * 1000
+        print(f"{'csv':>14} {os.path.getsize(path) / 1024:10.0f} {write_ms:10.1f} {read_ms:14.1f} {price_ms:11.1f}")
+
+        if not parquet_available():
+            print("pyarrow가 설치되어 있지 않아 Parquet은 건너뜁니다.")
+            return
+        for compression in ("none", "snappy", "zstd", "gzip"):
+            path = os.path.join(directory, f"products.{compression}.parquet")
+            write_ms = median(lambda: write_parquet(path, products, compression), args.repeat) * 1000
+            read_ms = median(lambda: pq.read_table(path), args.repeat) * 1000
+            price_ms = median(lambda: pq.read_table(path, columns=["price"]), args.repeat) * 1000
+            print(f"{'parquet/' + compression:>14} {os.path.getsize(path) / 1024:10.0f} {write_ms:10.1f} "
+                  f"{read_ms:14.1f} {price_ms:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# 재생 서버에 오류를 섞어 보내면서 재시도/백오프/속도 조절/서킷 브레이커가 있을 때와 없을 때를 비교합니다.
+#   python bench/bench_fetch_policy.py [--latency 10] [--failure-rate 0.05] [--outage 1,3] [--rate 50]
+# 서버는 시작 후 outage 구간(초) 동안 모든 요청에 503을, 그 밖에는 failure-rate 확률로 503을 돌려줍니다.
+# 초마다 받은 페이지 수를 출력하므로 장애가 끝난 뒤 처리량이 다시 올라오는지 볼 수 있습니다.
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import script  # noqa: E402
+from corpus import load_manifest  # noqa: E402
+from fetch_policy import CircuitBreaker, FetchPolicy, RetryPolicy  # noqa: E402
+from fetcher import HttpListingFetcher  # noqa: E402
+from rate_limit import AdaptiveHostRateLimiter  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+
+
+class TimedFetcher(HttpListingFetcher):
+    # 페이지를 받은 시각을 기록합니다.
+    def __init__(self, times, **kwargs):
+        super().__init__(**kwargs)
+        self.times = times
+
+    def fetch_page(self, page):
+        html = super().fetch_page(page)
+        self.times.append(time.monotonic())
+        return html
+
+
+def run(manifest, args, policy):
+    server = ReplayServer(latency=args.latency / 1000, failure_rate=args.failure_rate, outage=args.outage)
+    base = server.start()
+    times = []
+    pages = 0
+    start = time.monotonic()
+    try:
+        for entry in manifest.values():
+            fetcher = TimedFetcher(times, list_url=base + "/list/?cate=", ajax_url=base + "/ajax", policy=policy)
+            with contextlib.redirect_stderr(io.StringIO()):
+                for _ in script.crawl_pages(fetcher, entry["cate"]):
+                    pages += 1
+            fetcher.close()
+    finally:
+        server.stop()
+    elapsed = time.monotonic() - start
+    timeline = [0] * (int(elapsed) + 1)
+    for t in times:
+        timeline[int(t - start)] += 1
+    return {"pages": pages, "elapsed": elapsed, "requests": server.requests, "failures": server.failures,
+            "timeline": timeline}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=10, help="응답 지연 (ms)")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--outage", default="1,3", help="모든 요청이 실패하는 구간 (시작초,끝초)")
+    parser.add_argument("--rate", type=float, default=50, help="호스트별 초당 요청 수")
+    args = parser.parse_args()
+    args.outage = tuple(float(value) for value in args.outage.split(",")) if args.outage else None
+
+    # 재시도/오류 로그는 결과만 보기 위해 숨깁니다.
+    logging.disable(logging.CRITICAL)
+    manifest = load_manifest()
+    expected = sum(entry["pages"] for entry in manifest.values())
+    policies = {
+        "정책 없음": None,
+        "정책 사용": FetchPolicy(
+            AdaptiveHostRateLimiter(args.rate, min_rate=args.rate / 10),
+            RetryPolicy(retries=6, base=0.1, cap=2.0),
+            lambda: CircuitBreaker(window=20, threshold=0.5, cooldown=0.5),
+        ),
+    }
+    for name, policy in policies.items():
+        result = run(manifest, args, policy)
+        print(f"{name}: {result['pages']}/{expected}페이지, {result['elapsed']:.2f}초, "
+              f"요청 {result['requests']}회 중 실패 {result['failures']}회")
+        print("  초당 페이지: " + " ".join(str(count) for count in result["timeline"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# 목록 파싱을 이 프로세스에서 할 때와 parse_pool.ParsePool(워커 수별)에 맡길 때의 처리량을 비교합니다.
+#   python bench/bench_parse_pool.py [--parser soup] [--repeat 4] [--padding 800] [--workers 1,2,4]
+# bench/corpus의 목록 페이지를 repeat번 반복해서 parse_ordered()로 흘려보내고 초당 페이지 수를 잽니다.
+# padding(KB)만큼 목록 밖의 HTML을 붙여서 Selenium page_source(약 1MB) 크기로 맞춥니다.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import load_manifest, read_page  # noqa: E402
+from listing_parser import get_parser  # noqa: E402
+from parse_pool import ParsePool  # noqa: E402
+
+
+def load_pages(repeat, padding):
+    unit = '<div class="prod_ad_banner"><script>var banner = {};</script><p>광고</p></div>'
+    filler = unit * (padding * 1024 // 2 // len(unit.encode("utf-8")))
+    pages = []
+    for cate_name, entry in load_manifest().items():
+        for page in range(1, entry["pages"] + 1):
+            pages.append(f"<html><body>{filler}{read_page(cate_name, page)}{filler}</body></html>")
+    return pages * repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parser", default="lxml")
+    parser.add_argument("--repeat", type=int, default=4)
+    parser.add_argument("--padding", type=int, default=800, help="페이지마다 붙일 목록 밖 HTML (KB)")
+    parser.add_argument("--workers", default=",".join(str(count) for count in (1, 2, 4, os.cpu_count()) if count <= os.cpu_count()))
+    args = parser.parse_args()
+
+    pages = load_pages(args.repeat, args.padding)
+    print(f"페이지 {len(pages)}개 (평균 {sum(map(len, pages)) / len(pages) / 1024:.0f}KB), CPU {os.cpu_count()}개, "
+          f"파서 {args.parser}")
+    listing_parser = get_parser(args.parser)
+    start = time.perf_counter()
+    expected = [listing_parser.parse_products(html) for html in pages]
+    baseline = len(pages) / (time.perf_counter() - start)
+    print(f"{'이 프로세스':>10}: 초당 {baseline:7.1f}페이지")
+
+    for workers in sorted({int(count) for count in args.workers.split(",")}):
+        pool = ParsePool(workers, args.parser)
+        try:
+            pool.parse("<html></html>")  # 워커 예열
+            start = time.perf_counter()
+            results = [rows for _, rows in pool.parse_ordered(enumerate(pages))]
+            rate = len(pages) / (time.perf_counter() - start)
+        finally:
+            pool.close()
+        assert results == expected, "파싱 결과나 순서가 다릅니다."
+        print(f"{f'워커 {workers}개':>10}: 초당 {rate:7.1f}페이지 ({rate / baseline:4.2f}배)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# 예전 Product(클래스 + __dict__, 제품명 해시, len 비교로 중복 확인)와
+# 지금 Product(NamedTuple, Deduper가 링크에서 pcode 키를 꺼내서 집합 포함 여부 한 번으로 중복 확인)를 비교합니다.
+#   python bench/bench_product.py [상품 수]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pipeline import Deduper  # noqa: E402
+from product import Product  # noqa: E402
+
+
+class LegacyProduct:
+    def __init__(self, name, price, link):
+        self.name = name
+        self.price = price
+        self.link = link
+
+    def __hash__(self):
+        return hash((self.name))
+
+    def __eq__(self, other):
+        if isinstance(other, LegacyProduct):
+            return self.name == other.name
+        return False
+
+
+def make_rows(count):
+    # 실제 목록처럼 150자 가까운 제품명과 pcode 링크, 약 10%의 중복을 만듭니다.
+    rows = []
+    for i in range(count):
+        n = i if i % 10 else i // 2
+        name = f"삼성전자 오디세이 G9 S49CG954 49인치 듀얼 QHD 240Hz 커브드 게이밍 모니터 {n:07d} " + "옵션" * 30
+        rows.append((name, 1000000 + n, f"https://prod.danawa.com/info/?pcode={10000000 + n}&cate=112757"))
+    return rows
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), result
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def legacy_dedup(products):
+    seen = set()
+    duplicate = 0
+    for product in products:
+        size_before = len(seen)
+        seen.add(product)
+        if size_before == len(seen):
+            duplicate += 1
+    return seen, duplicate
+
+
+def current_dedup(products):
+    deduper = Deduper()
+    for _ in deduper.filter(products):
+        pass
+    return deduper, deduper.duplicate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = make_rows(count)
+    for label, cls, dedup in (("legacy", LegacyProduct, legacy_dedup), ("current", Product, current_dedup)):
+        # 레코드 메모리: 이미 만들어 둔 문자열로 상품 count개를 만들 때 늘어나는 메모리 (객체 자체 + 리스트 칸)
+        # 중복 제거 상태: 예전 방식은 상품 객체(문자열 포함)를 집합에 계속 들고 있어야 하고,
+        # 지금 방식은 int 키만 남습니다. (스트리밍이라 상품 객체는 배치가 끝나면 버려짐)
+        size, products = measure_memory(lambda: [cls(*row) for row in rows])
+        built = min(timed(lambda: [cls(*row) for row in rows]) for _ in range(5))
+        elapsed = min(timed(lambda: dedup(products)) for _ in range(5))
+        state, duplicate = dedup(products)
+        if cls is LegacyProduct:
+            strings = sum(sys.getsizeof(value) for row in rows for value in row)
+            state_size = size + strings + sys.getsizeof(state)
+        else:
+            state_size = sys.getsizeof(state.keys) + sum(sys.getsizeof(key) for key in state.keys)
+        print(f"{label:>7}: 레코드 {size / count:6.1f} B/상품, 중복 제거 상태 {state_size / count:6.1f} B/상품 "
+              f"({state_size / 1024 / 1024:5.1f} MiB / {count}개), 생성 {count / built / 1000:7.1f}k 상품/s, "
+              f"중복 제거 {count / elapsed / 1000:7.1f}k 상품/s (중복 {duplicate}개)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# product_index.ProductIndex의 갱신/조회 속도를 잽니다. (결과가 전체를 훑은 결과와 같은지는 tests/test_product_index.py)
+#   python bench/bench_product_index.py [--scale 20] [--queries 200]
+# 비교 대상은 중복확인.py처럼 조회할 때마다 CSV를 다시 읽고 가격 순으로 정렬하는 방식입니다.
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_export import load_products, write_csv  # noqa: E402
+from pipeline import batched  # noqa: E402
+from product_index import ProductIndex, tokenize  # noqa: E402
+from sinks import read_csv_products  # noqa: E402
+
+
+def timed(func, count=1):
+    start = time.perf_counter()
+    for _ in range(count):
+        result = func()
+    return (time.perf_counter() - start) / count, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    # 늘린 상품은 링크(pcode)가 같으므로 pcode를 새로 붙입니다.
+    products = [product._replace(link=f"https://prod.danawa.com/info/?pcode={pcode}")
+                for pcode, product in enumerate(load_products(args.scale), 1)]
+    rng = random.Random(0)
+    print(f"상품 {len(products)}개")
+
+    # 페이지(90개)마다 갱신
+    index = ProductIndex()
+    index.begin("monitor")
+    pages = list(batched(products, 90))
+    elapsed, _ = timed(lambda: [index.update("monitor", page) for page in pages])
+    print(f"페이지별 갱신: 페이지당 {elapsed / len(pages) * 1000:.3f}ms ({len(pages)}페이지)")
+
+    # 가격이 바뀐 상품 1%를 다시 넣고, 다음 크롤링에서 5%가 빠진 경우
+    index.begin("monitor")
+    changed = [product._replace(price=product.price + 1000) if rng.random() < 0.01 else product
+               for product in products if rng.random() >= 0.05]
+    elapsed, _ = timed(lambda: [index.update("monitor", page) for page in batched(changed, 90)])
+    removed = index.finish("monitor")
+    print(f"다시 크롤링(가격 1% 변경): 페이지당 {elapsed / len(pages) * 1000:.3f}ms, 빠진 상품 {removed}개 삭제")
+    products = changed
+
+    ranges = []
+    for _ in range(args.queries):
+        low = rng.randrange(0, 1000000, 100)
+        ranges.append((low, low + rng.randrange(1000, 200000, 100)))
+    words = [word for product in products[:200] for word in tokenize(product.name)]
+    queries = [" ".join(word[:rng.randint(1, len(word))] for word in rng.sample(words, 2)) for _ in range(args.queries)]
+
+    elapsed, _ = timed(lambda: [index.by_price("monitor", low, high, offset=50, limit=50) for low, high in ranges])
+    print(f"가격 범위 + 페이지: 조회당 {elapsed / len(ranges) * 1e6:.1f}µs")
+    elapsed, _ = timed(lambda: [index.search(query, limit=50) for query in queries])
+    print(f"제품명 검색: 조회당 {elapsed / len(queries) * 1e6:.1f}µs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "products.csv")
+        write_csv(path, products)
+        elapsed, _ = timed(lambda: sorted(read_csv_products(path), key=lambda product: product.price), 3)
+    print(f"CSV 다시 읽고 정렬(기존 방식): 조회당 {elapsed * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
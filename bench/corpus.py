@@ -0,0 +1,155 @@
+# 벤치마크용 다나와 목록 페이지 모음(bench/corpus)을 만듭니다.
+#   python bench/corpus.py generate [페이지 수]   다나와 목록과 같은 구조의 합성 페이지를 만듦 (기본값)
+#   python bench/corpus.py record [페이지 수]     실제 다나와에서 받아서 저장 (네트워크 필요)
+# 카테고리마다 landing.html(목록 첫 화면)과 page_<n>.html(AJAX 응답)을 저장하고,
+# manifest.json에 카테고리 id, 전체 상품 수, 페이지 수를 남깁니다.
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fetcher import LIST_COUNT  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+# 카테고리마다 첫 번째 카테고리 id만 사용합니다.
+CATEGORIES = {
+    "monitor": 112757,
+    "keyboard": 112782,
+    "mouse": 112787,
+    "desk": 15240504,
+    "chair": 1523647,
+}
+
+BRANDS = ["삼성전자", "LG전자", "로지텍", "앱코", "한성컴퓨터", "레노버", "델", "시디즈", "데스커", "리바트"]
+WORDS = ["게이밍", "무선", "기계식", "저소음", "커브드", "QHD", "4K UHD", "IPS", "144Hz", "인체공학",
+         "높이조절", "블루투스", "RGB", "화이트", "블랙", "프리미엄", "사무용", "슬림", "대형", "컴팩트"]
+
+
+def product_item(rng, cate, index):
+    pcode = cate * 100000 + index
+    name = f"{rng.choice(BRANDS)} {' '.join(rng.sample(WORDS, 5))} {rng.randint(100, 9999)}"
+    price = rng.randrange(9900, 2000000, 100)
+    # 실제 목록처럼 광고 상품과 '/'로 시작하는 링크가 가끔 섞여 있습니다.
+    link = f"https://prod.danawa.com/info/?pcode={pcode}&cate={cate}"
+    if rng.random() < 0.02:
+        link = f"/info/?pcode={pcode}"
+    specs = " / ".join(f"{rng.choice(WORDS)}: {rng.randint(1, 99)}" for _ in range(12))
+    options = "".join(
+        f'<li class="rank_one"><p class="memory_sect"><span class="text">{rng.choice(WORDS)}</span></p>'
+        f'<p class="price_sect"><a href="https://prod.danawa.com/info/?pcode={pcode}&amp;opt={option}" target="_blank">'
+        f'<strong>{price + option * 5000:,}</strong>원</a></p></li>'
+        for option in range(rng.randint(1, 3)))
+    css = "prod_item prod_layer" + (" prod_ad_item" if rng.random() < 0.05 else "")
+    return (
+        f'<li class="{css}" id="productItem{pcode}">'
+        f'<div class="prod_main_info">'
+        f'<div class="thumb_image"><a href="{link}"><img src="//img.danawa.com/prod_img/500000/{pcode}_1.jpg'
+        f'?shrink=130:130" alt="{name}" width="130" height="130"></a></div>'
+        f'<div class="prod_info"><p class="prod_name"><a href="{link}" target="_blank" name="productName">{name}</a></p>'
+        f'<dl class="prod_spec_set"><dd><div class="spec_list">{specs}</div></dd></dl>'
+        f'<div class="prod_sub_info"><dl class="meta_item mt_date"><dd>2023.{rng.randint(1, 12):02d}.</dd></dl></div></div>'
+        f'<div class="prod_pricelist"><ul>{options}</ul></div>'
+        f'</div></li>'
+    )
+
+
+def product_list(rng, cate, page, total):
+    start = (page - 1) * LIST_COUNT
+    items = "".join(product_item(rng, cate, index) for index in range(start, min(start + LIST_COUNT, total)))
+    return (
+        f'<div class="main_prodlist main_prodlist_list"><ul class="product_list">{items}</ul></div>'
+        f'<div class="prod_num_nav"><div class="number_wrap"><a class="num now_on">{page}</a></div></div>'
+    )
+
+
+def landing_page(rng, cate, total):
+    hidden = "".join(
+        f'<input type="hidden" name="{name}" value="{value}">'
+        for name, value in [("listCategoryCode", cate), ("categoryCode", cate % 1000), ("physicsCate1", 860),
+                            ("physicsCate2", cate % 100), ("group", 11), ("depth", 2)])
+    return (
+        f'<html><head><title>다나와</title></head><body><div id="danawa_container">'
+        f'<div class="product_list_cover"><div><img src="//img.danawa.com/new/loading.gif"></div></div>{hidden}'
+        f'<div id="danawa_content"><div class="product_list_wrap"><div class="product_list_area">'
+        f'<div class="prod_list_tab"><ul><li class="tab_item selected"><a><span>전체</span>'
+        f'<strong class="list_num">({total:,})</strong></a></li></ul></div>'
+        f'{product_list(rng, cate, 1, total)}'
+        f'</div></div></div></div></body></html>'
+    )
+
+
+def save(cate_name, cate, landing, pages, total):
+    directory = os.path.join(CORPUS_DIR, cate_name)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "landing.html"), "w", encoding="utf-8") as f:
+        f.write(landing)
+    for page, html in enumerate(pages, start=1):
+        with open(os.path.join(directory, f"page_{page}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+    return {"cate": cate, "total": total, "pages": len(pages)}
+
+
+def generate(page_count):
+    # 항상 같은 페이지가 나오도록 시드를 고정합니다.
+    manifest = {}
+    for cate_name, cate in CATEGORIES.items():
+        rng = random.Random(cate)
+        total = page_count * LIST_COUNT
+        landing = landing_page(rng, cate, total)
+        pages = [product_list(random.Random(cate * 1000 + page), cate, page, total) for page in range(1, page_count + 1)]
+        manifest[cate_name] = save(cate_name, cate, landing, pages, total)
+    return manifest
+
+
+def record(page_count):
+    from fetcher import HttpListingFetcher
+    from listing_parser import get_parser
+
+    parser = get_parser("lxml")
+    fetcher = HttpListingFetcher()
+    manifest = {}
+    try:
+        for cate_name, cate in CATEGORIES.items():
+            landing = fetcher.open_category(cate)
+            total = parser.parse_total_products(landing)
+            pages = [fetcher.fetch_page(page) for page in range(1, page_count + 1)]
+            manifest[cate_name] = save(cate_name, cate, landing, pages, total)
+            print(f"{cate_name}: {len(pages)}페이지 저장")
+    finally:
+        fetcher.close()
+    return manifest
+
+
+def load_manifest():
+    path = os.path.join(CORPUS_DIR, "manifest.json")
+    if not os.path.exists(path):
+        # 모음이 없으면 합성 페이지로 만들어 둡니다.
+        return main(["generate"])
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_page(cate_name, page):
+    path = os.path.join(CORPUS_DIR, cate_name, "landing.html" if page == 0 else f"page_{page}.html")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def main(args):
+    mode = args[0] if args else "generate"
+    page_count = int(args[1]) if len(args) > 1 else 10
+    manifest = record(page_count) if mode == "record" else generate(page_count)
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"{CORPUS_DIR}에 {len(manifest)}개 카테고리를 저장했습니다.")
+    return manifest
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,137 @@
+# bench/corpus의 페이지를 다나와 대신 돌려주는 로컬 HTTP 서버입니다.
+#   python bench/replay_server.py [포트] [지연(ms)]
+# GET  /list/?cate=<id>  → landing.html
+# POST /ajax             → page_<page>.html (폼의 listCategoryCode, page 사용)
+# HttpListingFetcher(list_url=서버주소 + "/list/?cate=", ajax_url=서버주소 + "/ajax")로 연결합니다.
+# 실패 주입: failure_rate 확률로, 또는 서버 시작 후 outage=(시작초, 끝초) 동안 모든 요청에
+# failure_status(기본값 503)로 응답합니다. max_rps를 넘는 요청에는 429를 돌려줍니다.
+# 응답마다 본문 해시로 ETag를 붙이고, If-None-Match가 같으면 304(본문 없음)로 응답합니다.
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from corpus import load_manifest, read_page  # noqa: E402
+
+
+class ReplayServer:
+    # latency초(± jitter초)만큼 기다렸다가 응답합니다. requests에는 받은 요청 수, failures에는 실패로 응답한 수가 남습니다.
+    def __init__(self, latency=0.0, jitter=0.0, port=0, failure_rate=0.0, failure_status=503, outage=None,
+                 max_rps=0):
+        manifest = load_manifest()
+        self.names = {str(entry["cate"]): cate_name for cate_name, entry in manifest.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.outage = outage
+        self.max_rps = max_rps
+        self.requests = 0
+        self.failures = 0
+        self.not_modified = 0
+        self.started = time.monotonic()
+        self._recent = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve, daemon=True).start()
+        return self.base_url
+
+    def serve(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def delay(self):
+        # 지연 후, 실패로 응답해야 하면 상태 코드를 돌려줍니다. (정상이면 None)
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            self._recent = [t for t in self._recent if now - t < 1] + [now]
+            too_many = self.max_rps > 0 and len(self._recent) > self.max_rps
+        wait = self.latency + random.uniform(-self.jitter, self.jitter)
+        if wait > 0:
+            time.sleep(wait)
+        elapsed = now - self.started
+        status = None
+        if too_many:
+            status = 429
+        elif self.outage is not None and self.outage[0] <= elapsed < self.outage[1]:
+            status = self.failure_status
+        elif random.random() < self.failure_rate:
+            status = self.failure_status
+        if status is not None:
+            with self._lock:
+                self.failures += 1
+        return status
+
+    def page(self, cate, page):
+        cate_name = self.names.get(str(cate))
+        html = read_page(cate_name, page) if cate_name else None
+        # 모음에 없는 페이지는 빈 목록으로 돌려줍니다.
+        return html if html is not None else '<div class="main_prodlist"><ul class="product_list"></ul></div>'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body, status=None):
+                if status is not None:
+                    self.send_error(status)
+                    return
+                data = body.encode("utf-8")
+                etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+                status = server.delay()
+                self._send(server.page(query.get("cate", ["0"])[0], 0), status)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = urllib.parse.parse_qs(self.rfile.read(length).decode("utf-8"))
+                status = server.delay()
+                self._send(server.page(form["listCategoryCode"][0], int(form["page"][0])), status)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    server = ReplayServer(latency=latency, port=port)
+    print(f"{server.base_url}에서 bench/corpus를 제공합니다. (지연 {latency * 1000:.0f}ms)")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
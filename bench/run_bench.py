@@ -0,0 +1,263 @@
+# 크롤러의 주요 단계를 bench/corpus의 목록 페이지로 측정하고 bench/results/<커밋>.json에 저장합니다.
+# 다나와에 요청하지 않고, 크롤링 단계는 bench/replay_server.py를 상대로 측정합니다.
+#   python bench/run_bench.py [--repeat 5] [--latency 20] [--only parse_lxml,dedup]
+#   python bench/run_bench.py --compare bench/results/<이전 커밋>.json [--threshold 0.1]
+# --compare를 주면 이전 결과보다 threshold 이상 느려진 항목을 표시하고 종료 코드 1을 돌려줍니다.
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import script  # noqa: E402
+from bench_db_write import CountingDB  # noqa: E402
+from bulk_writer import BulkMergeWriter  # noqa: E402
+from corpus import load_manifest, read_page  # noqa: E402
+from fetcher import CachedListingFetcher, HttpListingFetcher  # noqa: E402
+from listing_parser import LxmlListingParser, SoupListingParser  # noqa: E402
+from page_cache import PageCache  # noqa: E402
+from parquet_sink import ParquetSink, parquet_available  # noqa: E402
+from pipeline import Deduper  # noqa: E402
+from product import Product  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+from sinks import CsvSink, write_merge  # noqa: E402
+from sqlite_db import SqliteDB, write_upsert  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SUITES = {}
+
+
+def suite(name):
+    # 준비 함수(corpus) → (측정할 함수, 처리 개수)를 등록합니다.
+    def register(prepare):
+        SUITES[name] = prepare
+        return prepare
+    return register
+
+
+class Corpus:
+    def __init__(self):
+        self.manifest = load_manifest()
+        self.pages = []
+        for cate_name, entry in self.manifest.items():
+            for page in range(1, entry["pages"] + 1):
+                self.pages.append(read_page(cate_name, page))
+        self.rows = [row for html in self.pages for row in LxmlListingParser().parse_products(html)]
+        self.products = [Product(*row) for row in self.rows if not row[2].startswith('/')]
+
+
+@suite("parse_soup")
+def parse_soup(corpus):
+    parser = SoupListingParser()
+    return lambda: [parser.parse_products(html) for html in corpus.pages], len(corpus.rows)
+
+
+@suite("parse_lxml")
+def parse_lxml(corpus):
+    parser = LxmlListingParser()
+    return lambda: [parser.parse_products(html) for html in corpus.pages], len(corpus.rows)
+
+
+@suite("product")
+def product(corpus):
+    return lambda: [Product(*row) for row in corpus.rows], len(corpus.rows)
+
+
+@suite("dedup")
+def dedup(corpus):
+    # 같은 상품이 두 번씩 나오는 경우 (절반은 중복)
+    products = corpus.products + corpus.products
+    return lambda: list(Deduper().filter(products)), len(products)
+
+
+@suite("csv")
+def csv_write(corpus):
+    def run():
+        with tempfile.TemporaryFile("w", encoding="utf-8-sig", newline="") as f:
+            sink = CsvSink(f)
+            sink.write(corpus.products)
+            sink.close()
+    return run, len(corpus.products)
+
+
+@suite("parquet")
+def parquet_write(corpus):
+    if not parquet_available():
+        return lambda: None, 0
+
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            sink = ParquetSink(os.path.join(directory, "bench.parquet"), "bench", 1, datetime.now())
+            sink.write(corpus.products)
+            sink.close()
+    return run, len(corpus.products)
+
+
+@suite("db_sqlite")
+def db_sqlite(corpus):
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            db = SqliteDB(os.path.join(directory, "bench.db"))
+            db.start()
+            write_upsert(db, 1, corpus.products)
+            db.stop()
+    return run, len(corpus.products)
+
+
+@suite("db_merge")
+def db_merge(corpus):
+    # 실제 Oracle 대신 왕복 횟수만 세는 가짜 DB (파이썬 쪽 비용만 측정)
+    return lambda: write_merge(CountingDB(), 1, corpus.products), len(corpus.products)
+
+
+@suite("db_bulk")
+def db_bulk(corpus):
+    return lambda: BulkMergeWriter(CountingDB(), script.db_batch_size).write(1, corpus.products), len(corpus.products)
+
+
+@suite("crawl")
+def crawl(corpus, latency=0.02):
+    # 재생 서버를 상대로 카테고리마다 crawl_pages를 끝까지 실행합니다. (페이지 수 × 지연이 대부분)
+    def run():
+        server = ReplayServer(latency=latency)
+        base = server.start()
+        try:
+            for entry in corpus.manifest.values():
+                fetcher = HttpListingFetcher(list_url=base + "/list/?cate=", ajax_url=base + "/ajax")
+                with contextlib.redirect_stderr(io.StringIO()):
+                    for _ in script.crawl_pages(fetcher, entry["cate"]):
+                        pass
+                fetcher.close()
+        finally:
+            server.stop()
+    return run, len(corpus.products)
+
+
+@suite("crawl_replay")
+def crawl_replay(corpus):
+    # 재생 서버에서 한 번 받아 페이지 캐시에 저장해두고, 네트워크 없이 캐시만으로 crawl_pages를 실행합니다.
+    # (crawl과의 차이가 네트워크 대기 시간, 나머지가 파싱 등 크롤러 자체 비용)
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    cache = PageCache(directory)
+    server = ReplayServer()
+    base = server.start()
+    try:
+        for entry in corpus.manifest.values():
+            fetcher = HttpListingFetcher(list_url=base + "/list/?cate=", ajax_url=base + "/ajax", cache=cache)
+            with contextlib.redirect_stderr(io.StringIO()):
+                for _ in script.crawl_pages(fetcher, entry["cate"]):
+                    pass
+            fetcher.close()
+    finally:
+        server.stop()
+
+    def run():
+        for entry in corpus.manifest.values():
+            with contextlib.redirect_stderr(io.StringIO()):
+                for _ in script.crawl_pages(CachedListingFetcher(cache), entry["cate"]):
+                    pass
+    return run, len(corpus.products)
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def get_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n{baseline['commit']} 대비")
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else 1.0
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  <-- 느려짐"
+            regressions.append(name)
+        print(f"{name:>12}: {before['median_ms']:9.2f}ms → {result['median_ms']:9.2f}ms ({ratio:5.2f}배){mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=20, help="재생 서버 응답 지연 (ms)")
+    parser.add_argument("--only", default="", help="쉼표로 구분한 측정 항목")
+    parser.add_argument("--compare", help="비교할 이전 결과 파일")
+    parser.add_argument("--threshold", type=float, default=0.1, help="느려졌다고 볼 비율 (0.1 = 10%%)")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    corpus = Corpus()
+    print(f"목록 페이지 {len(corpus.pages)}개, 상품 {len(corpus.rows)}개")
+    names = [name for name in args.only.split(",") if name] or list(SUITES)
+    results = {}
+    for name in names:
+        prepare = SUITES[name]
+        func, count = prepare(corpus, args.latency / 1000) if name == "crawl" else prepare(corpus)
+        func()  # 예열
+        times = measure(func, args.repeat)
+        median = statistics.median(times)
+        results[name] = {
+            "median_ms": round(median * 1000, 3),
+            "min_ms": round(min(times) * 1000, 3),
+            "items": count,
+            "per_item_us": round(median / count * 1e6, 3) if count else 0.0,
+        }
+        print(f"{name:>12}: 중앙값 {median * 1000:9.2f}ms, 최소 {min(times) * 1000:9.2f}ms, "
+              f"항목당 {results[name]['per_item_us']:8.2f}µs ({count}개)")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = get_commit()
+        path = os.path.join(RESULTS_DIR, f"{commit}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": commit,
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "repeat": args.repeat,
+                "latency_ms": args.latency,
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n결과를 {path}에 저장했습니다.")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from atomic_file import write_json
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.json")
+CATALOG_STATE_PATH = os.path.join("data", "catalog_state.json")
+
+# name          : 카테고리 이름 (CSV/Parquet 파일 이름, API의 category)
+# ids           : 다나와 카테고리 id 목록 (이 순서대로 크롤링하고 먼저 나온 상품이 남음)
+# priority      : 클수록 먼저 크롤링
+# refresh_hours : 마지막 크롤링 후 이 시간이 지나야 다시 크롤링 대상(due)이 됨
+# concurrency   : 카테고리 id 하나에서 동시에 요청할 페이지 수 (None이면 PAGE_CONCURRENCY)
+# db_name       : EQUIPMENTS_CATE.EQUIP_CATE_NM (대소문자 무시)
+# fetch         : 이 카테고리만 다르게 쓸 요청 설정 (없으면 None, rate는 카테고리 id마다 초당 요청 수)
+#                 {"retries": 6, "backoff_base": 1, "backoff_cap": 60, "rate": 2} 중 필요한 것만
+Category = namedtuple("Category", ["name", "ids", "priority", "refresh_hours", "concurrency", "db_name", "fetch"])
+
+
+class Catalog:
+    # categories.json에서 읽은 크롤링 대상 카테고리 목록입니다. 우선순위가 높은 순서로 들고 있습니다.
+    # (우선순위가 같으면 파일에 적힌 순서)
+    # 카테고리 번호(EQUIP_CATE_NO)는 코드에서 세지 않고 EQUIPMENTS_CATE에서 이름으로 찾아 한 번만 읽어둡니다.
+    # 카테고리마다 마지막으로 크롤링을 마친 시각을 state_path에 남겨서, 갱신 주기가 지난 카테고리만 고를 수 있습니다.
+    def __init__(self, categories, state_path=CATALOG_STATE_PATH):
+        self.categories = sorted(categories, key=lambda category: -category.priority)
+        self.state_path = state_path
+        self._numbers = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH, state_path=CATALOG_STATE_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        categories = []
+        for name, entry in data.items():
+            concurrency = entry.get("concurrency")
+            categories.append(Category(
+                name,
+                [int(cat) for cat in entry["ids"]],
+                int(entry.get("priority", 0)),
+                float(entry.get("refresh_hours", 24)),
+                int(concurrency) if concurrency is not None else None,
+                entry.get("db_name", name),
+                entry.get("fetch"),
+            ))
+        return cls(categories, state_path)
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def get(self, name):
+        for category in self.categories:
+            if category.name == name:
+                return category
+        return None
+
+    def select(self, names=None):
+        # names에 있는 카테고리만 우선순위 순서로 돌려줍니다. (None이면 전부)
+        if names is None:
+            return list(self.categories)
+        unknown = set(names) - {category.name for category in self.categories}
+        if unknown:
+            raise ValueError(f"카탈로그에 없는 카테고리입니다: {', '.join(sorted(unknown))}")
+        return [category for category in self.categories if category.name in names]
+
+    def fetch_overrides(self):
+        # FetchPolicy의 overrides: 카테고리 id(문자열) → 그 카테고리의 fetch 설정
+        return {str(cat): category.fetch for category in self.categories if category.fetch for cat in category.ids}
+
+    def numbers(self, db):
+        # 카테고리 이름 → EQUIP_CATE_NO. 처음 부를 때만 DB에서 읽습니다.
+        # EQUIPMENTS_CATE에 없는 카테고리는 빠지므로, 부르는 쪽에서 저장하지 않고 건너뜁니다.
+        with self._lock:
+            if self._numbers is None:
+                rows = db.execute_query("SELECT EQUIP_CATE_NO, EQUIP_CATE_NM FROM EQUIPMENTS_CATE")
+                by_name = {str(cate_name).lower(): int(cate_no) for cate_no, cate_name in rows}
+                numbers = {}
+                for category in self.categories:
+                    cate_no = by_name.get(category.db_name.lower())
+                    if cate_no is None:
+                        logging.error(f"EQUIPMENTS_CATE에 {category.db_name} 카테고리가 없어 {category.name}은(는) 건너뜁니다.")
+                        continue
+                    numbers[category.name] = cate_no
+                logging.info(f"카테고리 번호: {numbers}")
+                self._numbers = numbers
+            return self._numbers
+
+    def last_crawled(self):
+        # 카테고리 이름 → 마지막으로 크롤링을 마친 시각 (time.time())
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def due(self, now=None):
+        # 갱신 주기가 지난 카테고리를 우선순위 순서로 돌려줍니다. (한 번도 크롤링하지 않은 카테고리 포함)
+        now = time.time() if now is None else now
+        last_crawled = self.last_crawled()
+        return [category for category in self.categories
+                if now - last_crawled.get(category.name, 0) >= category.refresh_hours * 60 * 60]
+
+    def mark_crawled(self, name, crawled_at=None):
+        with self._lock:
+            state = self.last_crawled()
+            state[name] = time.time() if crawled_at is None else crawled_at
+            write_json(self.state_path, state)
@@ -0,0 +1,14 @@
+def diff_products(products, snapshot):
+    # DB에 저장된 값(snapshot)과 비교해서 새 상품과 가격/링크가 바뀐 상품만 골라냅니다.
+    new = []
+    changed = []
+    unchanged = 0
+    for product in products:
+        stored = snapshot.items.get(product.name)
+        if stored is None:
+            new.append(product)
+        elif stored != (int(product.price), product.link):
+            changed.append(product)
+        else:
+            unchanged += 1
+    return new, changed, unchanged
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+
+from atomic_file import write_json
+
+CHECKPOINT_PATH = os.path.join("data", "checkpoint.json")
+EMPTY_DIGEST = hashlib.sha256().hexdigest()
+
+
+class Checkpoint:
+    # 배치가 커밋될 때마다 진행 위치를 파일에 남겨서, 중단된 크롤링을 이어서 할 수 있게 합니다.
+    #   done       : 끝난 카테고리 이름
+    #   category   : 진행 중인 카테고리 이름
+    #   ids        : 진행 중인 카테고리를 시작할 때의 카테고리 id 목록 (categories.json이 바뀌었는지 확인용)
+    #   cat, page  : 진행 중인 카테고리에서 마지막으로 커밋된 카테고리 id와 페이지
+    #   csv_offset : 마지막 커밋 시점의 CSV 파일 크기 (이후에 쓰인 줄은 이어서 할 때 잘라냄)
+    #   keys, digest : 중복 제거 키 개수와 그 키들의 sha256 (키는 .keys 파일에 8바이트씩 이어서 기록)
+    def __init__(self, path=CHECKPOINT_PATH, state=None):
+        self.path = path
+        self.keys_path = os.path.splitext(path)[0] + ".keys"
+        self.state = state if state is not None else {
+            "done": [], "category": None, "ids": None, "cat": None, "page": 0, "csv_offset": 0, "keys": 0, "digest": EMPTY_DIGEST,
+        }
+        self._digest = hashlib.sha256()
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_PATH):
+        if not os.path.exists(path):
+            logging.info("체크포인트가 없어 처음부터 크롤링합니다.")
+            return cls(path)
+        with open(path, encoding="utf-8") as f:
+            checkpoint = cls(path, json.load(f))
+        logging.info(f"체크포인트에서 이어서 크롤링합니다. {checkpoint.state}")
+        return checkpoint
+
+    def clear(self):
+        for path in (self.path, self.keys_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def is_done(self, cate_name):
+        return cate_name in self.state["done"]
+
+    def is_current(self, cate_name):
+        return self.state["category"] == cate_name
+
+    def check_catalog(self, category_ids):
+        # category_ids = {카테고리 이름: 카테고리 id 목록}. 이어서 하기 전에 categories.json이 바뀌어서
+        # 진행 중이던 카테고리가 없어졌거나 id 목록이 달라졌으면, 그 카테고리는 1페이지부터 다시 크롤링합니다.
+        cate_name = self.state["category"]
+        if cate_name is None or self.state["cat"] is None:
+            return
+        ids = category_ids.get(cate_name)
+        recorded = self.state.get("ids")
+        if ids is not None and (ids == recorded if recorded is not None else self.state["cat"] in ids):
+            return
+        logging.warning(f"카탈로그에서 {cate_name} 카테고리의 id가 바뀌어 처음부터 다시 크롤링합니다.")
+        self._reset(None)
+
+    def start_page(self, cate_name, category, cat):
+        # 진행 중이던 카테고리라면, 마지막으로 커밋된 카테고리 id 앞의 id들은 건너뛰고(None)
+        # 그 id는 다음 페이지부터 시작합니다.
+        if not self.is_current(cate_name) or self.state["cat"] is None:
+            return 1
+        position = category.index(self.state["cat"])
+        index = category.index(cat)
+        if index < position:
+            return None
+        if index == position:
+            return self.state["page"] + 1
+        return 1
+
+    def load_keys(self):
+        # 커밋된 개수만큼만 키를 읽고, 그 뒤에 쓰인 키는 잘라냅니다.
+        count = self.state["keys"]
+        if not os.path.exists(self.keys_path):
+            return []
+        with open(self.keys_path, "r+b") as f:
+            data = f.read(count * 8)
+            f.truncate(count * 8)
+        self._digest = hashlib.sha256(data)
+        if self._digest.hexdigest() != self.state["digest"]:
+            raise ValueError("체크포인트의 중복 제거 키가 손상되었습니다.")
+        return [int.from_bytes(data[i:i + 8], "big") for i in range(0, len(data), 8)]
+
+    def begin_category(self, cate_name, ids=None):
+        if self.is_current(cate_name):
+            return
+        self._reset(cate_name, ids)
+
+    def _reset(self, cate_name, ids=None):
+        self.state.update({"category": cate_name, "ids": ids, "cat": None, "page": 0, "csv_offset": 0, "keys": 0,
+                           "digest": EMPTY_DIGEST})
+        self._digest = hashlib.sha256()
+        if os.path.exists(self.keys_path):
+            os.remove(self.keys_path)
+        self._save()
+
+    def commit(self, cat, page, csv_offset, new_keys):
+        data = b"".join(key.to_bytes(8, "big") for key in new_keys)
+        os.makedirs(os.path.dirname(self.keys_path) or ".", exist_ok=True)
+        with open(self.keys_path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._digest.update(data)
+        self.state.update({
+            "cat": cat, "page": page, "csv_offset": csv_offset,
+            "keys": self.state["keys"] + len(new_keys), "digest": self._digest.hexdigest(),
+        })
+        self._save()
+
+    def finish_category(self, cate_name):
+        self.state["done"].append(cate_name)
+        self._reset(None)
+
+    def _save(self):
+        write_json(self.path, self.state)
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import APIRouter, HTTPException, Query
+
+
+class CrawlCancelled(Exception):
+    pass
+
+
+class CrawlJob:
+    # 크롤링 한 번의 상태와 진행 상황입니다.
+    #   state : pending → running → done / failed / cancelled
+    # 크롤링 함수는 페이지마다 update()로 진행 상황을 남기고 check_cancelled()로 취소 요청을 확인합니다.
+    # categories는 이번에 크롤링할 카테고리 이름 목록입니다. (None이면 전체)
+    def __init__(self, job_id, categories=None):
+        self.id = job_id
+        self.categories = categories
+        self.state = "pending"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.category = None
+        self.cat = None
+        self.page = 0
+        self.total_products = 0
+        self.products = 0
+        self.error = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, **progress):
+        with self._lock:
+            for name, value in progress.items():
+                setattr(self, name, value)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise CrawlCancelled(f"{self.id}번 크롤링이 취소되었습니다.")
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "state": self.state,
+                "categories": self.categories,
+                "cancel_requested": self.cancel_requested,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else 0.0,
+                "category": self.category,
+                "cat": self.cat,
+                "page": self.page,
+                "total_products": self.total_products,
+                "products": self.products,
+                "error": self.error,
+            }
+
+
+class CrawlJobRunner:
+    # 크롤링(crawl(job), 블로킹 함수)을 이벤트 루프 밖의 스레드에서 실행합니다.
+    # Selenium 드라이버와 DB 연결은 프로세스 안에서 공유하므로 프로세스 풀이 아닌 스레드 하나를 씁니다.
+    # 한 번에 하나의 크롤링만 실행하고, 최근 max_history개의 작업 상태를 남겨둡니다.
+    def __init__(self, crawl, max_history=20):
+        self.crawl = crawl
+        self.max_history = max_history
+        self.jobs = OrderedDict()
+        self.current = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl")
+
+    def start(self, categories=None):
+        # 새 크롤링을 시작하고 작업을 돌려줍니다. 이미 실행 중이면 None
+        with self._lock:
+            if self.current is not None:
+                return None
+            job = CrawlJob(self._next_id, categories)
+            self._next_id += 1
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.max_history:
+                self.jobs.popitem(last=False)
+            self.current = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        job.update(state="running", started_at=time.time())
+        try:
+            self.crawl(job)
+            job.update(state="cancelled" if job.cancel_requested else "done")
+        except CrawlCancelled:
+            job.update(state="cancelled")
+        except Exception as e:
+            logging.exception("크롤링 중 오류가 발생했습니다.")
+            job.update(state="failed", error=str(e))
+        finally:
+            job.update(finished_at=time.time())
+            with self._lock:
+                self.current = None
+            logging.info(f"{job.id}번 크롤링 종료: {job.state}")
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def latest(self):
+        with self._lock:
+            return next(reversed(self.jobs.values()), None)
+
+    def cancel(self):
+        # 실행 중인 크롤링에 취소를 요청합니다. 다음 페이지를 읽기 전에 멈춥니다.
+        with self._lock:
+            job = self.current
+        if job is not None:
+            job.cancel()
+        return job
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=True)
+
+
+def get_crawl_router(runner, catalog=None):
+    # POST /crawl        크롤링 시작 (이미 실행 중이면 409, ?category=monitor&category=chair로 일부만)
+    # GET  /crawl        마지막 크롤링 상태
+    # GET  /crawl/{id}   해당 크롤링 상태
+    # POST /crawl/cancel 실행 중인 크롤링 취소
+    # 상태만 읽고 쓰므로 이벤트 루프에서 바로 처리합니다. (크롤링 자체는 runner의 스레드에서 실행)
+    # catalog가 있으면 카탈로그에 없는 category는 크롤링을 시작하기 전에 422로 거절합니다.
+    router = APIRouter(prefix="/crawl")
+
+    @router.post("", status_code=202)
+    async def trigger_crawl(category: list[str] | None = Query(None)):
+        if catalog is not None and category is not None:
+            try:
+                catalog.select(category)
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+        job = runner.start(category)
+        if job is None:
+            raise HTTPException(status_code=409, detail="이미 크롤링이 실행 중입니다.")
+        return job.to_dict()
+
+    @router.get("")
+    async def latest_crawl():
+        job = runner.latest()
+        if job is None:
+            raise HTTPException(status_code=404, detail="아직 실행한 크롤링이 없습니다.")
+        return job.to_dict()
+
+    @router.post("/cancel")
+    async def cancel_crawl():
+        job = runner.cancel()
+        if job is None:
+            raise HTTPException(status_code=409, detail="실행 중인 크롤링이 없습니다.")
+        return job.to_dict()
+
+    @router.get("/{job_id}")
+    async def get_crawl(job_id: int):
+        job = runner.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"{job_id}번 크롤링이 없습니다.")
+        return job.to_dict()
+
+    return router
@@ -3,8 +3,6 @@ from fastapi import FastAPI
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.select import Select
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 import uvicorn
@@ -12,10 +10,18 @@ import csv
 import re
 import oracledb
 import math
+import os
 import time
 from crawler_config import DATABASE_CONFIG
+from catalog import Catalog
+from crawl_job import CrawlCancelled, CrawlJobRunner, get_crawl_router
+from product_index import ProductIndex, get_product_router
+from listing_parser import get_parser
+from parse_pool import ParsePool
+from driver_pool import DriverPool, block_resources, get_blocked_urls
+from fetcher import mark_list_stale, wait_list_ready
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 app = FastAPI()
 
 scheduler = AsyncIOScheduler()
@@ -96,6 +102,21 @@ class OracleDB:
 
 oracle_db = OracleDB()
 
+# 크롤링할 카테고리(categories.json)와 다나와 카테고리 id. 카테고리 번호는 EQUIPMENTS_CATE에서 이름으로 찾습니다.
+catalog = Catalog.load()
+# 갱신 주기(refresh_hours)가 지난 카테고리가 있는지 확인하는 간격(분)
+catalog_check_minutes = float(os.getenv("CATALOG_CHECK_MINUTES", "30"))
+
+# 목록 HTML 파서: "lxml"(기본값) 또는 "soup"(BeautifulSoup 기준 구현). 파싱 프로세스도 같은 파서를 씁니다.
+listing_parser = get_parser(os.getenv("LISTING_PARSER", "lxml"))
+# 목록 파싱을 맡을 프로세스 수. 풀은 서버가 켜질 때 만듭니다. (워커 프로세스가 이 모듈을 다시 읽으므로)
+# 0(기본값, script.py와 같음)이면 풀 없이 크롤링 스레드에서 바로 파싱합니다.
+parse_workers = int(os.getenv("PARSE_WORKERS", "0"))
+parse_pool = None
+
+# API로 보여줄 최근 크롤링 결과. 크롤링 중에는 페이지마다 바로 반영합니다.
+product_index = ProductIndex()
+
 
 class Product:
     def __init__(self, name, price, link):
@@ -119,8 +140,15 @@ def get_webdriver():
     options = Options()
     options.add_argument('--headless')
 
-    return webdriver.Chrome("driver\\chromedriver.exe", options=options)
+    driver = webdriver.Chrome("driver\\chromedriver.exe", options=options)
     # return webdriver.Chrome("driver\\chromedriver.exe")
+    # 상품 이미지, 폰트는 받지 않습니다.
+    block_resources(driver, get_blocked_urls("images,fonts"))
+    return driver
+
+
+# 매일 크롤링할 때마다 크롬을 새로 띄우지 않도록 서버가 떠 있는 동안 브라우저를 살려둡니다.
+driver_pool = DriverPool(get_webdriver, 1)
 
 
 def get_product_info(product):
@@ -181,118 +209,209 @@ def write_product_info(CAT, file, products):
         # print(f"링크: {product.link}\n")
 
 
-def crawl_products(driver, products):
+def crawl_products(pooled, products, job, cate_name):
+    driver = pooled.driver
     page = 1
     total_products = 0
     start_with_slash = 0
     duplicate = 0
     while True:
+        # 취소 요청이 있으면 다음 페이지를 읽기 전에 멈춥니다.
+        job.check_cancelled()
         try:
-            wait = WebDriverWait(driver, 100)
-            # 로딩 스피너가 안보이는 상태가 될때까지 대기.(정상적인 데이터들을 가져올 확률이 가장 높았음)
-            wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, '#danawa_container > div.product_list_cover > div > img')))
+            start = time.perf_counter()
+            # 이번 페이지의 새 상품 목록이 DOM에 들어올 때까지 대기 (MutationObserver로 바로 감지)
+            wait_list_ready(driver, page)
             # wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.main_prodlist > ul.product_list > li.prod_item')))
             # time.sleep(1)
             # wait.until(EC.element_to_be_clickable(driver.find_element(By.CSS_SELECTOR, '#productItem13640762 > div')))
             # wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/div[2]/div[2]/div[5]/div[2]/div[7]/div[2]/div[2]/div[3]/ul/li[1]/div')))
             # time.sleep(3)
             new_html = driver.page_source
-            new_soup = BeautifulSoup(new_html, 'html.parser')
+            driver_pool.record_page(pooled, time.perf_counter() - start)
             if(total_products == 0):
+                new_soup = BeautifulSoup(new_html, 'html.parser')
                 total_products = int(remove_comma(new_soup.select_one('#danawa_content > div.product_list_wrap > div.product_list_area > div.prod_list_tab > ul > li.tab_item.selected > a > strong.list_num').text.strip()))
                 # 현재 카테고리의 총 제품 개수는 total_page에 저장되어 있음
                 print("총 상품 개수는 "+str(total_products)+"개 입니다.")
             print(f"현재 페이지: {page}")
-            select_elements = new_soup.select('div.main_prodlist > ul.product_list > li.prod_item > div.prod_main_info')
-            # 페이지에 '다음 페이지' 링크가 없고, select_element의 크기가 1이하라면 크롤링 종료
-            next_page_link = new_soup.select_one('a.edge_nav.nav_next')
+            job.update(page=page, total_products=total_products)
+            # 상품 목록 파싱은 파싱 프로세스에 맡기고, 그동안 브라우저는 다음 페이지를 불러옵니다.
+            if parse_pool is not None:
+                parsed = parse_pool.submit(new_html)
+            else:
+                parsed = None
+                rows = listing_parser.parse_products(new_html)
             # if next_page_link is None and math.ceil(total_products/90) == page:
-            if math.ceil(total_products/90) == page:
-                break
-            # print(len(select_elements))
-            for product_element in select_elements:
-                product = get_product_info(product_element)
+            # 마지막 페이지는 넘기지 않고 파싱한 상품만 모은 뒤 끝냅니다.
+            last_page = page >= math.ceil(total_products/90)
+            if not last_page:
+                page += 1
+                # 지금 목록에 표시를 해두고 넘겨야 이전 페이지를 다시 읽지 않습니다.
+                mark_list_stale(driver)
+                driver.execute_script(f"javascript:movePage({page});")
+            page_products = []
+            if parsed is not None:
+                rows = parsed.result()
+            for name, price, link in rows:
+                product = Product(name, price, link)
                 size_before = len(products)
                 # 만약 link의 시작이 /로 시작한다면 종료(잘못된 데이터를 가져오는 것을 방지)
                 if product.link.startswith('/'):
-                    # print(product_element)
-                    # print("link가 /로 시작합니다.")
                     start_with_slash += 1
-                    # print("/로 시작하는 데이터 발견")
-                    # print(product)
                     continue
                 products.add(product)
+                page_products.append(product)
                 size_after = len(products)
                 if size_before == size_after:
                     duplicate += 1
-                    # print("중복데이터 발견")
-                    # print(product)
-                # print(f"size_before: {size_before}, size_after: {size_after}")
-            # print(f"size: {len(products)}")
-            page += 1
-            driver.execute_script(f"javascript:movePage({page});")
+            product_index.update(cate_name, page_products)
+            job.update(products=len(products))
+            if last_page:
+                break
         except Exception as e:
             print(e)
             print("크롤링 중 비정상적인 오류로 인한 종료")
-            return
+            # 브라우저가 죽었을 수 있으므로 다음 크롤링 때는 새 브라우저를 사용합니다.
+            pooled.broken = True
+            return False
     print(f"현재까지 {len(products)}개의 데이터 수집 완료, {start_with_slash}개의 데이터는 제외, {duplicate}개의 중복 데이터는 제외")
+    return True
 
 @app.on_event("startup")
 async def startup_event():
-    scheduler.add_job(start_crawl, CronTrigger(hour=0))  # Every day at midnight
+    global parse_pool
+    # 주기마다 갱신할 카테고리만 크롤링합니다. (모니터처럼 자주 바뀌는 카테고리는 더 자주)
+    scheduler.add_job(scheduled_crawl, IntervalTrigger(minutes=catalog_check_minutes))
     scheduler.start()
+    if parse_workers > 0:
+        parse_pool = ParsePool(parse_workers, listing_parser.name)
+    driver_pool.start()
+    load_product_index()
 
-async def start_crawl():
-    categories = {
-        "monitor": [112757, 11248106, 11230049, 11230059, 11230081, 11230076],
-        "keyboard": [11335184, 1131635, 1139922, 11317385, 11341565, 11347372, 11342148, 11342291, 11344629],
-        "mouse": [11310719, 11317389, 11312617, 1131804],
-        "desk": [15335915, 15343651, 15344971, 15335908, 15344981],
-        "chair": [15345047, 15345042, 15345043, 15346299, 15345045],
-    }
 
+def load_product_index():
+    # 서버를 켤 때 한 번만 DB에서 읽어오고, 이후에는 크롤링하면서 바로 고칩니다.
+    try:
+        oracle_db.start()
+        rows = oracle_db.execute_query("select EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK from EQUIPMENTS")
+        names = {cat_num: cate_name for cate_name, cat_num in catalog.numbers(oracle_db).items()}
+    except Exception as e:
+        print(e)
+        print("DB에서 상품을 읽지 못해 빈 색인으로 시작합니다.")
+        return
+    finally:
+        oracle_db.stop()
+    by_category = {}
+    for cat_num, name, price, link in rows:
+        if cat_num in names:
+            by_category.setdefault(names[cat_num], []).append(Product(name, price, link))
+    for cate_name, products in by_category.items():
+        product_index.update(cate_name, products)
+    print(f"상품 색인: {product_index.counts()}")
+
+
+async def scheduled_crawl():
+    # 크롤링은 crawl_runner의 스레드에서 실행되므로 여기서는 시작만 시키고 바로 돌아옵니다.
+    # (Selenium, BeautifulSoup, oracledb가 모두 블로킹이라 이벤트 루프에서 실행하면 서버 전체가 멈춤)
+    due = [category.name for category in catalog.due()]
+    if not due:
+        return
+    job = crawl_runner.start(due)
+    if job is None:
+        print("이전 크롤링이 아직 실행 중이므로 이번 예약 크롤링은 건너뜁니다.")
+
+
+def start_crawl(job):
+    pooled = None
+    # 갱신 주기(refresh_hours)는 크롤링을 시작한 시각부터 셉니다.
+    started_at = time.time()
     try:
-        driver = get_webdriver()    
+        # job.categories가 없으면(POST /crawl) 전체를 우선순위 순서로 크롤링합니다.
+        selected = catalog.select(job.categories)
+        pooled = driver_pool.acquire()
+        driver = pooled.driver
         oracle_db.start()
-        data = oracle_db.execute_query("select * from EQUIPMENTS_CATE")
-        # [(1, 'Monitor'), (2, 'Keyboard'), (3, 'Mouse'), (4, 'Desk'), (5, 'Chair')]
-        print(data)
-        cat_num = 1
-        for cate_name, category in categories.items():
+        cat_nums = catalog.numbers(oracle_db)
+        # 카테고리 id 중 하나라도 끝까지 읽지 못한 카테고리
+        incomplete = []
+        for category in selected:
+            cate_name = category.name
+            if cate_name not in cat_nums:
+                continue
             products = set()
+            completed = True
+            product_index.begin(cate_name)
             with open(f"{cate_name}.csv", "w", encoding="utf-8-sig", newline="") as f:
                 writer = csv.writer(f)
                 writer.writerow(["제품명", "가격", "링크"])
 
-                for CAT in category:
+                for CAT in category.ids:
+                    job.check_cancelled()
+                    job.update(category=cate_name, cat=CAT, page=0, total_products=0)
                     url = "https://prod.danawa.com/list/?cate=" + str(CAT)
                     driver.get(url)
 
+                    mark_list_stale(driver)
                     element = driver.find_element(By.LINK_TEXT, "신상품순")
                     driver.execute_script("arguments[0].click();", element)
+                    wait_list_ready(driver, 1)
 
                     select_element = driver.find_element(By.CLASS_NAME, "qnt_selector")
                     select = Select(select_element)
-                    select.select_by_value("90")
+                    if select.first_selected_option.get_attribute("value") != "90":
+                        mark_list_stale(driver)
+                        select.select_by_value("90")
                     print(f"{cate_name}카테고리의 데이터 크롤링 시작")
-                    crawl_products(driver, products)
+                    if not crawl_products(pooled, products, job, cate_name):
+                        completed = False
 
                 sorted_products = sorted(products, key=lambda x: x.name)
                 print("현재까지 크롤링한 데이터의 개수: " + str(len(sorted_products)))
-                write_product_info(cat_num, f, sorted_products)
-                cat_num += 1
+                write_product_info(cat_nums[cate_name], f, sorted_products)
+                if not completed:
+                    # 끝까지 읽지 못했으므로 이전 색인을 지우지 않고, 다음 예약 크롤링에서 다시 크롤링합니다.
+                    print(f"{cate_name} 크롤링이 중간에 멈췄습니다.")
+                    incomplete.append(cate_name)
+                    continue
+                # 이번 크롤링에서 보이지 않은 상품은 색인에서 뺍니다.
+                product_index.finish(cate_name)
+                catalog.mark_crawled(cate_name, started_at)
                 print(f"{cate_name} 크롤링 종료")
+        if incomplete:
+            # 작업 상태를 failed로 남깁니다.
+            raise RuntimeError(f"크롤링을 끝내지 못한 카테고리: {', '.join(incomplete)}")
+    except CrawlCancelled:
+        print("크롤링이 취소되었습니다.")
+        raise
     except Exception as e:
         print(e)
-        return    
+        if pooled is not None:
+            pooled.broken = True
+        # 작업 상태를 failed로 남기기 위해 다시 던집니다.
+        raise
     finally:
-        driver.quit()
+        # 브라우저는 끄지 않고 풀에 돌려줍니다. (오래 썼거나 고장 났으면 풀에서 교체)
+        if pooled is not None:
+            driver_pool.release(pooled)
         oracle_db.stop()
-        print("드라이버 종료")
+        print("드라이버 반환")
         
+# 크롤링 시작/진행 상황/취소: POST /crawl, GET /crawl, GET /crawl/{id}, POST /crawl/cancel
+crawl_runner = CrawlJobRunner(start_crawl)
+app.include_router(get_crawl_router(crawl_runner, catalog))
+# 상품 조회: GET /products, GET /products/search?q=, GET /products/{category}?min_price=&max_price=
+app.include_router(get_product_router(product_index))
+
+
 @app.on_event("shutdown")
 def shutdown_event():
     scheduler.shutdown()
+    # 실행 중인 크롤링을 취소하고 끝날 때까지 기다린 뒤 브라우저를 끕니다.
+    crawl_runner.shutdown()
+    if parse_pool is not None:
+        parse_pool.close()
+    driver_pool.close()
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
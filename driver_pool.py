@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+
+# 페이지 로딩을 가볍게 하기 위해 막을 리소스 (CDP Network.setBlockedURLs 패턴)
+# 다나와 이미지 주소에는 ?shrink=... 같은 쿼리가 붙으므로 뒤에도 *를 붙입니다.
+BLOCKED_IMAGES = ["*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"]
+BLOCKED_FONTS = ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"]
+BLOCKED_CSS = ["*.css*"]
+
+
+def get_blocked_urls(resources):
+    # resources: "images,fonts,css" 처럼 쉼표로 구분한 문자열
+    patterns = {"images": BLOCKED_IMAGES, "fonts": BLOCKED_FONTS, "css": BLOCKED_CSS}
+    urls = []
+    for resource in resources.split(","):
+        urls.extend(patterns.get(resource.strip(), []))
+    return urls
+
+
+def block_resources(driver, urls):
+    if urls:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class PooledDriver:
+    # 풀에서 빌려준 드라이버. 페이지를 몇 번 읽었는지와 고장 여부를 기록합니다.
+    def __init__(self, driver, startup):
+        self.driver = driver
+        self.startup = startup
+        self.pages = 0
+        self.broken = False
+
+
+class DriverPool:
+    # headless Chrome을 미리 띄워두고 크롤링 작업에 빌려줍니다.
+    # max_pages번 페이지를 읽었거나 오류로 고장 난 드라이버는 종료하고 새로 띄웁니다.
+    def __init__(self, factory, size, max_pages=300):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = []
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.startups = []
+        self.latencies = []
+
+    def start(self, count=None):
+        # 드라이버를 count개(기본값 size개) 미리 띄워둡니다.
+        count = self.size if count is None else count
+        for _ in range(count):
+            with self._condition:
+                if self._total >= self.size:
+                    return
+                self._total += 1
+            pooled = self._launch()
+            with self._condition:
+                self._idle.append(pooled)
+                self._condition.notify()
+
+    def _launch(self):
+        start = time.perf_counter()
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+        startup = time.perf_counter() - start
+        with self._condition:
+            self.startups.append(startup)
+        logging.info(f"크롬 드라이버 시작: {startup:.2f}초")
+        return PooledDriver(driver, startup)
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("드라이버 풀이 종료되었습니다.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._total < self.size:
+                    self._total += 1
+                    break
+                self._condition.wait()
+        return self._launch()
+
+    def release(self, pooled):
+        # 고장 났거나 너무 오래 쓴 드라이버는 종료하고, 나머지는 다시 풀에 넣습니다.
+        if pooled.broken or pooled.pages >= self.max_pages or self._closed:
+            reason = "오류" if pooled.broken else f"{pooled.pages}페이지 사용"
+            logging.info(f"크롬 드라이버를 교체합니다. ({reason})")
+            self._quit(pooled)
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            return
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def record_page(self, pooled, latency):
+        pooled.pages += 1
+        with self._condition:
+            self.latencies.append(latency)
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.error(str(e))
+
+    def report(self):
+        with self._condition:
+            startups = list(self.startups)
+            latencies = list(self.latencies)
+        return {
+            "drivers_started": len(startups),
+            "startup_avg": sum(startups) / len(startups) if startups else 0.0,
+            "pages": len(latencies),
+            "page_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "page_p50": percentile(latencies, 0.5),
+            "page_p95": percentile(latencies, 0.95),
+        }
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        report = self.report()
+        logging.info(
+            f"드라이버 {report['drivers_started']}개 시작 (평균 {report['startup_avg']:.2f}초), "
+            f"페이지 {report['pages']}개 (평균 {report['page_avg']:.2f}초, p50 {report['page_p50']:.2f}초, "
+            f"p95 {report['page_p95']:.2f}초)")
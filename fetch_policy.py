@@ -0,0 +1,171 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+
+from metrics import metrics
+from rate_limit import TokenBucket
+
+# 다시 시도할 HTTP 상태 코드 (서버 오류와 요청 제한)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    # 시간 초과, 연결 오류, 5xx/429만 다시 시도합니다. (그 외 4xx나 파싱 오류는 바로 실패)
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRY_STATUS
+    return False
+
+
+def get_retry_after(error):
+    # 429/503 응답의 Retry-After(초)가 있으면 돌려줍니다.
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+
+class RetryPolicy:
+    # 지수 백오프 + full jitter: attempt번째 재시도 전에 0 ~ min(cap, base * 2^attempt)초 사이로 기다립니다.
+    def __init__(self, retries=4, base=0.5, cap=30.0):
+        self.retries = retries
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    # 최근 window번의 요청 중 threshold 이상이 실패하면 cooldown초 동안 모든 요청을 멈춥니다.
+    # cooldown이 지나면 다시 요청을 보내고 처음부터 다시 셉니다.
+    def __init__(self, window=20, threshold=0.5, cooldown=30.0, min_calls=5):
+        self.window = window
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.min_calls = min_calls
+        self._outcomes = deque(maxlen=window)
+        self._opened_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self._opened_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, ok):
+        with self._lock:
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) < self.min_calls or failures / len(self._outcomes) < self.threshold:
+                return
+            self._opened_until = time.monotonic() + self.cooldown
+            self._outcomes.clear()
+        metrics.incr("breaker_open")
+        logging.warning(f"요청 실패가 많아 {self.cooldown}초 동안 요청을 멈춥니다. (최근 {failures}회 실패)")
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self._opened_until > time.monotonic()
+
+
+class FetchPolicy:
+    # 요청 하나를 보낼 때의 규칙을 모아둔 객체입니다.
+    #   limiter : 호스트별 토큰 버킷 (AdaptiveHostRateLimiter면 실패할 때 속도를 줄임)
+    #   retry   : 재시도 횟수와 백오프
+    #   breaker : 호스트별 서킷 브레이커
+    # 카테고리별 설정(for_category)은 같은 limiter와 breaker를 공유하고 재시도 설정과 카테고리 전용 속도만 다릅니다.
+    def __init__(self, limiter=None, retry=None, breaker_factory=None, overrides=None, bucket=None):
+        self.limiter = limiter
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker_factory = breaker_factory if breaker_factory is not None else CircuitBreaker
+        self.overrides = overrides or {}
+        self.bucket = bucket
+        self._breakers = {}
+        self._category_buckets = {}
+        self._lock = threading.Lock()
+
+    def for_category(self, cate):
+        # overrides = {"카테고리 id": {"retries": 6, "backoff_base": 1, "backoff_cap": 60, "rate": 1}}
+        override = self.overrides.get(str(cate))
+        if not override:
+            return self
+        retry = RetryPolicy(
+            override.get("retries", self.retry.retries),
+            override.get("backoff_base", self.retry.base),
+            override.get("backoff_cap", self.retry.cap),
+        )
+        bucket = None
+        if override.get("rate"):
+            with self._lock:
+                bucket = self._category_buckets.get(str(cate))
+                if bucket is None:
+                    bucket = self._category_buckets[str(cate)] = TokenBucket(override["rate"])
+        policy = FetchPolicy(self.limiter, retry, self.breaker_factory, bucket=bucket)
+        # 브레이커는 호스트 단위이므로 원래 정책의 것을 같이 씁니다.
+        policy._breakers = self._breakers
+        policy._lock = self._lock
+        return policy
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = self.breaker_factory()
+            return breaker
+
+    def acquire(self, url):
+        # 브레이커가 열려 있으면 기다린 뒤, 속도 제한에 맞춰 토큰을 받습니다.
+        self.breaker(url).wait()
+        with metrics.timer("rate_limit_wait_seconds"):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            if self.limiter is not None:
+                self.limiter.acquire(url)
+
+    def success(self, url):
+        self.breaker(url).record(True)
+        if hasattr(self.limiter, "speed_up"):
+            self.limiter.speed_up(url)
+
+    def failure(self, url):
+        self.breaker(url).record(False)
+        if hasattr(self.limiter, "slow_down"):
+            rate = self.limiter.slow_down(url)
+            if rate is not None:
+                logging.debug(f"{urlsplit(url).netloc} 요청 속도를 초당 {rate:.2f}회로 줄입니다.")
+
+    def call(self, url, func):
+        # func()을 실행하고, 다시 시도할 수 있는 오류면 백오프 후 최대 retry.retries번 다시 실행합니다.
+        attempt = 0
+        while True:
+            self.acquire(url)
+            try:
+                result = func()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                self.failure(url)
+                if attempt >= self.retry.retries:
+                    metrics.incr("fetch_failures")
+                    raise
+                # 서버가 알려준 Retry-After도 백오프 상한(retry.cap)까지만 기다립니다.
+                delay = get_retry_after(e)
+                delay = self.retry.delay(attempt) if delay is None else min(self.retry.cap, delay)
+                metrics.incr("fetch_retries")
+                logging.info(f"요청 실패({e}), {delay:.1f}초 후 다시 시도합니다. ({attempt + 1}/{self.retry.retries})")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.success(url)
+            return result
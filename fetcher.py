@@ -0,0 +1,317 @@
+import logging
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.select import Select
+
+from metrics import metrics
+from page_cache import CacheMiss, page_key
+
+LIST_URL = "https://prod.danawa.com/list/?cate="
+AJAX_URL = "https://prod.danawa.com/list/ajax/getProductList.ajax.php"
+# 다나와 목록의 "신상품순" 정렬값과 한 페이지에 보여줄 상품 수
+SORT_METHOD = "NEW"
+LIST_COUNT = 90
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+)
+
+
+# 페이지를 넘기기 전에 지금 보이는 상품 목록의 첫 상품에 표시를 해둡니다.
+# 다나와는 AJAX 응답으로 목록을 통째로 바꾸므로, 표시가 없는 상품이 보이면 새 목록입니다.
+MARK_STALE_SCRIPT = """
+var item = document.querySelector('div.main_prodlist > ul.product_list > li.prod_item');
+if (item) { item.__stale = true; }
+"""
+
+# 표시가 없는 새 목록이 들어오고 페이지 번호(now_on)가 요청한 페이지가 되는 순간 끝납니다.
+# MutationObserver로 DOM이 바뀔 때만 확인하므로 polling 간격만큼 늦어지지 않습니다.
+WAIT_READY_SCRIPT = """
+var page = String(arguments[0]);
+var done = arguments[arguments.length - 1];
+function ready() {
+    var item = document.querySelector('div.main_prodlist > ul.product_list > li.prod_item');
+    if (!item || item.__stale) { return false; }
+    var current = document.querySelector('div.number_wrap a.now_on');
+    return !current || current.textContent.trim() === page;
+}
+if (ready()) { done(true); return; }
+var observer = new MutationObserver(function () {
+    if (ready()) { observer.disconnect(); done(true); }
+});
+observer.observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['class']});
+"""
+
+
+def mark_list_stale(driver):
+    driver.execute_script(MARK_STALE_SCRIPT)
+
+
+def wait_list_ready(driver, page, timeout=100):
+    # page번째 페이지의 새 상품 목록이 DOM에 들어올 때까지 기다립니다. (timeout초가 지나면 TimeoutException)
+    driver.set_script_timeout(timeout)
+    with metrics.timer("selenium_wait_seconds"):
+        driver.execute_async_script(WAIT_READY_SCRIPT, page)
+
+
+class SeleniumListingFetcher:
+    # 기존 방식: 브라우저에서 movePage(n)를 실행하고 새 상품 목록이 들어올 때까지 기다립니다.
+    # 브라우저 하나로는 한 번에 한 페이지만 볼 수 있습니다.
+    # 브라우저는 드라이버 풀에서 빌려오고, 카테고리를 열 때마다 오래 쓴 브라우저는 새것으로 바꿉니다.
+    parallel_pages = False
+
+    def __init__(self, pool, policy=None, timeout=100):
+        self.pool = pool
+        self.policy = policy
+        self._policy = policy
+        self.timeout = timeout
+        self.pooled = None
+        self.page = 0
+
+    @property
+    def driver(self):
+        return self.pooled.driver
+
+    def open_category(self, cate):
+        if self.pooled is not None and self.pooled.pages >= self.pool.max_pages:
+            self._release()
+        if self.pooled is None:
+            self.pooled = self.pool.acquire()
+        self._policy = self.policy.for_category(cate) if self.policy is not None else None
+        url = LIST_URL + str(cate)
+        self._throttle(url)
+        start = time.perf_counter()
+        try:
+            self.driver.get(url)
+
+            # 정렬과 페이지당 개수를 바꿀 때마다 목록이 다시 불러와지므로 각각 기다립니다.
+            mark_list_stale(self.driver)
+            element = self.driver.find_element(By.LINK_TEXT, "신상품순")
+            self.driver.execute_script("arguments[0].click();", element)
+            wait_list_ready(self.driver, 1, self.timeout)
+
+            select_element = self.driver.find_element(By.CLASS_NAME, "qnt_selector")
+            select = Select(select_element)
+            if select.first_selected_option.get_attribute("value") != str(LIST_COUNT):
+                mark_list_stale(self.driver)
+                select.select_by_value(str(LIST_COUNT))
+                wait_list_ready(self.driver, 1, self.timeout)
+            self.page = 1
+            html = self._page_source()
+        except Exception:
+            self._record(url, False)
+            self._release(broken=True)
+            raise
+        self._record(url, True)
+        latency = time.perf_counter() - start
+        self.pool.record_page(self.pooled, latency)
+        metrics.observe("open_category_seconds", latency)
+        return html
+
+    def fetch_page(self, page):
+        if self.pooled is None:
+            raise RuntimeError("open_category()를 먼저 호출해야 합니다.")
+        start = time.perf_counter()
+        moved = page != self.page
+        try:
+            if moved:
+                self._throttle(LIST_URL)
+                mark_list_stale(self.driver)
+                self.driver.execute_script(f"javascript:movePage({page});")
+                wait_list_ready(self.driver, page, self.timeout)
+                self.page = page
+            html = self._page_source()
+        except Exception:
+            if moved:
+                self._record(LIST_URL, False)
+            # 브라우저가 죽었거나 멈췄을 수 있으므로 풀에 돌려주면서 교체합니다.
+            self._release(broken=True)
+            raise
+        if moved:
+            self._record(LIST_URL, True)
+        latency = time.perf_counter() - start
+        self.pool.record_page(self.pooled, latency)
+        metrics.observe("fetch_page_seconds", latency)
+        return html
+
+    def _page_source(self):
+        # 브라우저에서 HTML 전체를 직렬화해서 가져오는 시간도 따로 잽니다.
+        with metrics.timer("page_source_seconds"):
+            return self.driver.page_source
+
+    def _throttle(self, url):
+        # 브라우저는 페이지를 다시 불러오면 상태가 바뀌므로 재시도 없이 속도 제한과 브레이커만 적용합니다.
+        if self._policy is not None:
+            self._policy.acquire(url)
+
+    def _record(self, url, ok):
+        # 결과를 브레이커와 속도 제한에 알려서, 실패가 이어지면 HTTP 백엔드처럼 멈추거나 느려지게 합니다.
+        if self._policy is None:
+            return
+        if ok:
+            self._policy.success(url)
+        else:
+            self._policy.failure(url)
+
+    def _release(self, broken=False):
+        self.pooled.broken = broken
+        self.pool.release(self.pooled)
+        self.pooled = None
+
+    def close(self):
+        # 브라우저를 끄지 않고 풀에 돌려줍니다. (종료는 DriverPool.close()에서)
+        if self.pooled is not None:
+            self._release()
+
+
+class HttpListingFetcher:
+    # 브라우저 없이 다나와 상품 목록 AJAX 엔드포인트를 직접 호출합니다.
+    # 목록 페이지에 들어있는 hidden input 값들을 그대로 폼 데이터로 사용하고
+    # 정렬(신상품순), 페이지당 개수(90), 페이지 번호만 바꿔서 요청합니다.
+    # 요청마다 상태가 없으므로 여러 페이지를 동시에 요청할 수 있습니다.
+    # cache(PageCache)가 있으면 받은 페이지를 저장해두고, 유효 시간 안에는 다시 요청하지 않습니다.
+    parallel_pages = True
+
+    def __init__(self, session=None, list_url=LIST_URL, ajax_url=AJAX_URL, timeout=30, policy=None, cache=None):
+        self.session = session if session is not None else get_http_session()
+        self.policy = policy
+        self.cache = cache
+        self.list_url = list_url
+        self.ajax_url = ajax_url
+        self.timeout = timeout
+        self.url = None
+        self.form = None
+        self.cate = None
+        self._policy = policy
+
+    def open_category(self, cate):
+        self.url = self.list_url + str(cate)
+        self.cate = cate
+        # 카테고리별 재시도/속도 설정이 있으면 그것을 사용합니다.
+        self._policy = self.policy.for_category(cate) if self.policy is not None else None
+        html = self._request(self.url, "open_category_seconds",
+                             lambda headers: self.session.get(self.url, headers=headers, timeout=self.timeout),
+                             page_key(cate, 0, SORT_METHOD, LIST_COUNT))
+        self.form = get_list_form(html, cate)
+        return html
+
+    def fetch_page(self, page):
+        if self.form is None:
+            raise RuntimeError("open_category()를 먼저 호출해야 합니다.")
+        data = dict(self.form)
+        data["page"] = page
+        return self._request(self.ajax_url, "fetch_page_seconds", lambda headers: self.session.post(
+            self.ajax_url,
+            data=data,
+            headers={"Referer": self.url, "X-Requested-With": "XMLHttpRequest", **headers},
+            timeout=self.timeout,
+        ), page_key(self.cate, page, data["sortMethod"], data["listCount"]))
+
+    def _request(self, url, timer, send, key):
+        # 요청 한 번을 보내고 응답 본문을 돌려줍니다. 정책이 있으면 속도 제한, 재시도, 브레이커를 적용합니다.
+        # 캐시에 유효 시간이 지나지 않은 페이지가 있으면 요청하지 않고, 지났으면 ETag/Last-Modified로
+        # 조건부 요청을 보내 304(변경 없음)일 때 저장된 본문을 그대로 씁니다.
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            html = self.cache.read(key)
+            if html is not None:
+                metrics.incr("cache_hits")
+                return html
+        headers = self.cache.conditional_headers(entry) if entry is not None else {}
+
+        def attempt():
+            with metrics.timer(timer):
+                response = send(headers)
+            if response.status_code == 304 and self.cache is not None:
+                html = self.cache.revalidate(key)
+                if html is not None:
+                    metrics.incr("cache_revalidated")
+                    return html
+                # 저장된 본문이 없어졌으면 조건 없이 다시 받습니다.
+                with metrics.timer(timer):
+                    response = send({})
+            response.raise_for_status()
+            html = response.text
+            if self.cache is not None:
+                metrics.incr("cache_misses")
+                self.cache.put(key, html, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return html
+
+        if self._policy is None:
+            return attempt()
+        return self._policy.call(url, attempt)
+
+    def close(self):
+        self.session.close()
+
+
+class CachedListingFetcher:
+    # 재생 모드: 네트워크에 요청하지 않고 페이지 캐시에 저장된 목록 페이지만 돌려줍니다.
+    # 파싱과 DB 저장 단계를 같은 입력으로 다시 실행하거나 측정할 때 사용합니다.
+    parallel_pages = True
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.cate = None
+
+    def open_category(self, cate):
+        self.cate = cate
+        return self._read(page_key(cate, 0, SORT_METHOD, LIST_COUNT))
+
+    def fetch_page(self, page):
+        if self.cate is None:
+            raise RuntimeError("open_category()를 먼저 호출해야 합니다.")
+        return self._read(page_key(self.cate, page, SORT_METHOD, LIST_COUNT))
+
+    def _read(self, key):
+        html = self.cache.read(key)
+        if html is None:
+            raise CacheMiss(f"페이지 캐시에 {key} 페이지가 없습니다.")
+        metrics.incr("cache_hits")
+        return html
+
+    def close(self):
+        pass
+
+
+def get_http_session(pool_size=10):
+    # 커넥션을 재사용하기 위해 세션 하나에 커넥션 풀을 붙여서 사용합니다.
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def get_list_form(html, cate):
+    # 목록 페이지의 hidden input(categoryCode, physicsCate1 등)을 모아 AJAX 요청 폼을 만듭니다.
+    soup = BeautifulSoup(html, 'html.parser')
+    form = {}
+    for element in soup.select('input[type="hidden"][name]'):
+        form[element['name']] = element.get('value', '')
+    form.setdefault("listCategoryCode", str(cate))
+    form.setdefault("categoryCode", str(cate))
+    form["viewMethod"] = "LIST"
+    form["sortMethod"] = SORT_METHOD
+    form["listCount"] = LIST_COUNT
+    return form
+
+
+def get_fetcher(backend, driver_pool, policy=None, cache=None, list_url=LIST_URL, ajax_url=AJAX_URL):
+    # backend가 "http"이면 HTTP 세션을, "replay"이면 페이지 캐시만,
+    # 그 외에는 드라이버 풀의 Selenium 드라이버를 사용합니다.
+    # list_url, ajax_url은 HTTP 백엔드가 요청할 주소입니다. (테스트에서 bench/replay_server.py로 바꿔 씀)
+    if backend == "http":
+        logging.info("HTTP 백엔드로 크롤링합니다.")
+        return HttpListingFetcher(list_url=list_url, ajax_url=ajax_url, policy=policy, cache=cache)
+    if backend == "replay":
+        logging.info("페이지 캐시에 저장된 목록만으로 크롤링합니다. (재생 모드)")
+        return CachedListingFetcher(cache)
+    logging.info("Selenium 백엔드로 크롤링합니다.")
+    return SeleniumListingFetcher(driver_pool, policy=policy)
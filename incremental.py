@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import time
+
+from atomic_file import write_json
+
+STATE_DIR = os.path.join("data", "state")
+
+
+class KnownProducts:
+    # 이미 저장된 상품들 {제품명: (가격, 링크)}
+    # 신상품순으로 보고 있으므로, 한 페이지가 모두 알고 있는 상품이고 가격도 그대로라면
+    # 그 뒤 페이지도 바뀐 것이 없다고 보고 페이지 넘김을 멈춥니다.
+    def __init__(self, items=None):
+        self.items = items if items is not None else {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def is_unchanged(self, name, price, link):
+        return self.items.get(name) == (price, link)
+
+    def page_is_known(self, rows):
+        rows = [row for row in rows if not row[2].startswith('/')]
+        return bool(rows) and all(self.is_unchanged(name, price, link) for name, price, link in rows)
+
+
+def load_known_from_db(db, cat_num):
+    rows = db.execute_query_with_params(
+        "SELECT EQUIP_NM, EQUIP_PRICE, EQUIP_LINK FROM EQUIPMENTS WHERE EQUIP_CATE_NO = :cat",
+        {"cat": int(cat_num)},
+    )
+    return KnownProducts({name: (int(price), link) for name, price, link in rows})
+
+
+def get_state_path(cate_name):
+    return os.path.join(STATE_DIR, f"{cate_name}.json")
+
+
+def load_state(cate_name):
+    # 카테고리별 상태 파일: 마지막 전체 동기화 시각과 (파일 모드일 때) 상품 목록
+    path = get_state_path(cate_name)
+    if not os.path.exists(path):
+        return {"last_full_sync": 0, "products": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(cate_name, state):
+    write_json(get_state_path(cate_name), state)
+
+
+def load_known_from_state(state):
+    return KnownProducts({name: tuple(value) for name, value in state["products"].items()})
+
+
+def is_full_resync_due(state, full_resync_days, now=None):
+    now = time.time() if now is None else now
+    return now - state["last_full_sync"] >= full_resync_days * 24 * 60 * 60
+
+
+def get_known_products(db, cate_name, cat_num, source, full_resync_days):
+    # 전체 동기화 주기가 되었으면 None을 돌려주어 끝까지 크롤링하게 합니다.
+    state = load_state(cate_name)
+    if is_full_resync_due(state, full_resync_days):
+        logging.info(f"{cate_name} 카테고리는 전체 동기화를 진행합니다.")
+        return None
+    known = load_known_from_db(db, cat_num) if source == "db" else load_known_from_state(state)
+    logging.info(f"{cate_name} 카테고리는 증분 크롤링을 진행합니다. (기존 상품 {len(known)}개)")
+    return known
+
+
+def update_state(cate_name, known, full_sync, source):
+    # known: 이번 실행까지 반영된 KnownProducts (file 모드에서만 저장)
+    state = load_state(cate_name)
+    if full_sync:
+        state["last_full_sync"] = time.time()
+    if source == "file":
+        state["products"] = {name: list(value) for name, value in known.items.items()}
+    save_state(cate_name, state)
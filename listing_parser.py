@@ -0,0 +1,99 @@
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+PRODUCT_SELECTOR = 'div.main_prodlist > ul.product_list > li.prod_item > div.prod_main_info'
+TOTAL_SELECTOR = '#danawa_content > div.product_list_wrap > div.product_list_area > div.prod_list_tab > ul > li.tab_item.selected > a > strong.list_num'
+
+
+def remove_comma(price_text):
+    return re.sub(r"[^\d]", "", price_text)
+
+
+def get_price(price_text):
+    price_text = remove_comma(price_text.strip())
+    return int(price_text) if price_text.isdigit() else 0
+
+
+def get_product_fields(product):
+    # BeautifulSoup 요소(div.prod_main_info)에서 (제품명, 가격, 링크)를 꺼냅니다.
+    name_element = product.select_one('p.prod_name > a')
+    name = name_element.text.strip()
+    price_element = product.select_one('p.price_sect > a > strong')
+    price = get_price(price_element.text)
+    link = name_element['href'].strip()
+    return name, price, link
+
+
+class SoupListingParser:
+    # 기준 구현: 페이지 전체를 html.parser로 읽고 CSS 선택자로 찾습니다.
+    name = "soup"
+
+    def parse_total_products(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        element = soup.select_one(TOTAL_SELECTOR)
+        if element is None:
+            element = soup.select_one('strong.list_num')
+        if element is None:
+            raise ValueError("전체 상품 개수를 찾을 수 없습니다.")
+        return int(remove_comma(element.text.strip()))
+
+    def parse_products(self, html):
+        soup = BeautifulSoup(html, 'html.parser')
+        return [get_product_fields(product) for product in soup.select(PRODUCT_SELECTOR)]
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlListingParser:
+    # 빠른 경로: 페이지를 lxml로 읽고, li.prod_item 하나당 한 번씩만 훑어서
+    # 제품명, 가격, 링크를 함께 꺼냅니다. (PRODUCT_SELECTOR와 같은 경로를 XPath로 씀)
+    name = "lxml"
+
+    _items = etree.XPath(
+        f"//div[{_has_class('main_prodlist')}]/ul[{_has_class('product_list')}]"
+        f"/li[{_has_class('prod_item')}]/div[{_has_class('prod_main_info')}]") if lxml else None
+    _name = etree.XPath(f".//p[{_has_class('prod_name')}]/a") if lxml else None
+    _price = etree.XPath(f".//p[{_has_class('price_sect')}]/a/strong") if lxml else None
+    _total = etree.XPath(
+        f"//li[{_has_class('tab_item')} and {_has_class('selected')}]/a/strong[{_has_class('list_num')}]") if lxml else None
+    _any_total = etree.XPath(f"//strong[{_has_class('list_num')}]") if lxml else None
+
+    def parse_total_products(self, html):
+        document = lxml.html.fromstring(html)
+        elements = self._total(document) or self._any_total(document)
+        if not elements:
+            raise ValueError("전체 상품 개수를 찾을 수 없습니다.")
+        return int(remove_comma(elements[0].text_content().strip()))
+
+    def parse_products(self, html):
+        if not html.strip():
+            return []
+        rows = []
+        for product in self._items(lxml.html.fromstring(html)):
+            name_element = self._name(product)[0]
+            price_element = self._price(product)[0]
+            rows.append((
+                name_element.text_content().strip(),
+                get_price(price_element.text_content()),
+                name_element.get('href').strip(),
+            ))
+        return rows
+
+
+def get_parser(name):
+    # name이 "soup"이면 기준 구현을, 그 외에는 lxml을 사용합니다. (lxml이 없으면 기준 구현)
+    if name != "soup" and lxml is not None:
+        return LxmlListingParser()
+    if name != "soup":
+        logging.warning("lxml이 설치되어 있지 않아 BeautifulSoup 파서를 사용합니다.")
+    return SoupListingParser()
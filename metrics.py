@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# 초 단위 타이머에 쓰는 기본 구간 (Prometheus 기본값에 긴 구간을 몇 개 더함)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PREFIX = "crawl_"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, ratio):
+        # 값이 들어간 구간의 상한을 돌려줍니다. (마지막 구간이면 최댓값)
+        target = self.count * ratio
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 6),
+        }
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    # 측정을 끈 경우 timer()가 돌려주는 객체 (매번 새로 만들지 않음)
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    # 단계별 소요 시간(타이머), 개수(카운터), 분포(히스토그램)를 모읍니다.
+    # 꺼져 있으면 모든 메서드가 바로 돌아오므로 크롤링 속도에 거의 영향이 없습니다.
+    # 여러 워커 스레드에서 동시에 불러도 됩니다.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        # with metrics.timer("fetch_page_seconds"): ... 로 감싼 구간의 시간을 히스토그램에 남깁니다.
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS):
+        # buckets는 처음 기록할 때만 사용합니다.
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def report(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "elapsed": round(time.time() - self.started_at, 3),
+                "counters": dict(self.counters),
+                "histograms": {name: histogram.summary() for name, histogram in self.histograms.items()},
+            }
+
+    def prometheus(self):
+        # Prometheus 텍스트 형식 (node_exporter textfile collector 등에서 읽을 수 있음)
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name}_total counter")
+                lines.append(f"{PREFIX}{name}_total {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                seen = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    seen += count
+                    lines.append(f'{PREFIX}{name}_bucket{{le="{bound}"}} {seen}')
+                lines.append(f'{PREFIX}{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{PREFIX}{name}_sum {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, directory):
+        # metrics.json(실행 리포트)과 metrics.prom(Prometheus 형식)을 남깁니다.
+        if not self.enabled:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "metrics.json"), "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        with open(os.path.join(directory, "metrics.prom"), "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+
+
+# 모듈마다 같은 객체를 사용합니다. script.py에서 METRICS=1이면 켭니다.
+metrics = Metrics()
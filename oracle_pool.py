@@ -0,0 +1,142 @@
+import logging
+import queue
+import threading
+
+import oracledb
+
+
+class PooledOracleDB:
+    # oracledb.create_pool로 만든 커넥션 풀을 사용하는 OracleDB입니다.
+    # 스레드마다 풀에서 커넥션을 하나 빌려서 쓰므로, 커밋/롤백은 호출한 스레드의 트랜잭션에만 적용됩니다.
+    # 커서는 with 문으로 열고 닫으며, 커넥션마다 stmtcachesize개의 문장을 캐시해서 다시 파싱하지 않습니다.
+    def __init__(self, user, password, host, port, service_name, pool_min=1, pool_max=4, stmtcachesize=50):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.service_name = service_name
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.stmtcachesize = stmtcachesize
+        self._pool = None
+        self._local = threading.local()
+
+    def start(self):
+        # env파일에서 읽어온 데이터베이스 정보로 커넥션 풀을 만듭니다.
+        dsn = oracledb.makedsn(host=self.host, port=int(self.port), service_name=self.service_name)
+        self._pool = oracledb.create_pool(
+            user=self.user,
+            password=self.password,
+            dsn=dsn,
+            min=self.pool_min,
+            max=self.pool_max,
+            increment=1,
+            stmtcachesize=self.stmtcachesize,
+        )
+
+    def stop(self):
+        # 현재 스레드의 커넥션을 돌려주고 풀을 닫습니다.
+        if self._pool is not None:
+            self.release()
+            self._pool.close(force=True)
+            self._pool = None
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._pool.acquire()
+            self._local.conn = conn
+        return conn
+
+    def release(self):
+        # 현재 스레드가 빌린 커넥션을 풀에 돌려줍니다. (커밋하지 않은 내용은 롤백됨)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._pool.release(conn)
+
+    def cursor(self):
+        return self.connection().cursor()
+
+    def execute_query(self, query):
+        # 쿼리를 실행하고 결과를 반환합니다.
+        with self.cursor() as cursor:
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def execute_insert(self, query, values):
+        # INSERT 쿼리를 실행합니다. (커밋은 commit_transaction에서)
+        with self.cursor() as cursor:
+            cursor.execute(query, values)
+
+    def commit(self):
+        self.connection().commit()
+
+    def execute_many(self, query, values_list):
+        with self.cursor() as cursor:
+            cursor.executemany(query, values_list)
+            return cursor.rowcount
+
+    def begin_transaction(self):
+        # 새로운 데이터베이스 트랜잭션을 시작합니다.
+        self.connection().begin()
+
+    def commit_transaction(self):
+        # 현재 스레드의 트랜잭션을 커밋합니다.
+        self.commit()
+
+    def rollback_transaction(self):
+        # 현재 스레드의 트랜잭션을 롤백합니다.
+        self.connection().rollback()
+
+    def execute_query_with_params(self, query, params=None):
+        # 파라미터를 사용하여 쿼리를 실행하고 결과를 반환합니다.
+        # params 매개변수에는 파라미터 값을 담은 딕셔너리를 전달해야 합니다.
+        with self.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+
+class AsyncDBWriter:
+    # DB 쓰기를 별도 스레드에서 넣은 순서대로 실행합니다.
+    # 큐 크기가 정해져 있어서 DB가 늦으면 submit()이 기다립니다. (메모리가 무한정 늘지 않음)
+    # 쓰기 스레드는 풀에서 자기 커넥션을 빌려 쓰고, close()할 때 돌려줍니다.
+    def __init__(self, db, maxsize=8):
+        self.db = db
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((func, args))
+
+    def _run(self):
+        try:
+            while True:
+                task = self.queue.get()
+                if task is None:
+                    return
+                func, args = task
+                # 오류가 난 뒤에는 나머지 작업(체크포인트 등)을 실행하지 않고 버립니다.
+                if self.error is not None:
+                    continue
+                try:
+                    func(*args)
+                except Exception as e:
+                    logging.error(f"DB 쓰기 스레드 오류: {e}")
+                    self.error = e
+        finally:
+            self.db.release()
+
+    def close(self):
+        # 남은 작업을 모두 실행할 때까지 기다립니다.
+        if not self._closed:
+            self._closed = True
+            self.queue.put(None)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from metrics import metrics
+
+PAGE_CACHE_DIR = os.path.join("data", "page_cache")
+
+
+class CacheMiss(LookupError):
+    pass
+
+
+def page_key(cate, page, sort, list_count):
+    # 카테고리 id, 정렬, 페이지당 개수, 페이지 번호로 키를 만듭니다. (0페이지는 목록 첫 화면)
+    return f"{cate}:{sort}:{list_count}:{page}"
+
+
+class PageCache:
+    # 목록 페이지 HTML을 디스크에 저장해두는 캐시입니다.
+    # 본문은 내용의 sha256을 파일 이름으로 저장하므로(content-addressed) 같은 내용은 한 번만 저장됩니다.
+    # index.json에 키마다 본문 해시, 크기, 저장/사용 시각, ETag, Last-Modified를 기록합니다.
+    #   ttl       : 저장한 지 ttl초가 지나지 않았으면 요청하지 않고 그대로 사용 (지나면 조건부 요청으로 확인)
+    #   max_bytes : 본문 전체 크기가 넘으면 가장 오래 사용하지 않은 키부터 지움 (LRU)
+    # 여러 워커 스레드에서 같이 사용해도 됩니다. index.json은 save_every번 저장할 때마다와 close()에서 씁니다.
+    def __init__(self, directory=PAGE_CACHE_DIR, ttl=3600, max_bytes=512 * 1024 * 1024, save_every=50):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.save_every = save_every
+        self.index_path = os.path.join(directory, "index.json")
+        self.entries = {}
+        self._refs = {}
+        self._size = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                logging.warning("페이지 캐시 목록을 읽을 수 없어 비우고 시작합니다.")
+                self.entries = {}
+        for entry in self.entries.values():
+            self._add_ref(entry)
+        self._sweep()
+        logging.info(f"페이지 캐시: {len(self.entries)}개, {self._size / 1024 / 1024:.1f}MB ({self.directory})")
+
+    def _sweep(self):
+        # 목록을 저장하기 전에 중단되어 어디에서도 쓰지 않는 본문 파일을 지웁니다.
+        blob_dir = os.path.join(self.directory, "blobs")
+        if not os.path.isdir(blob_dir):
+            return
+        for prefix in os.listdir(blob_dir):
+            for name in os.listdir(os.path.join(blob_dir, prefix)):
+                if name.split(".")[0] not in self._refs:
+                    os.remove(os.path.join(blob_dir, prefix, name))
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "blobs", digest[:2], digest + ".html")
+
+    def _add_ref(self, entry):
+        digest = entry["blob"]
+        if digest not in self._refs:
+            self._refs[digest] = 0
+            self._size += entry["size"]
+        self._refs[digest] += 1
+
+    def _remove(self, key):
+        # 키를 지우고, 그 본문을 쓰는 다른 키가 없으면 파일도 지웁니다.
+        entry = self.entries.pop(key)
+        digest = entry["blob"]
+        self._refs[digest] -= 1
+        if self._refs[digest] == 0:
+            del self._refs[digest]
+            self._size -= entry["size"]
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def read(self, key):
+        # 본문을 돌려주고 사용 시각을 갱신합니다. 없으면 None
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry["used_at"] = time.time()
+            path = self._blob_path(entry["blob"])
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self._lock:
+                if key in self.entries:
+                    self._remove(key)
+            return None
+
+    def conditional_headers(self, entry):
+        # 저장해둔 ETag/Last-Modified로 조건부 요청 헤더를 만듭니다.
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidate(self, key):
+        # 서버가 304(변경 없음)로 응답하면 저장 시각만 갱신하고 본문을 돌려줍니다.
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["stored_at"] = time.time()
+        return self.read(key)
+
+    def put(self, key, html, etag=None, last_modified=None):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        now = time.time()
+        with self._lock:
+            # 같은 본문을 다른 키가 지우는 중일 수 있으므로 파일 쓰기도 잠금 안에서 합니다.
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = path + ".tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            entry = {"blob": digest, "size": len(data), "stored_at": now, "used_at": now,
+                     "etag": etag, "last_modified": last_modified}
+            # 새 참조를 먼저 더해야 같은 본문으로 다시 저장할 때 파일이 지워지지 않습니다.
+            self._add_ref(entry)
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self._evict()
+            self._unsaved += 1
+            if self._unsaved >= self.save_every:
+                self._save()
+
+    def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        for key in sorted(self.entries, key=lambda key: self.entries[key]["used_at"]):
+            if self._size <= self.max_bytes or len(self.entries) == 1:
+                break
+            self._remove(key)
+            metrics.incr("cache_evictions")
+
+    def _save(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.index_path)
+        self._unsaved = 0
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def close(self):
+        self.save()
+
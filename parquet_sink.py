@@ -0,0 +1,90 @@
+import logging
+import os
+
+from product import parse_pcode
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# 카테고리 이름은 파일마다 값이 몇 개뿐이므로 사전(dictionary) 인코딩으로 저장합니다.
+SCHEMA = pa.schema([
+    ("category", pa.dictionary(pa.int8(), pa.string())),
+    ("cate_no", pa.int16()),
+    ("name", pa.string()),
+    ("price", pa.int64()),
+    ("link", pa.string()),
+    ("pcode", pa.int64()),
+    ("crawled_at", pa.timestamp("s")),
+]) if pa else None
+
+
+def parquet_available():
+    return pa is not None
+
+
+class ParquetSink:
+    # 상품을 열(column) 단위로 모았다가 batch_rows개마다 Parquet 행 그룹 하나로 씁니다.
+    # 쓰는 동안에는 <path>.tmp에 쓰고 close()에서 이름을 바꾸므로, 중간에 멈춰도 읽을 수 없는 파일이 남지 않습니다.
+    #   compression : "zstd"(기본값), "snappy", "gzip", "none" 등 pyarrow가 지원하는 값
+    def __init__(self, path, cate_name, cat_num, crawled_at, compression="zstd", batch_rows=50000):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.cate_name = cate_name
+        self.cat_num = cat_num
+        self.crawled_at = crawled_at
+        self.batch_rows = batch_rows
+        self.rows = 0
+        self._category = pa.array([cate_name], pa.string())
+        self._names = []
+        self._prices = []
+        self._links = []
+        self._pcodes = []
+        self._writer = pq.ParquetWriter(self.temp_path, SCHEMA, compression=compression, use_dictionary=["category"])
+
+    def write(self, products):
+        for product in products:
+            self._names.append(product.name)
+            self._prices.append(int(product.price))
+            self._links.append(product.link)
+            self._pcodes.append(parse_pcode(product.link))
+            if len(self._names) >= self.batch_rows:
+                self._flush()
+
+    def _flush(self):
+        count = len(self._names)
+        if not count:
+            return
+        batch = pa.RecordBatch.from_arrays([
+            pa.DictionaryArray.from_arrays(pa.array([0] * count, pa.int8()), self._category),
+            pa.array([self.cat_num] * count, pa.int16()),
+            pa.array(self._names, pa.string()),
+            pa.array(self._prices, pa.int64()),
+            pa.array(self._links, pa.string()),
+            pa.array(self._pcodes, pa.int64()),
+            pa.array([self.crawled_at] * count, pa.timestamp("s")),
+        ], schema=SCHEMA)
+        self._writer.write_batch(batch)
+        self.rows += count
+        self._names, self._prices, self._links, self._pcodes = [], [], [], []
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self.temp_path, self.path)
+        logging.info(f"{self.path}에 {self.rows}개의 데이터를 저장했습니다.")
+
+    def abort(self):
+        # 중간에 멈췄을 때: 쓰던 임시 파일을 닫고 지웁니다. (이전 크롤링의 <path>는 그대로 남음)
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        logging.info(f"크롤링이 중간에 멈춰 {self.temp_path}를 지웠습니다.")
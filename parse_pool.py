@@ -0,0 +1,70 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from listing_parser import get_parser
+from metrics import metrics
+
+# 워커 프로세스마다 하나씩 만들어 두는 파서
+_parser = None
+
+
+def _init_worker(parser_name):
+    global _parser
+    _parser = get_parser(parser_name)
+
+
+def _parse(data):
+    # 워커 프로세스에서 실행: HTML(UTF-8 바이트) → [(제품명, 가격, 링크), ...]
+    return _parser.parse_products(data.decode("utf-8"))
+
+
+def get_context():
+    # 크롤러는 스레드를 여러 개 띄운 상태이므로 fork 대신 forkserver(없으면 spawn)로 워커를 만듭니다.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class ParsePool:
+    # 목록 HTML 파싱을 별도 프로세스에서 실행합니다. (GIL 때문에 요청/브라우저 제어 스레드와 번갈아 돌지 않도록)
+    #   workers : 워커 프로세스 수
+    #   window  : parse_ordered()에서 한 번에 맡겨둘 페이지 수 (기본값 workers * 2)
+    # 페이지는 UTF-8 바이트로 통째로 보내고(목록만 잘라내려면 여기서 다시 파싱해야 하므로),
+    # 결과는 (제품명, 가격, 링크) 튜플 목록으로만 받아서 프로세스 사이에 오가는 양을 줄입니다.
+    def __init__(self, workers, parser_name="lxml", window=None):
+        self.workers = workers
+        self.window = window or workers * 2
+        self._executor = ProcessPoolExecutor(workers, mp_context=get_context(), initializer=_init_worker,
+                                             initargs=(parser_name,))
+
+    def submit(self, html):
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        return self._executor.submit(_parse, html)
+
+    def parse(self, html):
+        return self.submit(html).result()
+
+    def parse_ordered(self, pages):
+        # pages = (페이지, HTML)을 차례로 내주는 iterable. 앞의 페이지가 파싱되는 동안 다음 페이지를 계속 받아서 맡기고,
+        # 결과는 받은 순서대로 (페이지, 상품 목록)으로 돌려줍니다. 중간에 멈추면 남은 작업은 취소합니다.
+        pending = deque()
+        try:
+            for page, html in pages:
+                pending.append((page, self.submit(html)))
+                # 이미 끝난 앞쪽 결과는 바로 내보내고, 맡겨둔 페이지가 window개가 되면 가장 앞의 결과를 기다립니다.
+                while pending and (len(pending) >= self.window or pending[0][1].done()):
+                    yield self._result(pending.popleft())
+            while pending:
+                yield self._result(pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _result(self, item):
+        page, future = item
+        with metrics.timer("parse_wait_seconds"):
+            return page, future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,144 @@
+import queue
+from itertools import islice
+
+from metrics import metrics
+from product import product_key
+
+_END = object()
+
+
+class StreamClosed(Exception):
+    pass
+
+
+class Deduper:
+    # 이미 나온 상품의 키(pcode, 8바이트 이내의 int)만 기억하고, 처음 나온 상품만 통과시킵니다.
+    #   track_pending : 마지막 체크포인트 이후 새로 들어온 키를 모아둘지 여부
+    #                   (take_pending()을 부르는 쪽이 없으면 끄고, 켜두면 take_pending()이 비워줌)
+    def __init__(self, keys=(), track_pending=False):
+        self.keys = set(keys)
+        self.duplicate = 0
+        self.pending = [] if track_pending else None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, product):
+        return product_key(product.name, product.link) in self.keys
+
+    def filter(self, products):
+        # 처음 나온 상품만 리스트로 돌려줍니다.
+        keys = self.keys
+        pending = self.pending
+        fresh = []
+        for product in products:
+            # parse_pcode()를 상품마다 부르지 않도록 흔한 경우(?pcode=숫자)만 여기서 바로 꺼냅니다.
+            head, found, tail = product[2].partition("?pcode=")
+            pcode = tail.partition("&")[0]
+            if found and pcode.isdigit():
+                key = int(pcode)
+            else:
+                key = product_key(product.name, product.link)
+            if key in keys:
+                self.duplicate += 1
+                continue
+            keys.add(key)
+            if pending is not None:
+                pending.append(key)
+            fresh.append(product)
+        return fresh
+
+    def take_pending(self):
+        pending = self.pending
+        if pending is None:
+            return []
+        self.pending = []
+        return pending
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class PageStream:
+    # 워커 스레드가 페이지별 상품 목록을 넣고, 메인 스레드가 넣은 순서대로 꺼냅니다.
+    # 큐 크기가 정해져 있어서 메인 스레드(싱크)가 늦으면 워커가 기다립니다.
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def put(self, item):
+        while not self.closed:
+            try:
+                self.queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise StreamClosed()
+
+    def feed(self, pages):
+        # 제너레이터의 페이지를 모두 넣고, 제너레이터가 돌려준 값을 그대로 돌려줍니다.
+        while True:
+            try:
+                page = next(pages)
+            except StopIteration as e:
+                return e.value
+            try:
+                self.put(page)
+            except StreamClosed:
+                pages.close()
+                raise
+
+    def finish(self, error=None):
+        try:
+            self.put(_END if error is None else error)
+        except StreamClosed:
+            pass
+
+    def close(self):
+        # 메인 스레드가 더 이상 꺼내지 않을 때 호출해서 기다리는 워커를 풀어줍니다.
+        self.closed = True
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def run_pipeline(pages, deduper, sinks, batch_size, on_commit=None):
+    # 페이지 → 중복 제거 → batch_size개 이상 모이면 싱크로 보냅니다.
+    # pages는 (카테고리 id, 페이지, 상품 목록)을 돌려주고, 배치는 페이지 단위로 끊어서
+    # 커밋할 때마다 on_commit(카테고리 id, 페이지)으로 어디까지 저장됐는지 알려줍니다.
+    count = 0
+    batch = []
+    position = None
+    for cat, page, products in pages:
+        batch.extend(deduper.filter(products))
+        position = (cat, page)
+        if len(batch) >= batch_size:
+            count += _commit(batch, sinks, on_commit, position)
+            batch = []
+    if position is not None:
+        count += _commit(batch, sinks, on_commit, position)
+    return count
+
+
+def _commit(batch, sinks, on_commit, position):
+    if batch:
+        for sink in sinks:
+            with metrics.timer(f"sink_{type(sink).__name__.lower()}_seconds"):
+                sink.write(batch)
+        metrics.incr("batches")
+    if on_commit is not None:
+        with metrics.timer("checkpoint_seconds"):
+            on_commit(*position)
+    return len(batch)
@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime, timedelta
+
+import oracledb
+
+from metrics import metrics
+
+# EQUIP_PRICE_HIST: 크롤링할 때마다 본 가격을 (제품명, 크롤링 시각)으로 쌓기만 하는 테이블
+# Oracle에서는 CRAWLED_AT으로 월별 인터벌 파티션을 나누므로(테이블 관련.sql),
+# 기간 조건이 있는 조회는 최근 파티션만 읽습니다.
+QUERIES = {
+    "oracle": {
+        "insert": """
+            INSERT INTO EQUIP_PRICE_HIST (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, CRAWLED_AT)
+            VALUES (:1, :2, :3, :4)
+        """,
+        # 최근 days일 안에 본 가격 중 제품마다 가장 마지막 값
+        "latest": """
+            SELECT EQUIP_NM, MAX(EQUIP_PRICE) KEEP (DENSE_RANK LAST ORDER BY CRAWLED_AT), MAX(CRAWLED_AT)
+            FROM EQUIP_PRICE_HIST
+            WHERE EQUIP_CATE_NO = :cat AND CRAWLED_AT >= :since
+            GROUP BY EQUIP_NM
+        """,
+        # (EQUIP_NM, CRAWLED_AT) 인덱스를 거꾸로 읽어 첫 행에서 멈춥니다.
+        "product_latest": """
+            SELECT EQUIP_PRICE, CRAWLED_AT FROM EQUIP_PRICE_HIST
+            WHERE EQUIP_NM = :name
+            ORDER BY CRAWLED_AT DESC
+            FETCH FIRST 1 ROWS ONLY
+        """,
+    },
+    "sqlite": {
+        "insert": """
+            INSERT INTO EQUIP_PRICE_HIST (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, CRAWLED_AT)
+            VALUES (?, ?, ?, ?)
+        """,
+        # SQLite는 MAX()와 함께 고른 다른 컬럼을 MAX 값이 있는 행에서 가져옵니다.
+        "latest": """
+            SELECT EQUIP_NM, EQUIP_PRICE, MAX(CRAWLED_AT)
+            FROM EQUIP_PRICE_HIST
+            WHERE EQUIP_CATE_NO = :cat AND CRAWLED_AT >= :since
+            GROUP BY EQUIP_NM
+        """,
+        "product_latest": """
+            SELECT EQUIP_PRICE, CRAWLED_AT FROM EQUIP_PRICE_HIST
+            WHERE EQUIP_NM = :name
+            ORDER BY CRAWLED_AT DESC
+            LIMIT 1
+        """,
+    },
+}
+
+
+def to_db_time(dialect, value):
+    # SQLite에는 날짜 타입이 없으므로 정렬되는 문자열로 저장합니다.
+    return value if dialect == "oracle" else value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def append_prices(db, dialect, cat, products, crawled_at, batch_size=5000):
+    # 배열 DML(executemany)로 batch_size개씩 넣고 한 번에 커밋합니다. 기존 행은 건드리지 않습니다.
+    try:
+        crawled_at = to_db_time(dialect, crawled_at)
+        rows = [(int(cat), product.name, int(product.price), crawled_at) for product in products]
+        query = QUERIES[dialect]["insert"]
+        with metrics.timer("db_history_seconds"):
+            for start in range(0, len(rows), batch_size):
+                if dialect == "oracle":
+                    with db.cursor() as cursor:
+                        cursor.setinputsizes(oracledb.DB_TYPE_NUMBER, 150, oracledb.DB_TYPE_NUMBER,
+                                             oracledb.DB_TYPE_DATE)
+                        cursor.executemany(query, rows[start:start + batch_size])
+                else:
+                    db.execute_many(query, rows[start:start + batch_size])
+            db.commit_transaction()
+        logging.debug(f"가격 이력 {len(rows)}개 추가")
+
+    except Exception as e:
+        logging.error(str(e))
+        logging.info("롤백")
+        db.rollback_transaction()
+        raise
+
+
+def latest_prices(db, dialect, cat_num, days=7, now=None):
+    # 최근 days일 동안 크롤링된 제품의 마지막 가격 {제품명: (가격, 크롤링 시각)}
+    # 증분 모드에서는 바뀐 페이지만 기록되므로 days를 FULL_RESYNC_DAYS 이상으로 잡아야 모든 제품이 나옵니다.
+    now = datetime.now() if now is None else now
+    since = to_db_time(dialect, now - timedelta(days=days))
+    rows = db.execute_query_with_params(QUERIES[dialect]["latest"], {"cat": int(cat_num), "since": since})
+    return {name: (int(price), crawled_at) for name, price, crawled_at in rows}
+
+
+def latest_price(db, dialect, name):
+    # 제품 하나의 마지막 (가격, 크롤링 시각), 이력이 없으면 None
+    rows = db.execute_query_with_params(QUERIES[dialect]["product_latest"], {"name": name})
+    if not rows:
+        return None
+    price, crawled_at = rows[0]
+    return int(price), crawled_at
+
+
+class PriceHistorySink:
+    # 이번 실행에서 본 모든 상품의 가격을 같은 크롤링 시각으로 EQUIP_PRICE_HIST에 추가합니다.
+    # (DbSink와 달리 가격이 그대로인 상품도 기록합니다.)
+    def __init__(self, db, dialect, cat_num, crawled_at, writer=None, batch_size=5000):
+        self.db = db
+        self.dialect = dialect
+        self.cat_num = cat_num
+        self.crawled_at = crawled_at
+        self.writer = writer
+        self.batch_size = batch_size
+        self.count = 0
+
+    def write(self, products):
+        if not products:
+            return
+        self.count += len(products)
+        if self.writer is not None:
+            self.writer.submit(append_prices, self.db, self.dialect, self.cat_num, products, self.crawled_at,
+                               self.batch_size)
+        else:
+            append_prices(self.db, self.dialect, self.cat_num, products, self.crawled_at, self.batch_size)
+
+    def close(self):
+        logging.info(f"가격 이력 {self.count}개 기록")
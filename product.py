@@ -0,0 +1,33 @@
+import hashlib
+from collections import namedtuple
+
+# pcode가 없는 링크는 제품명 해시를 키로 쓰고, pcode와 겹치지 않도록 최상위 비트를 켜둡니다.
+_NAME_KEY_FLAG = 1 << 63
+
+
+def parse_pcode(link):
+    # 상품 링크(https://prod.danawa.com/info/?pcode=1234567&cate=...)에서 pcode를 꺼냅니다.
+    # 상품마다 호출되므로 정규식 대신 문자열 메서드만 사용합니다.
+    head, found, tail = link.partition("pcode=")
+    if not found or head[-1:] not in ("?", "&"):
+        return None
+    pcode = tail.partition("&")[0]
+    return int(pcode) if pcode.isdigit() else None
+
+
+def product_key(name, link):
+    # 중복 확인용 키: 링크의 pcode (없으면 제품명의 63비트 해시)
+    pcode = parse_pcode(link)
+    if pcode is not None:
+        return pcode
+    digest = int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "big")
+    return _NAME_KEY_FLAG | (digest >> 1)
+
+
+class Product(namedtuple("Product", "name price link")):
+    # 인스턴스마다 __dict__를 두지 않는 튜플 기반 레코드
+    # 중복 확인용 키는 들고 다니지 않고 필요한 곳(Deduper 등)에서 product_key()로 계산합니다.
+    __slots__ = ()
+
+    def __str__(self):
+        return f"제품명: {self.name}\n가격: {self.price}\n링크: {self.link}\n"
@@ -0,0 +1,208 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+from fastapi import APIRouter, HTTPException, Query
+
+from product import product_key
+
+_TOKEN = re.compile(r"\w+")
+# 상품 키(pcode 또는 이름 해시)는 64비트 이하의 양수입니다. 가격 범위 검색의 경계값으로 씁니다.
+_MAX_KEY = 1 << 64
+
+
+def tokenize(text):
+    # 소문자로 바꾼 뒤 글자/숫자 덩어리로 나눕니다. ("LG 27GP850-B" → ["lg", "27gp850", "b"])
+    return _TOKEN.findall(text.lower())
+
+
+def merge_sorted(items, new_items):
+    # 정렬된 목록에 새 값들을 넣습니다. 적으면 하나씩 bisect로 끼워 넣고,
+    # 많으면(처음 채울 때) 뒤에 붙여서 한 번에 정렬합니다. (sort()는 목록 전체를 한 번 훑음)
+    if len(new_items) * 64 < len(items):
+        for item in new_items:
+            insort(items, item)
+    elif new_items:
+        items.extend(new_items)
+        items.sort()
+
+
+class CategoryIndex:
+    # 카테고리 하나의 상품 색인입니다.
+    #   items         : 상품 키 → (제품명, 가격, 링크, 세대)
+    #   by_price      : (가격, 키)를 가격 순으로 정렬한 목록 (가격 범위는 bisect로 찾음)
+    #   tokens        : 제품명 토큰 → 그 토큰이 들어간 상품 키 집합
+    #   sorted_tokens : 토큰을 정렬한 목록 (접두어로 시작하는 토큰을 bisect로 찾음)
+    # 세대(generation)는 크롤링마다 하나씩 올라가고, 끝날 때 이번 크롤링에서 보이지 않은 상품을 지웁니다.
+    def __init__(self):
+        self.items = {}
+        self.by_price = []
+        self.tokens = {}
+        self.sorted_tokens = []
+        self.generation = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def update(self, batch):
+        # batch = {키: (제품명, 가격, 링크)}. 가격이나 이름이 바뀐 상품만 정렬 목록을 고칩니다.
+        new_prices = []
+        new_tokens = []
+        for key, (name, price, link) in batch.items():
+            old = self.items.get(key)
+            if old is not None:
+                if old[:3] == (name, price, link):
+                    self.items[key] = (name, price, link, self.generation)
+                    continue
+                self._remove(key)
+            self.items[key] = (name, price, link, self.generation)
+            new_prices.append((price, key))
+            for token in set(tokenize(name)):
+                keys = self.tokens.get(token)
+                if keys is None:
+                    keys = self.tokens[token] = set()
+                    new_tokens.append(token)
+                keys.add(key)
+        merge_sorted(self.by_price, new_prices)
+        merge_sorted(self.sorted_tokens, new_tokens)
+
+    def _remove(self, key):
+        name, price, link, _ = self.items.pop(key)
+        del self.by_price[bisect_left(self.by_price, (price, key))]
+        for token in set(tokenize(name)):
+            keys = self.tokens[token]
+            keys.discard(key)
+            if not keys:
+                del self.tokens[token]
+                del self.sorted_tokens[bisect_left(self.sorted_tokens, token)]
+
+    def prune(self):
+        stale = [key for key, item in self.items.items() if item[3] < self.generation]
+        for key in stale:
+            self._remove(key)
+        return len(stale)
+
+    def price_range(self, min_price=None, max_price=None):
+        # by_price에서 가격이 [min_price, max_price]인 구간의 시작과 끝 위치
+        start = 0 if min_price is None else bisect_left(self.by_price, (min_price, -1))
+        end = len(self.by_price) if max_price is None else bisect_right(self.by_price, (max_price, _MAX_KEY))
+        return start, max(start, end)
+
+    def prefix_keys(self, prefix):
+        # prefix로 시작하는 토큰이 들어간 상품 키
+        keys = set()
+        position = bisect_left(self.sorted_tokens, prefix)
+        while position < len(self.sorted_tokens) and self.sorted_tokens[position].startswith(prefix):
+            keys |= self.tokens[self.sorted_tokens[position]]
+            position += 1
+        return keys
+
+    def match(self, query_tokens):
+        # 검색어의 모든 토큰이 (접두어로) 들어간 상품 키
+        matched = None
+        for token in query_tokens:
+            keys = self.prefix_keys(token)
+            matched = keys if matched is None else matched & keys
+            if not matched:
+                return set()
+        return matched or set()
+
+
+class ProductIndex:
+    # 최근 크롤링 결과를 카테고리별로 메모리에 들고 있는 색인입니다.
+    # 크롤링 스레드가 페이지(배치)마다 update()로 고치고, API는 같은 객체에서 바로 읽습니다.
+    #   begin(카테고리) → update(카테고리, 상품들) … → finish(카테고리)
+    # finish()는 이번 크롤링에서 보이지 않은 상품을 지웁니다. 크롤링이 중간에 멈추면 부르지 않으므로 이전 결과가 남습니다.
+    def __init__(self):
+        self.categories = {}
+        self._lock = threading.Lock()
+
+    def _category(self, cate_name):
+        category = self.categories.get(cate_name)
+        if category is None:
+            category = self.categories[cate_name] = CategoryIndex()
+        return category
+
+    def begin(self, cate_name):
+        with self._lock:
+            self._category(cate_name).generation += 1
+
+    def update(self, cate_name, products):
+        # products는 name, price, link를 가진 객체
+        batch = {}
+        for product in products:
+            batch[product_key(product.name, product.link)] = (product.name, int(product.price), product.link)
+        with self._lock:
+            self._category(cate_name).update(batch)
+
+    def finish(self, cate_name):
+        with self._lock:
+            return self._category(cate_name).prune()
+
+    def counts(self):
+        with self._lock:
+            return {cate_name: len(category) for cate_name, category in self.categories.items()}
+
+    def by_price(self, cate_name, min_price=None, max_price=None, offset=0, limit=50, descending=False):
+        # 가격 범위 안의 상품을 가격 순으로 offset부터 limit개 돌려줍니다. (전체 개수, 상품 목록)
+        with self._lock:
+            category = self.categories.get(cate_name)
+            if category is None:
+                return None
+            start, end = category.price_range(min_price, max_price)
+            if descending:
+                stop = max(start, end - offset)
+                keys = [key for _, key in reversed(category.by_price[max(start, stop - limit):stop])]
+            else:
+                keys = [key for _, key in category.by_price[start + offset:min(end, start + offset + limit)]]
+            return end - start, [self._item(cate_name, category, key) for key in keys]
+
+    def search(self, query, cate_name=None, offset=0, limit=50):
+        # 제품명에 검색어의 모든 토큰이 (접두어로) 들어간 상품을 가격 순으로 돌려줍니다. (전체 개수, 상품 목록)
+        query_tokens = tokenize(query)
+        with self._lock:
+            names = [cate_name] if cate_name is not None else list(self.categories)
+            matches = []
+            for name in names:
+                category = self.categories.get(name)
+                if category is None or not query_tokens:
+                    continue
+                for key in category.match(query_tokens):
+                    matches.append((category.items[key][1], name, key))
+            matches.sort()
+            return len(matches), [self._item(name, self.categories[name], key)
+                                  for _, name, key in matches[offset:offset + limit]]
+
+    def _item(self, cate_name, category, key):
+        name, price, link, _ = category.items[key]
+        return {"category": cate_name, "name": name, "price": price, "link": link}
+
+
+def get_product_router(index):
+    # GET /products                         카테고리별 상품 수
+    # GET /products/search?q=&category=     제품명 검색 (가격 순)
+    # GET /products/{category}?min_price=&max_price=&order=asc|desc
+    # 목록은 모두 offset, limit(최대 200)으로 나눠서 받습니다.
+    router = APIRouter(prefix="/products")
+
+    @router.get("")
+    async def product_counts():
+        return index.counts()
+
+    @router.get("/search")
+    async def search_products(q: str = Query(..., min_length=1), category: str | None = None,
+                              offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+        total, items = index.search(q, category, offset, limit)
+        return {"total": total, "offset": offset, "limit": limit, "items": items}
+
+    @router.get("/{category}")
+    async def products_by_price(category: str, min_price: int | None = None, max_price: int | None = None,
+                                order: str = Query("asc", pattern="^(asc|desc)$"),
+                                offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+        result = index.by_price(category, min_price, max_price, offset, limit, order == "desc")
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"{category} 카테고리가 없습니다.")
+        total, items = result
+        return {"total": total, "offset": offset, "limit": limit, "items": items}
+
+    return router
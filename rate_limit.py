@@ -0,0 +1,78 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    # 초당 rate개의 토큰이 채워지고 최대 burst개까지 쌓이는 토큰 버킷
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # 토큰이 생길 때까지 기다린 뒤 하나를 사용합니다.
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class HostRateLimiter:
+    # 호스트마다 별도의 토큰 버킷을 두고 모든 워커가 같이 사용합니다.
+    # rate가 0 이하이면 제한하지 않습니다.
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        if self.rate <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+        bucket.acquire()
+
+
+class AdaptiveHostRateLimiter(HostRateLimiter):
+    # 오류가 나면 그 호스트의 초당 요청 수를 절반으로 줄이고(최소 min_rate),
+    # 성공할 때마다 처음 값(rate)까지 조금씩 다시 올립니다. (AIMD)
+    def __init__(self, rate, burst=1, min_rate=0.5, step=None):
+        super().__init__(rate, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else min_rate
+        self.step = step if step is not None else rate / 20
+
+    def _bucket(self, url):
+        if self.rate <= 0:
+            return None
+        host = urlsplit(url).netloc
+        with self._lock:
+            return self._buckets.get(host)
+
+    def slow_down(self, url):
+        bucket = self._bucket(url)
+        if bucket is not None:
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            return bucket.rate
+
+    def speed_up(self, url):
+        bucket = self._bucket(url)
+        if bucket is not None and bucket.rate < self.rate:
+            bucket.rate = min(self.rate, bucket.rate + self.step)
+
+    def current_rate(self, url):
+        bucket = self._bucket(url)
+        return bucket.rate if bucket is not None else self.rate
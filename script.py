@@ -1,21 +1,44 @@
+import argparse
 import csv
 import logging
 import math
 import os
-import re
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain, islice
 
-import oracledb
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.select import Select
-from selenium.webdriver.support.wait import WebDriverWait
 from tqdm import tqdm
 
+from bulk_writer import BulkMergeWriter
+from catalog import CATALOG_PATH, CATALOG_STATE_PATH, Catalog
+from checkpoint import Checkpoint
+from driver_pool import DriverPool, block_resources, get_blocked_urls
+from fetch_policy import CircuitBreaker, FetchPolicy, RetryPolicy
+from fetcher import AJAX_URL, LIST_COUNT, LIST_URL, HttpListingFetcher, SeleniumListingFetcher, get_fetcher
+from incremental import KnownProducts, get_known_products, update_state
+from listing_parser import get_parser, get_product_fields
+from metrics import metrics
+from oracle_pool import AsyncDBWriter, PooledOracleDB
+from page_cache import PAGE_CACHE_DIR, PageCache
+from parquet_sink import ParquetSink, parquet_available
+from parse_pool import ParsePool
+from pipeline import Deduper, PageStream, StreamClosed, run_pipeline
+from price_history import PriceHistorySink
+from product import Product
+from rate_limit import AdaptiveHostRateLimiter
+from sinks import CsvSink, OracleSink, SqliteSink, StateSink, read_csv_products
+from sqlite_db import SQLITE_PATH, SqliteDB
+from work_queue import WORK_QUEUE_PATH, WorkQueue
+
 # 환경변수 파일을 읽어옵니다.
 if "GITHUB_ACTIONS" in os.environ:
     # GitHub Actions에서 실행 중인 경우, Secrets를 사용하여 환경 변수 로드
@@ -43,93 +66,102 @@ else:
 if log_level in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
     log_level = getattr(logging, log_level)
 
-
+# 목록을 가져오는 방식: "http"(기본값), "selenium" 또는 "replay"(페이지 캐시에 저장된 목록만 사용, 네트워크 요청 없음)
+fetch_backend = os.getenv("FETCH_BACKEND", "http")
+# HTTP 백엔드가 요청할 다나와 목록/AJAX 주소 (테스트에서는 bench/replay_server.py 주소)
+list_url = os.getenv("LIST_URL", LIST_URL)
+ajax_url = os.getenv("AJAX_URL", AJAX_URL)
+# HTTP 백엔드가 받은 목록 페이지를 PAGE_CACHE_DIR에 저장해두고 PAGE_CACHE_TTL초 동안은 다시 요청하지 않음
+# (지나면 ETag/Last-Modified로 확인). 전체 크기가 PAGE_CACHE_MAX_MB를 넘으면 오래 쓰지 않은 페이지부터 지움
+page_cache = os.getenv("PAGE_CACHE", "0") == "1"
+page_cache_dir = os.getenv("PAGE_CACHE_DIR", PAGE_CACHE_DIR)
+page_cache_ttl = float(os.getenv("PAGE_CACHE_TTL", "3600"))
+page_cache_max_mb = float(os.getenv("PAGE_CACHE_MAX_MB", "512"))
+# 동시에 크롤링할 카테고리 id 수와 호스트별 초당 요청 수 (0이면 제한 없음)
+crawl_concurrency = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+rate_limit_per_host = float(os.getenv("RATE_LIMIT_PER_HOST", "5"))
+# 요청이 실패하면 호스트별 속도를 절반씩(최소 RATE_LIMIT_MIN) 줄였다가 성공할 때마다 다시 올립니다.
+rate_limit_min = float(os.getenv("RATE_LIMIT_MIN", "0.5"))
+# 시간 초과/연결 오류/5xx/429는 지수 백오프(BACKOFF_BASE초부터 최대 BACKOFF_CAP초, jitter)로 FETCH_RETRIES번까지 재시도
+fetch_retries = int(os.getenv("FETCH_RETRIES", "4"))
+backoff_base = float(os.getenv("BACKOFF_BASE", "0.5"))
+backoff_cap = float(os.getenv("BACKOFF_CAP", "30"))
+# 최근 요청 중 BREAKER_THRESHOLD 이상이 실패하면 BREAKER_COOLDOWN초 동안 그 호스트로의 요청을 멈춤
+breaker_threshold = float(os.getenv("BREAKER_THRESHOLD", "0.5"))
+breaker_cooldown = float(os.getenv("BREAKER_COOLDOWN", "30"))
+# 카테고리별 재시도/속도 설정은 카탈로그(categories.json)의 "fetch" 항목에 적습니다.
+# 한 카테고리 안에서 동시에 요청할 페이지 수 (HTTP 백엔드에서만 사용)
+page_concurrency = int(os.getenv("PAGE_CONCURRENCY", "4"))
+# 크롤링할 카테고리 목록(우선순위, 갱신 주기, 동시 요청 수)과 카테고리별 마지막 크롤링 시각을 남길 파일
+catalog_path = os.getenv("CATALOG", CATALOG_PATH)
+catalog_state_path = os.getenv("CATALOG_STATE", CATALOG_STATE_PATH)
+# 목록 HTML 파서: "lxml"(기본값) 또는 "soup"(BeautifulSoup 기준 구현)
+listing_parser = get_parser(os.getenv("LISTING_PARSER", "lxml"))
+# 목록 HTML을 파싱할 프로세스 수 (0이면 요청하는 스레드에서 바로 파싱)
+parse_workers = int(os.getenv("PARSE_WORKERS", "0"))
+# 증분 크롤링: 이미 저장된 상품(db 또는 file)만 나오는 페이지에서 멈추고, FULL_RESYNC_DAYS마다 전체 동기화
+incremental = os.getenv("INCREMENTAL", "0") == "1"
+known_source = os.getenv("KNOWN_SOURCE", "db")
+full_resync_days = float(os.getenv("FULL_RESYNC_DAYS", "7"))
+# 싱크로 한 번에 보내는 상품 수, 카테고리 id마다 미리 받아둘 수 있는 페이지 수
+sink_batch_size = int(os.getenv("SINK_BATCH_SIZE", "500"))
+stream_buffer = int(os.getenv("STREAM_BUFFER", "4"))
+# DB에 저장된 값과 같은 상품은 쓰지 않음 (기본값 1)
+skip_unchanged = os.getenv("SKIP_UNCHANGED", "1") == "1"
+# 저장소: "oracle"(기본값) 또는 "sqlite"(Oracle 없이 로컬 파일 SQLITE_PATH에 저장)
+storage = os.getenv("STORAGE", "oracle")
+sqlite_path = os.getenv("SQLITE_PATH", SQLITE_PATH)
+# CSV와 함께 data/<카테고리>.parquet도 쓰기 (pyarrow 필요, 기본값 0). 압축: zstd(기본값), snappy, gzip, none
+parquet_export = os.getenv("PARQUET", "0") == "1"
+parquet_compression = os.getenv("PARQUET_COMPRESSION", "zstd")
+# 단계별 소요 시간과 개수를 METRICS_DIR에 metrics.json / metrics.prom으로 남기기 (기본값 0)
+metrics.enabled = os.getenv("METRICS", "0") == "1"
+metrics_dir = os.getenv("METRICS_DIR", "data")
+# 크롤링할 때마다 본 가격을 EQUIP_PRICE_HIST에 쌓기 (기본값 0)
+price_history = os.getenv("PRICE_HISTORY", "0") == "1"
+# DB 저장 방식: "merge"(기본값, 행마다 MERGE) 또는 "bulk"(EQUIPMENTS_STAGE에 적재 후 MERGE 한 번)
+db_writer = os.getenv("DB_WRITER", "merge")
+db_batch_size = int(os.getenv("DB_BATCH_SIZE", "5000"))
+# DB 커넥션 풀 크기와 커넥션마다 캐시할 문장 수
+db_pool_min = int(os.getenv("DB_POOL_MIN", "1"))
+db_pool_max = int(os.getenv("DB_POOL_MAX", "4"))
+db_stmt_cache = int(os.getenv("DB_STMT_CACHE", "50"))
+# DB 쓰기를 별도 스레드에서 실행 (기본값 0), 쓰기 스레드에 쌓아둘 수 있는 배치 수
+db_async = os.getenv("DB_ASYNC", "0") == "1"
+db_queue_size = int(os.getenv("DB_QUEUE_SIZE", "8"))
+# 분산 크롤링(--role coordinator/worker/merge)에서 같이 쓰는 작업 큐 파일, 워커가 한 번에 빌릴 작업(페이지) 수,
+# 임대 시간(초, 지나면 다른 워커가 다시 가져감), 작업 하나를 최대 몇 번까지 시도할지
+work_queue_path = os.getenv("WORK_QUEUE", WORK_QUEUE_PATH)
+work_lease_batch = int(os.getenv("WORK_LEASE_BATCH", "4"))
+work_lease_seconds = float(os.getenv("WORK_LEASE_SECONDS", "120"))
+work_max_attempts = int(os.getenv("WORK_MAX_ATTEMPTS", "5"))
+# 브라우저 하나로 읽을 최대 페이지 수(넘으면 새 브라우저로 교체)와 브라우저에서 막을 리소스(images, fonts, css)
+driver_max_pages = int(os.getenv("DRIVER_MAX_PAGES", "300"))
+blocked_urls = get_blocked_urls(os.getenv("BLOCK_RESOURCES", "images,fonts"))
 
 logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class OracleDB:
-    def __init__(self):
-        self._conn = None
-
-    def start(self):
-        # Oracle 데이터베이스에 연결합니다.
-        # env파일에서 데이터베이스 정보를 읽어옵니다.
-        dsn = oracledb.makedsn(host=host, port=int(port), service_name=service_name)
-        self._conn = oracledb.connect(
-            user=user,
-            password=password,
-            dsn=dsn,
-        )
-
-    def stop(self):
-        # 연결을 닫습니다.
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
-
-    def execute_query(self, query):
-        # 쿼리를 실행하고 결과를 반환합니다.
-        cursor = self._conn.cursor()
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        return rows
-
-    def execute_insert(self, query, values):
-        # INSERT 쿼리를 실행하고 커밋합니다.
-        cursor = self._conn.cursor()
-        cursor.execute(query, values)
-        # self._conn.commit()
-    
-    def commit(self):
-        self._conn.commit()
-    
-    def execute_many(self, query, values_list):
-        cursor = self._conn.cursor()
-        cursor.executemany(query, values_list)
-        return cursor.rowcount
-
-    def begin_transaction(self):
-        # 새로운 데이터베이스 트랜잭션을 시작합니다.
-        self._conn.begin()
-
-    def commit_transaction(self):
-        # 현재의 데이터베이스 트랜잭션을 커밋합니다.
-        self.commit()
-
-    def rollback_transaction(self):
-        # 현재의 데이터베이스 트랜잭션을 롤백합니다.
-        self._conn.rollback()
-
-    def execute_query_with_params(self, query, params=None):
-        # 파라미터를 사용하여 쿼리를 실행합니다.
-        # 쿼리 문자열에는 파라미터를 나타내는 플레이스홀더를 포함해야 합니다.
-        # params 매개변수에는 파라미터 값을 담은 딕셔너리를 전달해야 합니다.
-        # 결과를 반환합니다.
-        cursor = self._conn.cursor()
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        return rows
-
-
-oracle_db = OracleDB()
-
-
-class Product:
-    def __init__(self, name, price, link):
-        self.name = name
-        self.price = price
-        self.link = link
-
-    def __hash__(self):
-        return hash((self.name))
-
-    def __eq__(self, other):
-        if isinstance(other, Product):
-            return self.name == other.name
-        return False
-    
-    def __str__(self):
-        return f"제품명: {self.name}\n가격: {self.price}\n링크: {self.link}\n"
+catalog = Catalog.load(catalog_path, catalog_state_path)
+if os.getenv("CATEGORY_POLICY"):
+    logging.warning("CATEGORY_POLICY는 더 이상 사용하지 않습니다. categories.json의 \"fetch\" 항목으로 옮겨주세요.")
+
+
+def get_db():
+    if storage == "sqlite":
+        logging.info(f"SQLite({sqlite_path})에 저장합니다.")
+        return SqliteDB(sqlite_path)
+    return PooledOracleDB(user, password, host, port, service_name, db_pool_min, db_pool_max, db_stmt_cache)
+
+
+db = get_db()
+bulk_writer = BulkMergeWriter(db, db_batch_size)
+
+
+def get_db_sink(cat_num, snapshot, writer):
+    # 저장소에 맞는 DB 싱크를 만듭니다. (bulk 방식은 Oracle의 스테이징 테이블을 사용하므로 Oracle에서만)
+    if storage == "sqlite":
+        return SqliteSink(db, cat_num, skip_unchanged, snapshot, writer, db_batch_size)
+    return OracleSink(db, cat_num, bulk_writer if db_writer == "bulk" else None, skip_unchanged, snapshot, writer)
 
 
 def get_webdriver():
@@ -142,231 +174,538 @@ def get_webdriver():
     options.add_argument('--log-level=3')  # 로그 레벨 설정 (3: 경고 메시지만 표시)
     options.add_argument('--disable-gpu')  # GPU 사용 비활성화
     service = Service(executable_path=r'/usr/bin/chromedriver')
-    return webdriver.Chrome(service=service, options=options)
+    driver = webdriver.Chrome(service=service, options=options)
+    # 상품 이미지, 폰트 등은 목록을 읽는 데 필요 없으므로 받지 않습니다.
+    block_resources(driver, blocked_urls)
+    return driver
+
+
+# 페이지당 상품 수 히스토그램 구간 (한 페이지 최대 LIST_COUNT개)
+PRODUCTS_BUCKETS = (0, 10, 30, 60, 89, LIST_COUNT)
 
 
 def get_product_info(product):
-    name = product.select_one('p.prod_name > a').text.strip()
-    price_element = product.select_one('p.price_sect > a > strong')
-    price_text = price_element.text.strip()
-    price_text = remove_comma(price_text)
-    price = int(price_text) if price_text.isdigit() else 0
-    link = product.select_one('p.prod_name > a')['href'].strip()
-    return Product(name, price, link)
+    return Product(*get_product_fields(product))
 
-def remove_comma(price_text):
-    return re.sub(r"[^\d]", "", price_text)
 
+def parse_page(html, parse_pool=None):
+    # HTML → [(제품명, 가격, 링크), ...]
+    if parse_pool is not None:
+        return parse_pool.parse(html)
+    with metrics.timer("parse_page_seconds"):
+        return listing_parser.parse_products(html)
 
-def write_product_info(cat, file, products):
-    try:
-        values = [
-        {
-            'equip_cate_no': int(cat),
-            'equip_nm': product.name,
-            'equip_price': int(product.price),
-            'equip_link': product.link
-        } for product in products]
-        logging.info(f"{len(values)}개의 데이터를 삽입합니다.")
-        query = """
-            MERGE INTO EQUIPMENTS t
-            USING (SELECT :EQUIP_CATE_NO AS EQUIP_CATE_NO, :EQUIP_NM AS EQUIP_NM, :EQUIP_PRICE AS EQUIP_PRICE, :EQUIP_LINK AS EQUIP_LINK FROM dual) s
-            ON (t.EQUIP_NM = s.EQUIP_NM)
-            WHEN MATCHED THEN 
-                UPDATE SET 
-                EQUIP_PRICE = s.EQUIP_PRICE,
-                EQUIP_LINK = s.EQUIP_LINK
-            WHEN NOT MATCHED THEN 
-                INSERT (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK) 
-                VALUES (s.EQUIP_CATE_NO, s.EQUIP_NM, s.EQUIP_PRICE, s.EQUIP_LINK)
-        """
-        result = oracle_db.execute_many(query, values)
-        oracle_db.commit_transaction()
-        logging.info(f"{result}개의 데이터가 삽입되었습니다.")
 
-    except Exception as e:
-        logging.error(str(e))
-        logging.info("롤백")
-        oracle_db.rollback_transaction()
-    
-    for product in products:
-        file.write(f"{product.name},")
-        file.write(f"{product.price},")
-        file.write(f"{product.link}\n")
+def parse_pages(pages, parse_pool=None):
+    # (페이지, HTML) → (페이지, [(제품명, 가격, 링크), ...])
+    # 파싱 프로세스 풀이 있으면 그쪽에 맡기고(순서는 그대로), 없으면 이 스레드에서 바로 파싱합니다.
+    if parse_pool is not None:
+        yield from parse_pool.parse_ordered(pages)
+        return
+    for page, html in pages:
+        yield page, parse_page(html)
 
 
-def crawl_products(driver, products, url):
-    page = 1
-    total_products = 0
+def select_products(cate, pages, known=None, pbar=None):
+    # (페이지, 파싱 결과) → (카테고리 id, 페이지, 상품 목록). 링크가 /로 시작하는 상품은 뺍니다.
+    # 빈 페이지나 (증분 모드) 이미 저장된 상품만 있는 페이지에서 멈춥니다.
     start_with_slash = 0
-    duplicate = 0
+    count = 0
+    for page, rows in pages:
+        metrics.incr("pages")
+        metrics.observe("products_per_page", len(rows), PRODUCTS_BUCKETS)
+        if not rows:
+            break
+        # 증분 모드: 페이지 전체가 이미 저장된 상품이고 가격도 같다면 여기서 멈춥니다.
+        if known is not None and known.page_is_known(rows):
+            logging.info("이미 저장된 상품만 있는 페이지에 도달하여 크롤링을 멈춥니다.")
+            break
+        products = []
+        for name, price, link in rows:
+            if link.startswith('/'):
+                start_with_slash += 1
+                continue
+            products.append(Product(name, price, link))
+        count += len(products)
+        metrics.incr("products", len(products))
+        if pbar is not None:
+            pbar.update(len(products))
+        yield cate, page, products
+    metrics.incr("slash_links", start_with_slash)
+    logging.info(f"{count}개의 데이터 수집 완료, {start_with_slash}개의 데이터는 제외")
+
+
+def crawl_pages(fetcher, cate, known=None, start_page=1, parse_pool=None, concurrency=None):
+    # fetch → parse 단계: 페이지마다 (카테고리 id, 페이지, 상품 목록)을 하나씩 돌려줍니다.
+    # 정상적으로 끝나면 True, 오류로 중단되면 False를 돌려줍니다. (yield from 으로 받을 수 있음)
+    total_products = 0
     pbar = None
+    url = list_url + str(cate)
 
-    while True:
-        try:
-            wait = WebDriverWait(driver, 100)
-            wait.until(EC.invisibility_of_element_located(
-                (By.CSS_SELECTOR, '#danawa_container > div.product_list_cover > div > img')))
-            new_html = driver.page_source
-            new_soup = BeautifulSoup(new_html, 'html.parser')
-            if total_products == 0:
-                total_products = int(remove_comma(new_soup.select_one(
-                    '#danawa_content > div.product_list_wrap > div.product_list_area > div.prod_list_tab > ul > li.tab_item.selected > a > strong.list_num').text.strip()))
-                logging.info(f"총 상품 개수는 {total_products}개 입니다.")
-            select_elements = new_soup.select('div.main_prodlist > ul.product_list > li.prod_item > div.prod_main_info')
-            if math.ceil(total_products / 90) == page:
-                break
-            if pbar is None:
-                pbar = tqdm(total=total_products, desc="Processing", unit="product")
-            for product_element in select_elements:
-                product = get_product_info(product_element)
-                size_before = len(products)
-                if product.link.startswith('/'):
-                    start_with_slash += 1
-                    continue
-                products.add(product)
-                size_after = len(products)
-                if size_before == size_after:
-                    duplicate += 1
-                logging.debug(f"size_before: {size_before}, size_after: {size_after}")
-                pbar.update(1)
-            page += 1
-            driver.execute_script(f"javascript:movePage({page});")
-        except Exception as e:
-            logging.error(str(e))
-            # 오류가 발생한 url 표시
-            logging.error(f"오류가 발생한 url: {url}")
-            logging.error("크롤링 중 비정상적인 오류로 인한 종료")
-            return
-    if pbar is not None:
-        pbar.close()
-    logging.info(f"현재까지 {len(products)}개의 데이터 수집 완료, {start_with_slash}개의 데이터는 제외, {duplicate}개의 중복 데이터는 제외")
-
-
-class Product:
-    def __init__(self, name, price, link):
-        self.name = name
-        self.price = price
-        self.link = link
-
-    def __hash__(self):
-        return hash((self.name))
-
-    def __eq__(self, other):
-        if isinstance(other, Product):
-            return self.name == other.name
+    try:
+        new_html = fetcher.open_category(cate)
+        total_products = listing_parser.parse_total_products(new_html)
+        logging.info(f"총 상품 개수는 {total_products}개 입니다.")
+        last_page = math.ceil(total_products / LIST_COUNT)
+        pbar = tqdm(total=total_products, desc="Processing", unit="product")
+        pages = parse_pages(iter_pages(fetcher, last_page, start_page, concurrency), parse_pool)
+        yield from select_products(cate, pages, known, pbar)
+    except Exception as e:
+        metrics.incr("crawl_errors")
+        logging.error(str(e))
+        # 오류가 발생한 url 표시
+        logging.error(f"오류가 발생한 url: {url}")
+        logging.error("크롤링 중 비정상적인 오류로 인한 종료")
         return False
-
-    def __str__(self):
-        return f"제품명: {self.name}\n가격: {self.price}\n링크: {self.link}\n"
-
-
-def remove_comma(price_text):
-    return re.sub(r"[^\d]", "", price_text)
-
-
-def get_product_info(product):
-    name = product.select_one('p.prod_name > a').text.strip()
-    price_element = product.select_one('p.price_sect > a > strong')
-    price_text = price_element.text.strip()
-    price_text = remove_comma(price_text)
-    price = int(price_text) if price_text.isdigit() else 0
-    link = product.select_one('p.prod_name > a')['href'].strip()
-    return Product(name, price, link)
+    finally:
+        if pbar is not None:
+            pbar.close()
+    return True
 
 
-def write_product_info(cat, file, products):
+def iter_pages(fetcher, last_page, start_page=1, concurrency=None):
+    # start_page부터 last_page까지 (페이지, HTML)을 페이지 순서대로 돌려줍니다.
+    # HTTP 백엔드는 그다음 페이지부터 concurrency개(없으면 page_concurrency개)씩 동시에 요청하고,
+    # 결과는 순서대로 다시 맞춥니다.
+    concurrency = concurrency or page_concurrency
+    if last_page < start_page:
+        return
+    yield start_page, fetcher.fetch_page(start_page)
+    if concurrency <= 1 or not fetcher.parallel_pages:
+        for page in range(start_page + 1, last_page + 1):
+            yield page, fetcher.fetch_page(page)
+        return
+    # 앞서 요청하는 페이지 수를 concurrency개로 제한해서, 중간에 멈추면 나머지는 요청하지 않습니다.
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pages = iter(range(start_page + 1, last_page + 1))
+        pending = deque((page, executor.submit(fetcher.fetch_page, page)) for page in islice(pages, concurrency))
+        while pending:
+            page, future = pending.popleft()
+            new_html = future.result()
+            for next_page in islice(pages, 1):
+                pending.append((next_page, executor.submit(fetcher.fetch_page, next_page)))
+            yield page, new_html
+
+
+class CrawlWorkers:
+    # 워커 스레드마다 자기 fetcher(HTTP 세션 또는 브라우저)를 따로 만들어 사용합니다.
+    # 브라우저는 driver_pool에서 빌려오고 close()할 때 돌려줍니다.
+    # 페이지 캐시(cache)와 파싱 프로세스 풀(parse_pool)은 모든 워커가 같이 씁니다.
+    def __init__(self, backend, policy, driver_pool, cache=None, parse_pool=None):
+        self.backend = backend
+        self.policy = policy
+        self.driver_pool = driver_pool
+        self.cache = cache
+        self.parse_pool = parse_pool
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def _get(self, name, factory):
+        opened = getattr(self._local, name, None)
+        if opened is None:
+            opened = factory()
+            setattr(self._local, name, opened)
+            with self._lock:
+                self._opened.append(opened)
+        return opened
+
+    def fetcher(self):
+        return self._get("fetcher", lambda: get_fetcher(self.backend, self.driver_pool, self.policy, self.cache,
+                                                          list_url, ajax_url))
+
+    def fallback(self):
+        return self._get("fallback", lambda: SeleniumListingFetcher(self.driver_pool, self.policy))
+
+    def crawl(self, cate_name, cat, known, stream, start_page=1, concurrency=None):
+        # 페이지가 파싱되는 대로 stream에 넣습니다. 메인 스레드가 순서대로 꺼내 싱크로 보냅니다.
+        # 마지막 페이지까지 읽었으면 True, 중간에 멈췄으면 False를 돌려줍니다. (메인 스레드가 future로 받음)
+        try:
+            logging.info(f"{cate_name}카테고리({cat})의 데이터 크롤링 시작")
+            fetcher = self.fetcher()
+            ok = stream.feed(crawl_pages(fetcher, cat, known, start_page, self.parse_pool, concurrency))
+            if not ok and isinstance(fetcher, HttpListingFetcher):
+                # HTTP 백엔드가 실패하면 Selenium으로 다시 시도합니다. (이미 받은 상품은 중복 제거 단계에서 걸러짐)
+                logging.info("Selenium 백엔드로 다시 시도합니다.")
+                ok = stream.feed(crawl_pages(self.fallback(), cat, known, start_page, self.parse_pool))
+        except StreamClosed:
+            return False
+        except Exception as e:
+            stream.finish(e)
+            return False
+        stream.finish()
+        return ok
+
+    def work(self, queue, worker, poll=1.0):
+        # 분산 크롤링 워커: 큐에서 (카테고리 id, 페이지) 작업을 빌려 받아오고, 파싱 결과를 큐에 돌려줍니다.
+        # 실패한 작업은 큐로 되돌려서 다음 임대 때 (다른 워커가) 다시 시도합니다.
+        # 코디네이터가 작업을 다 넣었고 남은 작업이 없으면 끝납니다.
+        fetcher = self.fetcher()
+        opened = None
+        while True:
+            items = queue.lease(worker, work_lease_batch)
+            if not items:
+                if queue.finished():
+                    return
+                time.sleep(poll)
+                continue
+            for index, item in enumerate(items):
+                try:
+                    if opened != item.cat:
+                        opened = None
+                        fetcher.open_category(item.cat)
+                        opened = item.cat
+                    rows = parse_page(fetcher.fetch_page(item.page), self.parse_pool)
+                except Exception as e:
+                    metrics.incr("crawl_errors")
+                    logging.error(f"카테고리 id {item.cat}의 {item.page}페이지 실패 ({item.attempts}번째): {e}")
+                    # 브라우저나 세션 상태를 알 수 없으므로 다음 작업에서 카테고리를 다시 엽니다.
+                    opened = None
+                    queue.fail(item, worker, e)
+                    continue
+                queue.complete(item, worker, rows)
+                metrics.incr("pages")
+                if index + 1 < len(items):
+                    queue.renew(items[index + 1:], worker)
+
+    def close(self):
+        for opened in self._opened:
+            opened.close()
+
+
+def open_csv(cate_name, offset=0):
+    # 현재 위치 밑에 있는 폴더 'data'에 csv 파일을 생성
+    # 해당 폴더를 윈도우, 리눅스 어떤 환경에서도 사용할 수 있도록 함
+    # 폴더가 없으면 생성
+    if not os.path.exists("data"):
+        os.mkdir("data")
+    path = f"data/{cate_name}.csv"
+    # 이어서 크롤링할 때는 마지막 체크포인트 이후에 쓰인 줄을 잘라내고 뒤에 이어서 씁니다.
+    if offset > 0 and os.path.exists(path):
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+        return open(path, "a", encoding="utf-8-sig", newline="")
+    f = open(path, "w", encoding="utf-8-sig", newline="")
+    writer = csv.writer(f)
+    writer.writerow(["제품명", "가격", "링크"])
+    return f
+
+
+def get_fetch_policy():
+    # 모든 워커가 같은 호스트별 속도 제한과 서킷 브레이커를 공유합니다.
+    return FetchPolicy(
+        AdaptiveHostRateLimiter(rate_limit_per_host, min_rate=rate_limit_min),
+        RetryPolicy(fetch_retries, backoff_base, backoff_cap),
+        lambda: CircuitBreaker(threshold=breaker_threshold, cooldown=breaker_cooldown),
+        catalog.fetch_overrides(),
+    )
+
+
+def run_coordinator(queue, resume=False, categories=None):
+    # 분산 크롤링 코디네이터: 카테고리 id마다 목록을 열어 총 상품 개수를 읽고 (카테고리 id, 페이지) 작업을 큐에 넣습니다.
+    # categories(카탈로그 항목 목록)가 없으면 카탈로그 전체를 넣습니다.
+    # 이어서 할 때(resume)는 큐를 비우지 않고, 이미 넣은 카테고리 id는 건너뜁니다.
+    if not resume:
+        queue.reset()
+    driver_pool = DriverPool(get_webdriver, 1, driver_max_pages)
+    cache = None
+    if page_cache or fetch_backend == "replay":
+        cache = PageCache(page_cache_dir, page_cache_ttl, int(page_cache_max_mb * 1024 * 1024))
+    workers = CrawlWorkers(fetch_backend, get_fetch_policy(), driver_pool, cache)
     try:
-        values = [
-            {
-                'equip_cate_no': int(cat),
-                'equip_nm': product.name,
-                'equip_price': int(product.price),
-                'equip_link': product.link
-            } for product in products]
-        logging.info(f"{len(values)}개의 데이터를 삽입합니다.")
-        query = """
-            MERGE INTO EQUIPMENTS t
-            USING (SELECT :EQUIP_CATE_NO AS EQUIP_CATE_NO, :EQUIP_NM AS EQUIP_NM, :EQUIP_PRICE AS EQUIP_PRICE, :EQUIP_LINK AS EQUIP_LINK FROM dual) s
-            ON (t.EQUIP_NM = s.EQUIP_NM)
-            WHEN MATCHED THEN 
-                UPDATE SET 
-                EQUIP_PRICE = s.EQUIP_PRICE,
-                EQUIP_LINK = s.EQUIP_LINK
-            WHEN NOT MATCHED THEN 
-                INSERT (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK) 
-                VALUES (s.EQUIP_CATE_NO, s.EQUIP_NM, s.EQUIP_PRICE, s.EQUIP_LINK)
-        """
-        result = oracle_db.execute_many(query, values)
-        oracle_db.commit_transaction()
-        logging.info(f"{result}개의 데이터가 삽입되었습니다.")
-
-    except Exception as e:
-        logging.error(str(e))
-        logging.info("롤백")
-        oracle_db.rollback_transaction()
+        for category in categories if categories is not None else catalog:
+            cate_name = category.name
+            for cat in category.ids:
+                if resume and queue.category(cat) is not None:
+                    continue
+                try:
+                    fetcher = workers.fetcher()
+                    try:
+                        html = fetcher.open_category(cat)
+                    except Exception:
+                        if not isinstance(fetcher, HttpListingFetcher):
+                            raise
+                        logging.info("Selenium 백엔드로 다시 시도합니다.")
+                        html = workers.fallback().open_category(cat)
+                    total_products = listing_parser.parse_total_products(html)
+                except Exception as e:
+                    logging.error(str(e))
+                    logging.error(f"오류가 발생한 url: {list_url}{cat}")
+                    continue
+                pages = math.ceil(total_products / LIST_COUNT)
+                queue.add_category(cate_name, cat, total_products, pages)
+                logging.info(f"{cate_name}카테고리({cat}): 총 상품 {total_products}개, 작업 {pages}개")
+        queue.seal()
+        logging.info(f"작업을 모두 넣었습니다. {queue.counts()}")
+    finally:
+        workers.close()
+        driver_pool.close()
+        if cache is not None:
+            cache.close()
+        queue.close()
+
+
+def run_worker(queue):
+    # 분산 크롤링 워커: crawl_concurrency개의 스레드가 각자 작업을 빌려서 처리합니다. 여러 머신에서 같이 실행할 수 있습니다.
+    driver_pool = DriverPool(get_webdriver, crawl_concurrency, driver_max_pages)
+    cache = None
+    if page_cache or fetch_backend == "replay":
+        cache = PageCache(page_cache_dir, page_cache_ttl, int(page_cache_max_mb * 1024 * 1024))
+    parse_pool = ParsePool(parse_workers, listing_parser.name) if parse_workers > 0 else None
+    workers = CrawlWorkers(fetch_backend, get_fetch_policy(), driver_pool, cache, parse_pool)
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        with ThreadPoolExecutor(max_workers=crawl_concurrency) as executor:
+            futures = [executor.submit(workers.work, queue, f"{worker}-{index}") for index in range(crawl_concurrency)]
+            for future in futures:
+                future.result()
+        logging.info(f"남은 작업이 없어 워커를 종료합니다. {queue.counts()}")
+    finally:
+        workers.close()
+        if parse_pool is not None:
+            parse_pool.close()
+        driver_pool.close()
+        if cache is not None:
+            cache.close()
+        metrics.save(metrics_dir)
+        queue.close()
+
+
+def queued_pages(queue, cate_name, cat, known=None, start_page=1):
+    # 병합: 워커들이 큐에 남긴 파싱 결과를 crawl_pages()와 같은 모양으로 돌려줍니다.
+    if queue.category(cat) is None:
+        logging.warning(f"{cate_name}카테고리({cat})는 코디네이터가 목록을 열지 못해 결과가 없습니다.")
+        return
+    logging.info(f"{cate_name}카테고리({cat})의 크롤링 결과 병합 시작")
+    yield from select_products(cat, queue.pages(cat, start_page), known)
 
-    for product in products:
-        file.write(f"{product.name},")
-        file.write(f"{product.price},")
-        file.write(f"{product.link}\n")
 
+def after_db_write(writer, func, *args):
+    # DB 쓰기 스레드를 쓰는 경우, 체크포인트와 상태 파일은 앞서 넣은 DB 쓰기가 끝난 뒤에 순서대로 기록합니다.
+    # (체크포인트가 DB보다 앞서 나가면 중단 후 이어서 할 때 DB에 빠진 배치가 생김)
+    if writer is None:
+        func(*args)
+    else:
+        writer.submit(func, *args)
 
-def start_crawl():
-    categories = {
-        "monitor": [112757, 11248106, 11230049, 11230059, 11230081, 11230076],
-        "keyboard": [112782],
-        "mouse": [112787],
-        "desk": [15240504, 15235876, 15243650, 15235873, 15235874, 15235877, 15243647],
-        "chair": [1523647, 15221463, 15240090, 15235834],
-    }
 
+def start_crawl(resume=False, queue=None, categories=None):
+    # categories(카탈로그 항목 목록)가 없으면 카탈로그 전체를 우선순위 순서로 크롤링합니다.
+    # queue가 있으면 크롤링하지 않고, 분산 크롤링 워커들이 큐에 남긴 결과를 같은 싱크로 저장합니다. (병합)
+    if queue is not None and not queue.finished():
+        logging.error(f"분산 크롤링이 아직 끝나지 않았습니다. {queue.counts()}")
+        return False
+    if queue is not None:
+        for cat, page, error in queue.failures():
+            logging.warning(f"끝내지 못한 작업: 카테고리 id {cat}의 {page}페이지 ({error})")
+        if categories is None:
+            # 코디네이터가 큐에 넣은 카테고리만 병합합니다.
+            categories = catalog.select(queue.category_names() & {category.name for category in catalog})
+    if categories is None:
+        categories = catalog.select()
+    if resume:
+        checkpoint = Checkpoint.load()
+        checkpoint.check_catalog({category.name: category.ids for category in catalog})
+    else:
+        checkpoint = Checkpoint()
+        checkpoint.clear()
+    driver_pool = DriverPool(get_webdriver, crawl_concurrency, driver_max_pages)
+    writer = None
+    # 이번 실행의 모든 가격 이력은 같은 크롤링 시각으로 기록합니다.
+    crawled_at = datetime.now().replace(microsecond=0)
+    export_parquet = parquet_export and parquet_available()
+    if parquet_export and not export_parquet:
+        logging.warning("pyarrow가 설치되어 있지 않아 Parquet 파일은 쓰지 않습니다.")
+    cache = None
+    if queue is None and (page_cache or fetch_backend == "replay"):
+        cache = PageCache(page_cache_dir, page_cache_ttl, int(page_cache_max_mb * 1024 * 1024))
+    parse_pool = ParsePool(parse_workers, listing_parser.name) if parse_workers > 0 and queue is None else None
+    workers = CrawlWorkers(fetch_backend, get_fetch_policy(), driver_pool, cache, parse_pool)
+    executor = ThreadPoolExecutor(max_workers=crawl_concurrency)
+    streams = []
     try:
-        driver = get_webdriver()
-        oracle_db.start()
-        data = oracle_db.execute_query("select * from EQUIPMENTS_CATE")
-        logging.info(data)
-        cat_num = 1
-        for cate_name, category in categories.items():
-            products = set()
-            # 현재 위치 밑에 있는 폴더 'data'에 csv 파일을 생성
-            # 해당 폴더를 윈도우, 리눅스 어떤 환경에서도 사용할 수 있도록 함
-            # 폴더가 없으면 생성
-            if not os.path.exists("data"):
-                os.mkdir("data")
-            with open(f"data/{cate_name}.csv", "w", encoding="utf-8-sig", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["제품명", "가격", "링크"])
-
-                for cat in category:
-                    url = "https://prod.danawa.com/list/?cate=" + str(cat)
-                    driver.get(url)
-
-                    element = driver.find_element(By.LINK_TEXT, "신상품순")
-                    driver.execute_script("arguments[0].click();", element)
-
-                    select_element = driver.find_element(By.CLASS_NAME, "qnt_selector")
-                    select = Select(select_element)
-                    select.select_by_value("90")
-                    logging.info(f"{cate_name}카테고리의 데이터 크롤링 시작")
-                    crawl_products(driver, products, url)
-
-                sorted_products = sorted(products, key=lambda x: x.name)
-                logging.info("현재까지 크롤링한 데이터의 개수: " + str(len(sorted_products)))
-                write_product_info(cat_num, f, sorted_products)
-                cat_num += 1
-                logging.info(f"{cate_name} 크롤링 종료")
+        if fetch_backend == "selenium" and queue is None:
+            # 브라우저를 미리 띄워두면 첫 카테고리부터 바로 크롤링할 수 있습니다.
+            driver_pool.start()
+        db.start()
+        if db_async:
+            writer = AsyncDBWriter(db, db_queue_size)
+        # 카테고리 번호는 EQUIPMENTS_CATE에서 이름으로 찾습니다. (없는 카테고리는 크롤링하지 않음)
+        cat_nums = catalog.numbers(db)
+        categories = [category for category in categories if category.name in cat_nums]
+        known_products = {
+            category.name: get_known_products(db, category.name, cat_nums[category.name], known_source,
+                                              full_resync_days)
+            if incremental and not checkpoint.is_done(category.name) else None
+            for category in categories
+        }
+        # 모든 카테고리 id를 워커에 한꺼번에 넘기고, 결과는 카테고리 id 순서대로 꺼냅니다.
+        # 체크포인트에서 이어서 할 때는 이미 커밋된 카테고리, id, 페이지는 다시 요청하지 않습니다.
+        cate_streams = {}
+        # 카테고리마다 id별 크롤링이 끝까지 갔는지 (워커의 future, 병합은 큐의 결과로 판단)
+        cate_results = {}
+        failed_cats = {cat for cat, page, error in queue.failures()} if queue is not None else set()
+        for category in categories:
+            cate_name = category.name
+            cate_streams[cate_name] = []
+            cate_results[cate_name] = []
+            if checkpoint.is_done(cate_name):
+                continue
+            for cat in category.ids:
+                start_page = checkpoint.start_page(cate_name, category.ids, cat)
+                if start_page is None:
+                    continue
+                if queue is not None:
+                    cate_streams[cate_name].append(queued_pages(queue, cate_name, cat, known_products[cate_name],
+                                                                start_page))
+                    cate_results[cate_name].append(cat not in failed_cats and queue.category(cat) is not None)
+                    continue
+                stream = PageStream(stream_buffer)
+                future = executor.submit(workers.crawl, cate_name, cat, known_products[cate_name], stream, start_page,
+                                         category.concurrency)
+                cate_streams[cate_name].append(stream)
+                cate_results[cate_name].append(future)
+                streams.append(stream)
+        # 카테고리 id 중 하나라도 끝까지 크롤링하지 못한 카테고리
+        incomplete = []
+        for category in categories:
+            cate_name = category.name
+            if checkpoint.is_done(cate_name):
+                logging.info(f"{cate_name} 카테고리는 이미 끝났으므로 건너뜁니다.")
+                continue
+            cat_num = cat_nums[cate_name]
+            known = known_products[cate_name]
+            resuming = checkpoint.is_current(cate_name)
+            deduper = Deduper(checkpoint.load_keys() if resuming else (), track_pending=True)
+            with open_csv(cate_name, checkpoint.state["csv_offset"] if resuming else 0) as f:
+                after_db_write(writer, checkpoint.begin_category, cate_name, category.ids)
+                csv_sink = CsvSink(f)
+                outputs = [csv_sink]
+                closed = False
+                try:
+                    if export_parquet:
+                        parquet_sink = ParquetSink(f"data/{cate_name}.parquet", cate_name, cat_num, crawled_at,
+                                                   parquet_compression)
+                        if resuming:
+                            # CSV는 체크포인트 위치까지 잘라냈으므로, 그때까지의 상품을 먼저 Parquet에 옮겨 씁니다.
+                            parquet_sink.write(read_csv_products(f"data/{cate_name}.csv"))
+                        outputs.append(parquet_sink)
+                    # 증분 모드에서 DB로부터 읽어둔 값이 있으면 그대로 비교에 사용합니다.
+                    snapshot = known if known_source == "db" else None
+                    sinks = outputs + [get_db_sink(cat_num, snapshot, writer)]
+                    if price_history:
+                        sinks.append(PriceHistorySink(db, storage, cat_num, crawled_at, writer, db_batch_size))
+                    state = None
+                    if incremental and known_source == "file":
+                        state = KnownProducts(dict(known.items) if known is not None else {})
+                        sinks.append(StateSink(state))
+
+                    # 배치가 모든 싱크에 저장될 때마다 어디까지 저장했는지 체크포인트에 남깁니다.
+                    def on_commit(cat, page):
+                        after_db_write(writer, checkpoint.commit, cat, page, csv_sink.offset(), deduper.take_pending())
+
+                    # id 순서대로 꺼내야 직렬 실행과 같은 결과가 나옵니다. (먼저 나온 상품이 남음)
+                    count = run_pipeline(chain.from_iterable(cate_streams[cate_name]), deduper, sinks, sink_batch_size,
+                                         on_commit)
+                    logging.info(f"크롤링한 데이터의 개수: {count}, {deduper.duplicate}개의 중복 데이터는 제외")
+                    metrics.incr("duplicates", deduper.duplicate)
+                    metrics.incr("saved_products", count)
+                    # 증분 모드에서는 크롤링하지 않은 기존 상품도 CSV(와 Parquet)에는 남겨둡니다.
+                    if known is not None:
+                        rest = [product for product in (Product(name, price, link) for name, (price, link) in known.items.items())
+                                if product not in deduper]
+                        for output in outputs:
+                            output.write(rest)
+                    for sink in sinks:
+                        sink.close()
+                    closed = True
+                finally:
+                    # 중간에 멈추면 ParquetWriter를 닫고 임시 파일(.parquet.tmp)을 지웁니다. (CSV는 --resume에서 체크포인트 위치부터 이어서 씀)
+                    if not closed:
+                        for output in outputs:
+                            output.abort()
+            # 스트림을 끝까지 꺼냈으므로 워커는 이미 결과를 돌려준 상태입니다.
+            completed = all(result.result() if isinstance(result, Future) else result
+                            for result in cate_results[cate_name])
+            after_db_write(writer, checkpoint.finish_category, cate_name)
+            if not completed:
+                # 중간에 멈춘 크롤링으로 동기화 시각이나 상태 파일을 갱신하지 않고, 갱신 주기도 새로 세지 않습니다.
+                # (다음 실행에서 다시 크롤링 대상이 됨)
+                logging.error(f"{cate_name} 크롤링이 중간에 멈췄습니다.")
+                incomplete.append(cate_name)
+                continue
+            if incremental:
+                after_db_write(writer, update_state, cate_name, state, known is None, known_source)
+            # 갱신 주기(refresh_hours)는 이 시각부터 셉니다.
+            after_db_write(writer, catalog.mark_crawled, cate_name, crawled_at.timestamp())
+            logging.info(f"{cate_name} 크롤링 종료")
+        if writer is not None:
+            # 남은 DB 쓰기가 모두 끝난 뒤에 체크포인트를 지웁니다.
+            writer.close()
+        checkpoint.clear()
+        if incomplete:
+            logging.error(f"크롤링을 끝내지 못한 카테고리: {', '.join(incomplete)}")
+        return not incomplete
     except Exception as e:
-        logging.error(f"오류가 발생한 url: {url}")
+        # 체크포인트는 마지막으로 저장된 배치에 남아 있으므로 --resume으로 이어서 할 수 있습니다.
         logging.error(str(e))
-        return
+        return False
     finally:
-        driver.quit()
-        oracle_db.stop()
+        for stream in streams:
+            stream.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+        workers.close()
+        if parse_pool is not None:
+            parse_pool.close()
+        driver_pool.close()
+        if cache is not None:
+            cache.close()
+        metrics.save(metrics_dir)
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception as e:
+                logging.error(str(e))
+        db.stop()
+        if queue is not None:
+            queue.close()
         logging.info("드라이버 종료")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", action="store_true", help="마지막 체크포인트부터 이어서 크롤링합니다.")
+    # 분산 크롤링: coordinator가 작업을 큐에 넣고, 여러 머신의 worker가 나눠서 크롤링한 뒤, merge가 결과를 저장합니다.
+    parser.add_argument("--role", choices=["crawl", "coordinator", "worker", "merge"], default="crawl",
+                        help="crawl(기본값, 혼자 전부 크롤링), coordinator, worker, merge")
+    parser.add_argument("--queue", default=work_queue_path, help="분산 크롤링 작업 큐 파일 (SQLite)")
+    # 카탈로그(categories.json)에서 크롤링할 카테고리 고르기
+    parser.add_argument("--category", action="append", help="이 카테고리만 크롤링합니다. (여러 번 지정 가능)")
+    parser.add_argument("--due", action="store_true", help="갱신 주기(refresh_hours)가 지난 카테고리만 크롤링합니다.")
+    args = parser.parse_args()
     logging.info("크롤링 스크립트를 실행합니다.")
-    start_crawl()
-    logging.info("크롤링 스크립트가 종료되었습니다.")
\ No newline at end of file
+    try:
+        selected = catalog.select(args.category)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.due:
+        due = {category.name for category in catalog.due()}
+        selected = [category for category in selected if category.name in due]
+        logging.info(f"갱신할 카테고리: {[category.name for category in selected]}")
+    ok = True
+    if args.role in ("crawl", "coordinator") and not selected:
+        logging.info("크롤링할 카테고리가 없습니다.")
+    elif args.role == "crawl":
+        ok = start_crawl(resume=args.resume, categories=selected)
+    else:
+        work_queue = WorkQueue(args.queue, work_lease_seconds, work_max_attempts)
+        if args.role == "coordinator":
+            run_coordinator(work_queue, resume=args.resume, categories=selected)
+        elif args.role == "worker":
+            run_worker(work_queue)
+        else:
+            ok = start_crawl(resume=args.resume, queue=work_queue)
+    logging.info("크롤링 스크립트가 종료되었습니다.")
+    # 크롤링이 중간에 멈췄으면 (GitHub Actions에서도) 실패로 끝냅니다.
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,168 @@
+import csv
+import logging
+
+from change_detect import diff_products
+from incremental import load_known_from_db
+from metrics import metrics
+from product import Product
+from sqlite_db import write_upsert
+
+MERGE_QUERY = """
+    MERGE INTO EQUIPMENTS t
+    USING (SELECT :EQUIP_CATE_NO AS EQUIP_CATE_NO, :EQUIP_NM AS EQUIP_NM, :EQUIP_PRICE AS EQUIP_PRICE, :EQUIP_LINK AS EQUIP_LINK FROM dual) s
+    ON (t.EQUIP_NM = s.EQUIP_NM)
+    WHEN MATCHED THEN
+        UPDATE SET
+        EQUIP_PRICE = s.EQUIP_PRICE,
+        EQUIP_LINK = s.EQUIP_LINK
+    WHEN NOT MATCHED THEN
+        INSERT (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK)
+        VALUES (s.EQUIP_CATE_NO, s.EQUIP_NM, s.EQUIP_PRICE, s.EQUIP_LINK)
+"""
+
+
+def write_merge(db, cat, products):
+    # 행마다 MERGE ... FROM dual을 실행합니다.
+    try:
+        values = [
+        {
+            'equip_cate_no': int(cat),
+            'equip_nm': product.name,
+            'equip_price': int(product.price),
+            'equip_link': product.link
+        } for product in products]
+        logging.info(f"{len(values)}개의 데이터를 삽입합니다.")
+        with metrics.timer("db_merge_seconds"):
+            result = db.execute_many(MERGE_QUERY, values)
+            db.commit_transaction()
+        metrics.incr("db_rows", len(values))
+        logging.info(f"{result}개의 데이터가 삽입되었습니다.")
+
+    except Exception as e:
+        logging.error(str(e))
+        logging.info("롤백")
+        db.rollback_transaction()
+        # 저장하지 못한 배치가 체크포인트에 커밋된 것으로 남지 않도록 파이프라인을 멈춥니다.
+        raise
+
+
+def write_bulk(db, bulk_writer, cat, products):
+    # EQUIPMENTS_STAGE에 한 번에 적재한 뒤 MERGE 한 번으로 반영합니다.
+    try:
+        logging.info(f"{len(products)}개의 데이터를 스테이징 테이블로 적재합니다.")
+        with metrics.timer("db_bulk_seconds"):
+            inserted, updated = bulk_writer.write(cat, products)
+            db.commit_transaction()
+        metrics.incr("db_rows", len(products))
+        logging.info(f"{inserted}개의 데이터가 삽입되고 {updated}개의 데이터가 갱신되었습니다.")
+
+    except Exception as e:
+        logging.error(str(e))
+        logging.info("롤백")
+        db.rollback_transaction()
+        raise
+
+
+class CsvSink:
+    # csv.writer로 쓰므로 제품명에 쉼표나 따옴표가 있어도 한 칸으로 남습니다.
+    def __init__(self, file):
+        self.file = file
+        self.writer = csv.writer(file)
+
+    def write(self, products):
+        self.writer.writerows((product.name, product.price, product.link) for product in products)
+
+    def offset(self):
+        # 지금까지 쓴 내용을 내보내고 파일 크기(바이트)를 돌려줍니다. (체크포인트용)
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.flush()
+
+    def abort(self):
+        # 이미 쓴 줄은 남겨둡니다. (이어서 할 때 체크포인트 위치까지 잘라냄)
+        self.file.flush()
+
+
+def read_csv_products(path):
+    # CsvSink로 쓴 파일을 다시 읽어서 (제품명, 가격, 링크)를 돌려줍니다. (첫 줄은 헤더)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for name, price, link in reader:
+            yield Product(name, int(price), link)
+
+
+class DbSink:
+    # 배치가 들어올 때마다 DB의 EQUIPMENTS에 쓰고 커밋합니다. 실제 쓰기는 하위 클래스의 _write에서 합니다.
+    # skip_unchanged이면 카테고리마다 SELECT 한 번으로 저장된 값을 읽어두고, 바뀐 상품만 씁니다.
+    # writer(AsyncDBWriter)를 넘기면 비교만 여기서 하고 실제 쓰기는 DB 쓰기 스레드에서 합니다.
+    def __init__(self, db, cat_num, skip_unchanged=True, snapshot=None, writer=None):
+        self.db = db
+        self.cat_num = cat_num
+        self.writer = writer
+        if skip_unchanged and snapshot is None:
+            snapshot = load_known_from_db(db, cat_num)
+        self.snapshot = snapshot if skip_unchanged else None
+        self.unchanged = 0
+        self.changed = 0
+        self.new = 0
+
+    def write(self, products):
+        if self.snapshot is not None:
+            new, changed, unchanged = diff_products(products, self.snapshot)
+            self.new += len(new)
+            self.changed += len(changed)
+            self.unchanged += unchanged
+            metrics.incr("unchanged_products", unchanged)
+            products = new + changed
+        if not products:
+            return
+        if self.writer is not None:
+            self.writer.submit(self._write, products)
+        else:
+            self._write(products)
+
+    def _write(self, products):
+        raise NotImplementedError
+
+    def close(self):
+        if self.snapshot is not None:
+            logging.info(f"변경 없음 {self.unchanged}개, 변경 {self.changed}개, 신규 {self.new}개")
+
+
+class OracleSink(DbSink):
+    # 행마다 MERGE하거나, bulk_writer가 있으면 스테이징 테이블을 거쳐 MERGE 한 번으로 씁니다.
+    def __init__(self, db, cat_num, bulk_writer=None, skip_unchanged=True, snapshot=None, writer=None):
+        super().__init__(db, cat_num, skip_unchanged, snapshot, writer)
+        self.bulk_writer = bulk_writer
+
+    def _write(self, products):
+        if self.bulk_writer is not None:
+            write_bulk(self.db, self.bulk_writer, self.cat_num, products)
+        else:
+            write_merge(self.db, self.cat_num, products)
+
+
+class SqliteSink(DbSink):
+    # 로컬 SQLite 파일(SqliteDB)에 UPSERT로 씁니다. Oracle 없이 전체 파이프라인을 돌려볼 때 사용합니다.
+    def __init__(self, db, cat_num, skip_unchanged=True, snapshot=None, writer=None, batch_size=5000):
+        super().__init__(db, cat_num, skip_unchanged, snapshot, writer)
+        self.batch_size = batch_size
+
+    def _write(self, products):
+        write_upsert(self.db, self.cat_num, products, self.batch_size)
+
+
+class StateSink:
+    # 증분 크롤링(file 모드)의 상태 파일에 남길 {제품명: (가격, 링크)}를 모읍니다.
+    def __init__(self, known):
+        self.known = known
+
+    def write(self, products):
+        for product in products:
+            self.known.items[product.name] = (int(product.price), product.link)
+
+    def close(self):
+        pass
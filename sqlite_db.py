@@ -0,0 +1,127 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from metrics import metrics
+
+SQLITE_PATH = os.path.join("data", "equipments.db")
+
+# 테이블 관련.sql의 EQUIPMENTS_CATE / EQUIPMENTS / EQUIP_PRICE_HIST와 같은 구조 (Oracle 없이 로컬에서 실행할 때 사용)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS EQUIPMENTS_CATE (
+    EQUIP_CATE_NO INTEGER PRIMARY KEY AUTOINCREMENT,
+    EQUIP_CATE_NM TEXT
+);
+CREATE TABLE IF NOT EXISTS EQUIPMENTS (
+    EQUIP_NO INTEGER PRIMARY KEY AUTOINCREMENT,
+    EQUIP_CATE_NO INTEGER NOT NULL REFERENCES EQUIPMENTS_CATE (EQUIP_CATE_NO),
+    EQUIP_NM TEXT,
+    EQUIP_PRICE INTEGER,
+    EQUIP_LINK TEXT,
+    CREATION_DATE TEXT DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT UQ_EQUIP_NM UNIQUE (EQUIP_NM)
+);
+CREATE TABLE IF NOT EXISTS EQUIP_PRICE_HIST (
+    EQUIP_CATE_NO INTEGER NOT NULL,
+    EQUIP_NM TEXT NOT NULL,
+    EQUIP_PRICE INTEGER,
+    CRAWLED_AT TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_PRICE_HIST_NM ON EQUIP_PRICE_HIST (EQUIP_NM, CRAWLED_AT);
+CREATE INDEX IF NOT EXISTS IX_PRICE_HIST_CATE ON EQUIP_PRICE_HIST (EQUIP_CATE_NO, CRAWLED_AT);
+"""
+
+CATEGORY_NAMES = ["Monitor", "Keyboard", "Mouse", "Desk", "Chair"]
+
+# MERGE INTO EQUIPMENTS와 같은 동작: 제품명이 같으면 가격과 링크만 갱신합니다.
+UPSERT_QUERY = """
+    INSERT INTO EQUIPMENTS (EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (EQUIP_NM) DO UPDATE SET
+        EQUIP_PRICE = excluded.EQUIP_PRICE,
+        EQUIP_LINK = excluded.EQUIP_LINK
+"""
+
+
+class SqliteDB:
+    # OracleDB와 같은 메서드를 가진 SQLite 버전입니다.
+    # sqlite3 커넥션은 스레드 사이에 공유할 수 없으므로 스레드마다 따로 엽니다.
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def start(self):
+        # 파일이 없으면 테이블을 만들고 카테고리를 넣어둡니다.
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+        if conn.execute("SELECT COUNT(*) FROM EQUIPMENTS_CATE").fetchone()[0] == 0:
+            conn.executemany("INSERT INTO EQUIPMENTS_CATE (EQUIP_CATE_NM) VALUES (?)",
+                             [(name,) for name in CATEGORY_NAMES])
+            conn.commit()
+
+    def stop(self):
+        self.release()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # 쓰는 동안에도 다른 스레드가 읽을 수 있도록 WAL 모드를 사용합니다.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def release(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def cursor(self):
+        return self.connection().cursor()
+
+    def execute_query(self, query):
+        return self.connection().execute(query).fetchall()
+
+    def execute_insert(self, query, values):
+        self.connection().execute(query, values)
+
+    def commit(self):
+        self.connection().commit()
+
+    def execute_many(self, query, values_list):
+        return self.connection().executemany(query, values_list).rowcount
+
+    def begin_transaction(self):
+        # sqlite3는 첫 DML에서 트랜잭션을 자동으로 시작합니다.
+        pass
+
+    def commit_transaction(self):
+        self.commit()
+
+    def rollback_transaction(self):
+        self.connection().rollback()
+
+    def execute_query_with_params(self, query, params=None):
+        return self.connection().execute(query, params or {}).fetchall()
+
+
+def write_upsert(db, cat, products, batch_size=5000):
+    # batch_size개씩 executemany로 넣고, 전체를 한 트랜잭션으로 커밋합니다.
+    try:
+        rows = [(int(cat), product.name, int(product.price), product.link) for product in products]
+        logging.info(f"{len(rows)}개의 데이터를 SQLite에 저장합니다.")
+        with metrics.timer("db_upsert_seconds"):
+            for start in range(0, len(rows), batch_size):
+                db.execute_many(UPSERT_QUERY, rows[start:start + batch_size])
+            db.commit_transaction()
+        metrics.incr("db_rows", len(rows))
+
+    except Exception as e:
+        logging.error(str(e))
+        logging.info("롤백")
+        db.rollback_transaction()
+        raise
@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+
+@pytest.fixture(scope="session")
+def corpus_manifest():
+    # bench/corpus는 저장소에 넣지 않으므로 테스트를 시작할 때 만듭니다. (이미 있으면 그대로 사용)
+    from corpus import load_manifest
+    return load_manifest()
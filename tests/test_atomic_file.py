@@ -0,0 +1,29 @@
+import json
+import os
+
+import pytest
+
+from atomic_file import write_json
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_write_json_creates_directory_and_replaces(tmp_path):
+    path = str(tmp_path / "state" / "monitor.json")
+    write_json(path, {"상품": 1})
+    write_json(path, {"상품": 2})
+    assert read(path) == {"상품": 2}
+    assert os.listdir(tmp_path / "state") == ["monitor.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    write_json(path, {"page": 3})
+    # 쓰는 도중에 실패해도 이전 내용이 그대로 남습니다.
+    with pytest.raises(TypeError):
+        write_json(path, {"page": 4, "keys": object()})
+    assert read(path) == {"page": 3}
+    assert os.listdir(tmp_path) == ["checkpoint.json"]
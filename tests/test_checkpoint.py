@@ -0,0 +1,51 @@
+from checkpoint import Checkpoint
+
+
+def interrupted(tmp_path, ids):
+    # 카테고리의 두 번째 id 3페이지까지 커밋한 뒤 멈춘 체크포인트
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.begin_category("monitor", ids)
+    checkpoint.commit(ids[1], 3, 100, [1, 2, 3])
+    return Checkpoint.load(checkpoint.path)
+
+
+def test_resume_with_same_catalog(tmp_path):
+    checkpoint = interrupted(tmp_path, [10, 20, 30])
+    checkpoint.check_catalog({"monitor": [10, 20, 30]})
+    assert checkpoint.is_current("monitor")
+    assert [checkpoint.start_page("monitor", [10, 20, 30], cat) for cat in (10, 20, 30)] == [None, 4, 1]
+    assert checkpoint.load_keys() == [1, 2, 3]
+
+
+def test_removed_id_restarts_category(tmp_path):
+    # categories.json에서 진행 중이던 id가 빠졌으면 그 카테고리를 1페이지부터 다시 합니다.
+    checkpoint = interrupted(tmp_path, [10, 20, 30])
+    checkpoint.check_catalog({"monitor": [10, 30]})
+    assert not checkpoint.is_current("monitor")
+    assert [checkpoint.start_page("monitor", [10, 30], cat) for cat in (10, 30)] == [1, 1]
+    assert checkpoint.load_keys() == []
+    # 다시 읽어도 처음부터입니다.
+    assert not Checkpoint.load(checkpoint.path).is_current("monitor")
+
+
+def test_reordered_ids_restart_category(tmp_path):
+    # 앞에 새 id가 들어오면 건너뛰지 않도록 처음부터 다시 합니다.
+    checkpoint = interrupted(tmp_path, [10, 20, 30])
+    checkpoint.check_catalog({"monitor": [5, 10, 20, 30]})
+    assert checkpoint.start_page("monitor", [5, 10, 20, 30], 5) == 1
+
+
+def test_removed_category_restarts(tmp_path):
+    checkpoint = interrupted(tmp_path, [10, 20, 30])
+    checkpoint.check_catalog({"chair": [40]})
+    assert checkpoint.state["category"] is None
+
+
+def test_checkpoint_without_ids(tmp_path):
+    # ids가 없는 이전 형식의 체크포인트는 진행 중이던 id가 남아 있는지만 봅니다.
+    checkpoint = interrupted(tmp_path, [10, 20, 30])
+    checkpoint.state["ids"] = None
+    checkpoint.check_catalog({"monitor": [20, 30]})
+    assert checkpoint.start_page("monitor", [20, 30], 20) == 4
+    checkpoint.check_catalog({"monitor": [30]})
+    assert checkpoint.start_page("monitor", [30], 30) == 1
@@ -0,0 +1,132 @@
+import json
+import math
+import time
+
+import pytest
+import requests
+from bench_api_responsive import probe, serve
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from replay_server import ReplayServer
+
+from catalog import Catalog
+from crawl_job import CrawlJobRunner, get_crawl_router
+from fetcher import LIST_COUNT, HttpListingFetcher
+from listing_parser import SoupListingParser
+from product import Product
+from product_index import ProductIndex, get_product_router
+
+CATEGORIES = ["monitor", "keyboard"]
+
+
+def make_client(tmp_path, crawled):
+    path = tmp_path / "categories.json"
+    path.write_text(json.dumps({"monitor": {"ids": [112757]}, "chair": {"ids": [1523647]}}), encoding="utf-8")
+    catalog = Catalog.load(str(path), str(tmp_path / "catalog_state.json"))
+    runner = CrawlJobRunner(lambda job: crawled.append(job.categories))
+    app = FastAPI()
+    app.include_router(get_crawl_router(runner, catalog))
+    return TestClient(app), runner
+
+
+def test_unknown_category_is_rejected(tmp_path):
+    crawled = []
+    client, runner = make_client(tmp_path, crawled)
+    response = client.post("/crawl", params={"category": ["monitor", "bogus"]})
+    assert response.status_code == 422
+    assert "bogus" in response.json()["detail"]
+    # 작업을 만들지도, 크롤링을 시작하지도 않습니다.
+    assert runner.latest() is None
+    assert client.get("/crawl").status_code == 404
+    runner.shutdown()
+    assert crawled == []
+
+
+def test_known_category_starts_crawl(tmp_path):
+    crawled = []
+    client, runner = make_client(tmp_path, crawled)
+    response = client.post("/crawl", params={"category": ["chair"]})
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    deadline = time.monotonic() + 5
+    while client.get(f"/crawl/{job_id}").json()["state"] != "done" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.get(f"/crawl/{job_id}").json()["state"] == "done"
+    runner.shutdown()
+    assert crawled == [["chair"]]
+
+
+def replay_crawl(base, manifest, index):
+    # danawa_crawler_AI_05092144.crawl_products처럼 페이지마다 요청 → 파싱 → 색인 갱신을 반복하는 블로킹 크롤링
+    # (브라우저 대신 HTTP로 재생 서버에서 받고, 파싱은 가장 느린 BeautifulSoup 파서로 함)
+    parser = SoupListingParser()
+
+    def crawl(job):
+        for cate_name in CATEGORIES:
+            entry = manifest[cate_name]
+            fetcher = HttpListingFetcher(list_url=base + "/list/?cate=", ajax_url=base + "/ajax")
+            try:
+                total_products = parser.parse_total_products(fetcher.open_category(entry["cate"]))
+                job.update(category=cate_name, cat=entry["cate"], page=0, total_products=total_products)
+                index.begin(cate_name)
+                for page in range(1, math.ceil(total_products / LIST_COUNT) + 1):
+                    job.check_cancelled()
+                    products = [Product(*row) for row in parser.parse_products(fetcher.fetch_page(page))]
+                    index.update(cate_name, products)
+                    job.update(page=page, products=job.products + len(products))
+                index.finish(cate_name)
+            finally:
+                fetcher.close()
+    return crawl
+
+
+@pytest.fixture
+def api(corpus_manifest):
+    replay = ReplayServer(latency=0.02)
+    index = ProductIndex()
+    runner = CrawlJobRunner(replay_crawl(replay.start(), corpus_manifest, index))
+    app = FastAPI()
+    app.include_router(get_crawl_router(runner))
+    app.include_router(get_product_router(index))
+    server, url = serve(app)
+    yield url, runner
+    runner.shutdown()
+    server.should_exit = True
+    replay.stop()
+
+
+def test_api_stays_responsive_during_crawl(api, corpus_manifest):
+    url, runner = api
+    job = requests.post(url + "/crawl").json()
+    assert job["state"] in ("pending", "running")
+    # 실행 중에는 새 크롤링을 시작하지 않습니다.
+    assert requests.post(url + "/crawl").status_code == 409
+
+    latencies = probe(url + "/crawl", lambda: runner.current is not None)
+    finished = requests.get(f"{url}/crawl/{job['id']}").json()
+    assert finished["state"] == "done", finished
+    assert finished["products"] == sum(corpus_manifest[name]["total"] for name in CATEGORIES)
+    assert requests.get(url + "/products").json() == {name: corpus_manifest[name]["total"] for name in CATEGORIES}
+
+    # 크롤링 스레드가 파싱하는 동안에도 이벤트 루프는 막히지 않습니다. (이벤트 루프에서 실행하면 몇 초씩 걸림)
+    latencies.sort()
+    assert len(latencies) >= 50
+    assert latencies[int(len(latencies) * 0.99)] < 200, latencies[-10:]
+
+
+def test_cancel_running_crawl(api, corpus_manifest):
+    url, runner = api
+    job = requests.post(url + "/crawl").json()
+    deadline = time.monotonic() + 30
+    while requests.get(url + "/crawl").json()["page"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert requests.post(url + "/crawl/cancel").json()["cancel_requested"]
+    while runner.current is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    cancelled = requests.get(f"{url}/crawl/{job['id']}").json()
+    assert cancelled["state"] == "cancelled"
+    assert cancelled["category"] == CATEGORIES[0]
+    assert 2 <= cancelled["page"] < corpus_manifest[CATEGORIES[0]]["pages"]
+    # 취소한 뒤에는 다시 시작할 수 있고, 실행 중인 크롤링이 없으면 취소는 409입니다.
+    assert requests.post(url + "/crawl/cancel").status_code == 409
+    assert requests.post(url + "/crawl").status_code == 202
@@ -0,0 +1,41 @@
+from corpus import read_page
+
+import script
+from pipeline import PageStream
+
+
+class CorpusFetcher:
+    # bench/corpus의 monitor 페이지를 돌려주고, fail_page에서는 오류를 냅니다.
+    parallel_pages = False
+
+    def __init__(self, fail_page=None):
+        self.fail_page = fail_page
+
+    def open_category(self, cate):
+        return read_page("monitor", 0)
+
+    def fetch_page(self, page):
+        if page == self.fail_page:
+            raise ConnectionError("연결 끊김")
+        return read_page("monitor", page)
+
+
+def crawl(corpus_manifest, fetcher):
+    workers = script.CrawlWorkers("http", None, None)
+    workers._local.fetcher = fetcher
+    stream = PageStream(corpus_manifest["monitor"]["pages"] + 1)
+    ok = workers.crawl("monitor", corpus_manifest["monitor"]["cate"], None, stream)
+    return ok, [page for cat, page, products in stream]
+
+
+def test_crawl_reports_completed_category(corpus_manifest):
+    ok, pages = crawl(corpus_manifest, CorpusFetcher())
+    assert ok is True
+    assert pages == list(range(1, corpus_manifest["monitor"]["pages"] + 1))
+
+
+def test_crawl_reports_aborted_category(corpus_manifest):
+    # 중간에 멈춘 크롤링은 받은 페이지까지만 넘기고 False를 돌려줍니다. (start_crawl은 상태 파일을 갱신하지 않음)
+    ok, pages = crawl(corpus_manifest, CorpusFetcher(fail_page=4))
+    assert ok is False
+    assert pages == [1, 2, 3]
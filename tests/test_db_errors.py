@@ -0,0 +1,80 @@
+from checkpoint import Checkpoint
+from oracle_pool import AsyncDBWriter
+from pipeline import Deduper, run_pipeline
+from product import Product
+from sinks import SqliteSink
+from sqlite_db import SqliteDB
+
+
+def make_pages(cat, pages, per_page=3):
+    for page in range(1, pages + 1):
+        yield cat, page, [Product(f"상품 {page}-{i}", 1000 + i, f"https://prod.danawa.com/info/?pcode={page * 100 + i}")
+                          for i in range(per_page)]
+
+
+def fail_inserts_after(db, rows):
+    # EQUIPMENTS에 rows개가 저장된 뒤부터는 INSERT가 실패하게 합니다.
+    db.connection().execute(f"""
+        CREATE TRIGGER FAIL_INSERT BEFORE INSERT ON EQUIPMENTS
+        WHEN (SELECT COUNT(*) FROM EQUIPMENTS) >= {rows}
+        BEGIN SELECT RAISE(ABORT, 'fail'); END
+    """)
+
+
+def test_failed_write_stops_checkpoint_at_last_stored_batch(tmp_path):
+    db = SqliteDB(str(tmp_path / "equipments.db"))
+    db.start()
+    fail_inserts_after(db, 6)
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.begin_category("monitor")
+    deduper = Deduper(track_pending=True)
+    sink = SqliteSink(db, 1, skip_unchanged=False)
+
+    def on_commit(cat, page):
+        checkpoint.commit(cat, page, 0, deduper.take_pending())
+
+    try:
+        run_pipeline(make_pages(112757, 4), deduper, [sink], 3, on_commit)
+    except Exception as e:
+        assert "fail" in str(e)
+    else:
+        raise AssertionError("DB 쓰기 오류가 파이프라인 밖으로 나오지 않았습니다.")
+
+    # 저장된 두 페이지까지만 체크포인트에 남고, 실패한 배치는 롤백됩니다.
+    assert Checkpoint.load(checkpoint.path).state["page"] == 2
+    assert Checkpoint.load(checkpoint.path).state["keys"] == 6
+    assert db.execute_query("SELECT COUNT(*) FROM EQUIPMENTS")[0][0] == 6
+    db.stop()
+
+
+def test_async_writer_drops_checkpoint_tasks_after_failed_write(tmp_path):
+    db = SqliteDB(str(tmp_path / "equipments.db"))
+    db.start()
+    fail_inserts_after(db, 6)
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+    checkpoint.begin_category("monitor")
+    deduper = Deduper(track_pending=True)
+    writer = AsyncDBWriter(db)
+    sink = SqliteSink(db, 1, skip_unchanged=False, writer=writer)
+
+    def on_commit(cat, page):
+        # script.py의 after_db_write처럼 체크포인트도 DB 쓰기 스레드에 순서대로 넣습니다.
+        writer.submit(checkpoint.commit, cat, page, 0, deduper.take_pending())
+
+    errors = []
+    try:
+        run_pipeline(make_pages(112757, 6), deduper, [sink], 3, on_commit)
+    except Exception as e:
+        # 쓰기 스레드가 먼저 실패하면 다음 submit()에서 오류가 납니다.
+        errors.append(e)
+    try:
+        writer.close()
+    except Exception as e:
+        errors.append(e)
+
+    assert errors and "fail" in str(errors[-1])
+    assert "fail" in str(writer.error)
+    # 실패한 3페이지 뒤에 들어온 체크포인트 작업은 실행되지 않습니다.
+    assert Checkpoint.load(checkpoint.path).state["page"] == 2
+    assert db.execute_query("SELECT COUNT(*) FROM EQUIPMENTS")[0][0] == 6
+    db.stop()
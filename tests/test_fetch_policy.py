@@ -0,0 +1,130 @@
+import json
+import time
+
+import pytest
+import requests
+
+from catalog import Catalog
+from fetch_policy import CircuitBreaker, FetchPolicy, RetryPolicy
+from fetcher import LIST_URL, SeleniumListingFetcher
+
+
+def http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def test_retry_after_is_capped():
+    # Retry-After가 한 시간이어도 백오프 상한(cap)만큼만 기다립니다.
+    policy = FetchPolicy(retry=RetryPolicy(retries=2, base=0.01, cap=0.2))
+    errors = [http_error(429, "3600"), http_error(503, "3600")]
+
+    def func():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    start = time.perf_counter()
+    assert policy.call("http://example.com/ajax", func) == "ok"
+    assert time.perf_counter() - start < 1
+
+
+def test_client_error_is_not_retried():
+    policy = FetchPolicy(retry=RetryPolicy(retries=3, base=0.01, cap=0.01))
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise http_error(404)
+
+    with pytest.raises(requests.HTTPError):
+        policy.call("http://example.com/ajax", func)
+    assert len(calls) == 1
+
+
+class FakeDriver:
+    # movePage 후 목록을 기다리는 부분(execute_async_script)만 성공하거나 실패합니다.
+    def __init__(self, fail):
+        self.fail = fail
+        self.page_source = "<html></html>"
+
+    def execute_script(self, script, *args):
+        pass
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_async_script(self, script, *args):
+        if self.fail:
+            raise TimeoutError("목록이 바뀌지 않았습니다.")
+
+
+class FakePooled:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.broken = False
+
+
+class FakePool:
+    max_pages = 300
+
+    def __init__(self, fail):
+        self.fail = fail
+
+    def acquire(self):
+        return FakePooled(FakeDriver(self.fail))
+
+    def record_page(self, pooled, latency):
+        pooled.pages += 1
+
+    def release(self, pooled):
+        pass
+
+
+def selenium_fetcher(policy, fail):
+    fetcher = SeleniumListingFetcher(FakePool(fail), policy)
+    fetcher.pooled = fetcher.pool.acquire()
+    fetcher.page = 1
+    return fetcher
+
+
+def test_selenium_failures_open_breaker():
+    policy = FetchPolicy(breaker_factory=lambda: CircuitBreaker(window=4, threshold=0.5, cooldown=30, min_calls=2))
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            selenium_fetcher(policy, fail=True).fetch_page(2)
+    assert policy.breaker(LIST_URL).is_open
+
+
+def test_selenium_successes_keep_breaker_closed():
+    policy = FetchPolicy(breaker_factory=lambda: CircuitBreaker(window=10, threshold=0.5, cooldown=30, min_calls=2))
+    fetcher = selenium_fetcher(policy, fail=False)
+    for page in range(2, 6):
+        fetcher.fetch_page(page)
+    with pytest.raises(TimeoutError):
+        selenium_fetcher(policy, fail=True).fetch_page(2)
+    assert not policy.breaker(LIST_URL).is_open
+    assert list(policy.breaker(LIST_URL)._outcomes) == [True, True, True, True, False]
+
+
+def test_category_overrides_come_from_catalog(tmp_path):
+    path = tmp_path / "categories.json"
+    path.write_text(json.dumps({
+        "monitor": {"ids": [112757, 11248106], "fetch": {"retries": 6, "backoff_cap": 60, "rate": 2}},
+        "chair": {"ids": [1523647]},
+    }), encoding="utf-8")
+    catalog = Catalog.load(str(path), str(tmp_path / "catalog_state.json"))
+    policy = FetchPolicy(retry=RetryPolicy(retries=4, base=0.5, cap=30), overrides=catalog.fetch_overrides())
+
+    for cat in (112757, 11248106):
+        monitor = policy.for_category(cat)
+        assert (monitor.retry.retries, monitor.retry.base, monitor.retry.cap) == (6, 0.5, 60)
+        assert monitor.bucket.rate == 2
+    # 속도 제한(rate)은 카테고리 id마다 따로 적용됩니다.
+    assert policy.for_category(112757).bucket is policy.for_category(112757).bucket
+    assert policy.for_category(112757).bucket is not policy.for_category(11248106).bucket
+    assert policy.for_category(1523647) is policy
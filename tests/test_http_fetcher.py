@@ -0,0 +1,137 @@
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from corpus import read_page
+from replay_server import ReplayServer
+
+from fetch_policy import FetchPolicy, RetryPolicy
+from fetcher import LIST_COUNT, SORT_METHOD, HttpListingFetcher
+
+
+class StubServer:
+    # 다나와 목록(GET)과 AJAX(POST)를 흉내 내고 받은 요청을 requests에 남깁니다.
+    # statuses에 상태 코드를 넣어두면 그다음 요청들에 차례로 그 코드로 응답합니다.
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def fetcher(self, **kwargs):
+        return HttpListingFetcher(list_url=self.base_url + "/list/?cate=", ajax_url=self.base_url + "/ajax", **kwargs)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body):
+                status = server.statuses.pop(0) if server.statuses else 200
+                if status != 200:
+                    self.send_error(status)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                server.requests.append(("GET", self.path, dict(self.headers), None))
+                self._send(read_page("monitor", 0))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = dict(urllib.parse.parse_qsl(self.rfile.read(length).decode("utf-8")))
+                server.requests.append(("POST", self.path, dict(self.headers), form))
+                self._send(read_page("monitor", int(form["page"])))
+
+        return Handler
+
+
+@pytest.fixture
+def stub(corpus_manifest):
+    server = StubServer()
+    yield server
+    server.stop()
+
+
+def test_open_category_and_fetch_page(stub, corpus_manifest):
+    cate = corpus_manifest["monitor"]["cate"]
+    fetcher = stub.fetcher()
+    assert fetcher.open_category(cate) == read_page("monitor", 0)
+    assert fetcher.fetch_page(2) == read_page("monitor", 2)
+
+    method, path, headers, form = stub.requests[0]
+    assert (method, path) == ("GET", f"/list/?cate={cate}")
+    method, path, headers, form = stub.requests[1]
+    assert (method, path) == ("POST", "/ajax")
+    assert headers["Referer"] == stub.base_url + f"/list/?cate={cate}"
+    assert headers["X-Requested-With"] == "XMLHttpRequest"
+    # 목록 페이지의 hidden input을 그대로 쓰고 정렬, 개수, 페이지만 바꿉니다.
+    assert form["listCategoryCode"] == str(cate)
+    assert form["physicsCate1"] == "860"
+    assert form["sortMethod"] == SORT_METHOD
+    assert form["listCount"] == str(LIST_COUNT)
+    assert form["page"] == "2"
+
+
+def test_fetch_page_requires_open_category(stub):
+    with pytest.raises(RuntimeError):
+        stub.fetcher().fetch_page(1)
+
+
+def test_server_error_without_policy_raises(stub, corpus_manifest):
+    fetcher = stub.fetcher()
+    fetcher.open_category(corpus_manifest["monitor"]["cate"])
+    stub.statuses = [503]
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch_page(1)
+
+
+def test_policy_retries_server_errors(stub, corpus_manifest):
+    fetcher = stub.fetcher(policy=FetchPolicy(retry=RetryPolicy(retries=3, base=0.01, cap=0.01)))
+    fetcher.open_category(corpus_manifest["monitor"]["cate"])
+    stub.statuses = [503, 502]
+    assert fetcher.fetch_page(3) == read_page("monitor", 3)
+    assert [request[3]["page"] for request in stub.requests[1:]] == ["3", "3", "3"]
+
+
+def test_policy_gives_up_after_retries(stub, corpus_manifest):
+    fetcher = stub.fetcher(policy=FetchPolicy(retry=RetryPolicy(retries=2, base=0.01, cap=0.01)))
+    fetcher.open_category(corpus_manifest["monitor"]["cate"])
+    stub.statuses = [503, 503, 503]
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch_page(1)
+    assert len(stub.requests) == 4
+
+
+def test_pages_in_parallel_from_replay_server(corpus_manifest):
+    # 상태가 없는 fetcher 하나로 여러 페이지를 동시에 받아도 페이지마다 맞는 목록이 옵니다.
+    server = ReplayServer(latency=0.01)
+    base = server.start()
+    try:
+        fetcher = HttpListingFetcher(list_url=base + "/list/?cate=", ajax_url=base + "/ajax")
+        fetcher.open_category(corpus_manifest["keyboard"]["cate"])
+        pages = range(1, corpus_manifest["keyboard"]["pages"] + 1)
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(fetcher.fetch_page, pages))
+        assert results == [read_page("keyboard", page) for page in pages]
+    finally:
+        server.stop()
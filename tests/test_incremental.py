@@ -0,0 +1,101 @@
+import pytest
+from corpus import read_page
+from test_crawl_workers import CorpusFetcher
+
+import incremental
+import script
+from incremental import KnownProducts, get_known_products, is_full_resync_due, load_state, update_state
+
+DAY = 24 * 60 * 60
+
+
+def corpus_pages(corpus_manifest):
+    return [(page, script.listing_parser.parse_products(read_page("monitor", page)))
+            for page in range(1, corpus_manifest["monitor"]["pages"] + 1)]
+
+
+def known_from(pages):
+    return KnownProducts({name: (price, link) for page, rows in pages for name, price, link in rows})
+
+
+def selected(pages, known):
+    return [page for cate, page, products in script.select_products(112757, iter(pages), known)]
+
+
+def test_known_unchanged_page_stops_pagination(corpus_manifest):
+    pages = corpus_pages(corpus_manifest)
+    # 앞의 두 페이지만 새로 올라왔고, 세 번째 페이지부터는 이미 저장된 상품입니다.
+    known = known_from(pages[2:])
+    assert selected(pages, known) == [1, 2]
+    # 전체 동기화(known=None)는 끝까지 봅니다.
+    assert selected(pages, None) == [page for page, rows in pages]
+
+
+def test_stops_through_crawl_pages(corpus_manifest):
+    pages = corpus_pages(corpus_manifest)
+    crawled = [page for cate, page, products in script.crawl_pages(CorpusFetcher(), 112757, known_from(pages[3:]))]
+    assert crawled == [1, 2, 3]
+
+
+@pytest.mark.parametrize("change", ["price", "pcode"])
+def test_changed_product_keeps_paginating(corpus_manifest, change):
+    pages = corpus_pages(corpus_manifest)
+    known = known_from(pages)
+    assert selected(pages, known) == []
+    page, rows = pages[0]
+    name, price, link = next(row for row in rows if not row[2].startswith('/'))
+    if change == "price":
+        # 가격이 바뀐 상품이 하나라도 있으면 그 페이지에서 멈추지 않습니다.
+        known.items[name] = (price + 1000, link)
+    else:
+        # 처음 보는 pcode(새 상품)가 있어도 멈추지 않습니다. 이름이 같아도 pcode가 다르면 새 상품입니다.
+        del known.items[name]
+        assert selected(pages, known) == [1]
+        known.items[name] = (price, "https://prod.danawa.com/info/?pcode=1")
+    # 첫 페이지는 넘기고, 바뀐 것이 없는 다음 페이지에서 멈춥니다.
+    assert selected(pages, known) == [1]
+    assert not known.page_is_known(rows)
+    assert known.page_is_known(pages[1][1])
+
+
+def test_page_of_only_slash_links_is_not_known():
+    # 링크가 /로 시작하는 상품은 저장하지 않으므로 비교에서 빼고, 그런 상품만 있으면 멈추지 않습니다.
+    known = KnownProducts({"상품": (1000, "https://prod.danawa.com/info/?pcode=1")})
+    assert not known.page_is_known([("광고", 500, "/ad")])
+    assert known.page_is_known([("상품", 1000, "https://prod.danawa.com/info/?pcode=1"), ("광고", 500, "/ad")])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100 * DAY
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(incremental, "time", clock)
+    monkeypatch.setattr(incremental, "STATE_DIR", str(tmp_path / "state"))
+    return clock
+
+
+def test_full_resync_is_forced_after_interval(clock):
+    known = KnownProducts({"상품": (1000, "https://prod.danawa.com/info/?pcode=1")})
+    # 상태 파일이 없으면 처음이므로 전체 동기화를 합니다.
+    assert get_known_products(None, "monitor", 112757, "file", 7) is None
+    update_state("monitor", known, True, "file")
+    assert load_state("monitor")["last_full_sync"] == clock.now
+
+    clock.now += 7 * DAY - 1
+    assert get_known_products(None, "monitor", 112757, "file", 7).items == known.items
+    # 증분 실행은 마지막 전체 동기화 시각을 바꾸지 않습니다.
+    update_state("monitor", known, False, "file")
+    assert load_state("monitor")["last_full_sync"] == clock.now - (7 * DAY - 1)
+
+    clock.now += 1
+    assert get_known_products(None, "monitor", 112757, "file", 7) is None
+    update_state("monitor", known, True, "file")
+    assert not is_full_resync_due(load_state("monitor"), 7)
+    assert is_full_resync_due(load_state("monitor"), 0.5, now=clock.now + DAY / 2)
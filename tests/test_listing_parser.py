@@ -0,0 +1,81 @@
+import glob
+import os
+
+import pytest
+
+from listing_parser import LxmlListingParser, SoupListingParser
+from parse_pool import ParsePool
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "listing")
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "bench", "corpus")
+
+soup = SoupListingParser()
+fast = LxmlListingParser()
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def corpus_pages():
+    return sorted(glob.glob(os.path.join(CORPUS, "*", "*.html")))
+
+
+def test_corpus_is_generated(corpus_manifest):
+    assert len(corpus_pages()) == sum(entry["pages"] + 1 for entry in corpus_manifest.values())
+
+
+def test_parsers_agree_on_corpus(corpus_manifest):
+    for path in corpus_pages():
+        html = read(path)
+        expected = soup.parse_products(html)
+        assert expected, path
+        assert fast.parse_products(html) == expected, path
+        if os.path.basename(path) == "landing.html":
+            assert fast.parse_total_products(html) == soup.parse_total_products(html), path
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(FIXTURES)))
+def test_parsers_agree_on_fixture(name):
+    html = read(os.path.join(FIXTURES, name))
+    expected = soup.parse_products(html)
+    assert fast.parse_products(html) == expected
+
+
+def test_single_quoted_class():
+    html = read(os.path.join(FIXTURES, "single_quoted_class.html"))
+    assert [name for name, price, link in fast.parse_products(html)] == ["삼성전자 오디세이 G5", "LG전자 울트라기어 27GP850"]
+
+
+def test_product_list_must_be_direct_child():
+    # div.main_prodlist > ul.product_list 이므로 한 단계 더 안쪽에 있는 목록은 읽지 않습니다.
+    # (div.main_prodlist 안에 다시 div.main_prodlist가 있으면 안쪽 목록을 읽음)
+    html = read(os.path.join(FIXTURES, "nested_product_list.html"))
+    assert [name for name, price, link in fast.parse_products(html)] == ["레노버 L27q-35", "한성컴퓨터 TFG27Q16P"]
+
+
+@pytest.mark.parametrize("name, expected", [
+    # 주석 안의 </div>나 div.main_prodlist는 태그가 아닙니다.
+    ("comment_in_list.html", ["레오폴드 FC900R", "체리 MX Board 3.0S"]),
+    # <script> 안의 "</div>" 문자열도 태그가 아닙니다.
+    ("script_in_list.html", ["로지텍 G PRO X SUPERLIGHT", "레이저 바이퍼 V2 프로"]),
+    # class 앞의 속성 값에 > 가 들어 있어도 같은 div입니다.
+    ("gt_in_attribute.html", ["데스커 DSAD118D", "한샘 샘 책상"]),
+])
+def test_markup_that_is_not_a_tag(name, expected):
+    html = read(os.path.join(FIXTURES, name))
+    assert [name for name, price, link in soup.parse_products(html)] == expected
+    assert fast.parse_products(html) == soup.parse_products(html)
+
+
+@pytest.mark.parametrize("parser_name", ["soup", "lxml"])
+def test_parse_pool_matches_parser(parser_name):
+    # 파싱 프로세스로 보낸 페이지도 이 프로세스에서 파싱한 것과 같은 결과를 내야 합니다.
+    pages = [read(os.path.join(FIXTURES, name)) for name in sorted(os.listdir(FIXTURES))]
+    pool = ParsePool(1, parser_name)
+    try:
+        results = [rows for _, rows in pool.parse_ordered(enumerate(pages))]
+    finally:
+        pool.close()
+    assert results == [soup.parse_products(html) for html in pages]
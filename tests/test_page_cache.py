@@ -0,0 +1,166 @@
+import os
+
+import page_cache
+import pytest
+from corpus import read_page
+from replay_server import ReplayServer
+
+from fetcher import LIST_COUNT, SORT_METHOD, CachedListingFetcher, HttpListingFetcher
+from page_cache import CacheMiss, PageCache, page_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(page_cache, "time", clock)
+    return clock
+
+
+def blobs(directory):
+    blob_dir = os.path.join(directory, "blobs")
+    return sorted(name for prefix in os.listdir(blob_dir) for name in os.listdir(os.path.join(blob_dir, prefix)))
+
+
+def test_fresh_until_ttl(tmp_path, clock):
+    cache = PageCache(str(tmp_path), ttl=60)
+    cache.put("a", "<html>a</html>", etag='"a"')
+    assert cache.is_fresh(cache.get("a"))
+    clock.now += 61
+    assert not cache.is_fresh(cache.get("a"))
+    assert cache.conditional_headers(cache.get("a")) == {"If-None-Match": '"a"'}
+    # 304로 확인하면 다시 유효 시간이 시작됩니다.
+    assert cache.revalidate("a") == "<html>a</html>"
+    assert cache.is_fresh(cache.get("a"))
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=20)
+    for key in ("a", "b"):
+        cache.put(key, key * 10)
+        clock.now += 1
+    assert cache.read("a") == "a" * 10
+    clock.now += 1
+    # b가 가장 오래 쓰지 않은 키이므로 c를 넣으면 b가 지워집니다.
+    cache.put("c", "c" * 10)
+    assert sorted(cache.entries) == ["a", "c"]
+    assert cache.read("b") is None
+    assert len(blobs(str(tmp_path))) == 2
+
+
+def test_shared_blob_is_deleted_with_last_key(tmp_path, clock):
+    cache = PageCache(str(tmp_path))
+    cache.put("a", "<html>같은 본문</html>")
+    cache.put("b", "<html>같은 본문</html>")
+    assert len(blobs(str(tmp_path))) == 1
+    assert cache._size == len("<html>같은 본문</html>".encode("utf-8"))
+
+    cache.put("a", "<html>새 본문</html>")
+    assert len(blobs(str(tmp_path))) == 2
+    assert cache.read("b") == "<html>같은 본문</html>"
+    cache.put("b", "<html>새 본문</html>")
+    assert len(blobs(str(tmp_path))) == 1
+    assert cache._size == len("<html>새 본문</html>".encode("utf-8"))
+    # 같은 키에 같은 본문을 다시 넣어도 파일은 남아 있습니다.
+    cache.put("b", "<html>새 본문</html>")
+    assert cache.read("a") == cache.read("b") == "<html>새 본문</html>"
+
+
+def test_index_survives_restart(tmp_path, clock):
+    cache = PageCache(str(tmp_path), save_every=1000)
+    cache.put("a", "<html>a</html>", etag='"a"')
+    cache.close()
+    # 목록을 저장하지 못한 채 멈춘 본문 파일은 다음 시작에서 지웁니다.
+    cache.put("b", "<html>b</html>")
+
+    cache = PageCache(str(tmp_path))
+    assert sorted(cache.entries) == ["a"]
+    assert cache.read("a") == "<html>a</html>"
+    assert cache.get("a")["etag"] == '"a"'
+    assert len(blobs(str(tmp_path))) == 1
+
+
+def test_missing_blob_is_a_miss(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put("a", "<html>a</html>")
+    os.remove(cache._blob_path(cache.get("a")["blob"]))
+    assert cache.read("a") is None
+    assert cache.get("a") is None
+
+
+@pytest.fixture
+def server(corpus_manifest):
+    server = ReplayServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def http_fetcher(server, cache):
+    return HttpListingFetcher(list_url=server.base_url + "/list/?cate=", ajax_url=server.base_url + "/ajax",
+                              cache=cache)
+
+
+def crawl(fetcher, cate, pages):
+    return [fetcher.open_category(cate)] + [fetcher.fetch_page(page) for page in range(1, pages + 1)]
+
+
+def test_http_fetcher_uses_cache_within_ttl(tmp_path, clock, server, corpus_manifest):
+    cate = corpus_manifest["monitor"]["cate"]
+    expected = [read_page("monitor", page) for page in range(3)]
+    cache = PageCache(str(tmp_path), ttl=60)
+    assert crawl(http_fetcher(server, cache), cate, 2) == expected
+    assert server.requests == 3
+
+    # 유효 시간 안에는 요청하지 않습니다.
+    assert crawl(http_fetcher(server, cache), cate, 2) == expected
+    assert server.requests == 3
+
+    # 지나면 ETag로 확인하고 304면 저장된 본문을 씁니다.
+    clock.now += 61
+    assert crawl(http_fetcher(server, cache), cate, 2) == expected
+    assert (server.requests, server.not_modified) == (6, 3)
+    assert all(cache.is_fresh(entry) for entry in cache.entries.values())
+
+
+def test_http_fetcher_refetches_when_etag_differs_or_blob_is_gone(tmp_path, clock, server, corpus_manifest):
+    cate = corpus_manifest["monitor"]["cate"]
+    cache = PageCache(str(tmp_path), ttl=0)
+    fetcher = http_fetcher(server, cache)
+    fetcher.open_category(cate)
+    key = page_key(cate, 1, SORT_METHOD, LIST_COUNT)
+
+    # 캐시에 다른 내용이 있으면 서버는 304 대신 새 본문을 보내고, 캐시도 새 본문으로 바뀝니다.
+    cache.put(key, "<html>오래된 목록</html>", etag='"old"')
+    assert fetcher.fetch_page(1) == read_page("monitor", 1)
+    assert cache.read(key) == read_page("monitor", 1)
+    assert server.not_modified == 0
+
+    # 304를 받았는데 저장된 본문이 없어졌으면 조건 없이 다시 받습니다.
+    os.remove(cache._blob_path(cache.get(key)["blob"]))
+    requests = server.requests
+    assert fetcher.fetch_page(1) == read_page("monitor", 1)
+    assert server.requests == requests + 2
+    assert server.not_modified == 1
+    assert cache.read(key) == read_page("monitor", 1)
+
+
+def test_cached_fetcher_replays_and_reports_misses(tmp_path, server, corpus_manifest):
+    cate = corpus_manifest["monitor"]["cate"]
+    cache = PageCache(str(tmp_path))
+    expected = crawl(http_fetcher(server, cache), cate, 2)
+    cache.close()
+
+    replay = CachedListingFetcher(PageCache(str(tmp_path)))
+    assert crawl(replay, cate, 2) == expected
+    with pytest.raises(CacheMiss):
+        replay.fetch_page(3)
+    with pytest.raises(CacheMiss):
+        replay.open_category(corpus_manifest["keyboard"]["cate"])
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+from datetime import datetime
+
+import pytest
+from parquet_sink import ParquetSink, parquet_available
+from product import Product
+from replay_server import ReplayServer
+from sqlite_db import SqliteDB
+from test_resume import crawl_env, start, write_catalog
+
+pytestmark = pytest.mark.skipif(not parquet_available(), reason="pyarrow가 설치되어 있지 않습니다.")
+
+
+def make_products(count):
+    return [Product(f"상품 {i}", 1000 + i, f"https://prod.danawa.com/info/?pcode={i}") for i in range(count)]
+
+
+def make_sink(path):
+    return ParquetSink(str(path), "monitor", 1, datetime(2024, 1, 1), batch_rows=2)
+
+
+def test_abort_removes_temp_file_and_keeps_previous_output(tmp_path):
+    import pyarrow.parquet as pq
+
+    path = tmp_path / "monitor.parquet"
+    sink = make_sink(path)
+    sink.write(make_products(3))
+    sink.close()
+
+    # 다음 크롤링이 중간에 멈추면 임시 파일만 지우고 이전 결과는 그대로 둡니다.
+    sink = make_sink(path)
+    sink.write(make_products(5))
+    assert os.path.exists(sink.temp_path)
+    sink.abort()
+    assert not os.path.exists(sink.temp_path)
+    assert pq.read_table(str(path)).num_rows == 3
+
+
+def test_abort_after_close_does_nothing(tmp_path):
+    path = tmp_path / "monitor.parquet"
+    sink = make_sink(path)
+    sink.write(make_products(3))
+    sink.close()
+    sink.abort()
+    assert os.path.exists(path)
+    assert sink.rows == 3
+
+
+def test_failed_category_leaves_no_parquet_temp_file(tmp_path, corpus_manifest):
+    server = ReplayServer()
+    base = server.start()
+    try:
+        write_catalog(tmp_path / "categories.json", corpus_manifest)
+        os.mkdir(tmp_path / "data")
+        db = SqliteDB(str(tmp_path / "data" / "equipments.db"))
+        db.start()
+        db.stop()
+        # 첫 배치를 저장하는 도중에 DB 쓰기가 실패하게 합니다.
+        conn = sqlite3.connect(str(tmp_path / "data" / "equipments.db"))
+        conn.execute("""
+            CREATE TRIGGER FAIL_INSERT BEFORE INSERT ON EQUIPMENTS
+            WHEN (SELECT COUNT(*) FROM EQUIPMENTS) >= 30
+            BEGIN SELECT RAISE(ABORT, 'fail'); END
+        """)
+        conn.commit()
+        conn.close()
+
+        env = crawl_env(base, str(tmp_path), "0")
+        env["PARQUET"] = "1"
+        assert start(str(tmp_path), env).wait(120) != 0
+    finally:
+        server.stop()
+
+    assert [name for name in os.listdir(tmp_path / "data") if name.endswith(".parquet.tmp")] == []
@@ -0,0 +1,32 @@
+from pipeline import Deduper
+from product import Product
+
+
+def test_dedup_by_pcode_and_name():
+    products = [
+        Product("델 P2723DE", 512000, "https://prod.danawa.com/info/?pcode=2001&cate=112757"),
+        # 이름이 달라도 pcode가 같으면 같은 상품
+        Product("델 P2723DE (정품)", 515000, "https://prod.danawa.com/info/?cate=112757&pcode=2001"),
+        Product("레노버 L27q-35", 259000, "https://prod.danawa.com/info/?pcode=2002"),
+        # pcode가 없는 링크는 제품명으로 확인
+        Product("광고 상품", 1000, "/ad/click?id=1"),
+        Product("광고 상품", 2000, "/ad/click?id=2"),
+    ]
+    deduper = Deduper()
+    assert [product.price for product in deduper.filter(products)] == [512000, 259000, 1000]
+    assert deduper.duplicate == 2
+    assert products[1] in deduper
+    assert Product("한성컴퓨터 TFG27Q16P", 199000, "https://prod.danawa.com/info/?pcode=2003") not in deduper
+
+
+def test_pending_keys_only_when_tracked():
+    products = [Product(f"상품 {i}", 1000, f"https://prod.danawa.com/info/?pcode={i}") for i in range(3)]
+    deduper = Deduper()
+    deduper.filter(products)
+    assert deduper.pending is None
+    assert deduper.take_pending() == []
+
+    deduper = Deduper([0], track_pending=True)
+    deduper.filter(products)
+    assert deduper.take_pending() == [1, 2]
+    assert deduper.take_pending() == []
@@ -0,0 +1,137 @@
+import random
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from pipeline import batched
+from product import Product, product_key
+from product_index import ProductIndex, get_product_router, tokenize
+
+WORDS = ["삼성전자", "LG전자", "오디세이", "울트라기어", "27GP850", "G5", "QHD", "4K", "게이밍", "모니터", "커브드", "IPS"]
+
+
+def make_products(rng, count, first_pcode=1):
+    return [Product(" ".join(rng.sample(WORDS, rng.randint(2, 5))), rng.randrange(100000, 1000000, 1000),
+                    f"https://prod.danawa.com/info/?pcode={pcode}")
+            for pcode in range(first_pcode, first_pcode + count)]
+
+
+def brute_range(products, min_price=None, max_price=None):
+    return sorted((product.price, product_key(product.name, product.link)) for product in products
+                  if (min_price is None or product.price >= min_price) and (max_price is None or product.price <= max_price))
+
+
+def brute_search(products, query):
+    tokens = tokenize(query)
+    return sorted((product.price, product_key(product.name, product.link)) for product in products
+                  if tokens and all(any(word.startswith(token) for word in tokenize(product.name)) for token in tokens))
+
+
+def keys(items):
+    return [(item["price"], product_key(item["name"], item["link"])) for item in items]
+
+
+def check(index, products, rng):
+    category = index.categories["monitor"]
+    # 정렬 목록이 상품 목록과 어긋나지 않아야 합니다.
+    assert category.by_price == sorted((item[1], key) for key, item in category.items.items())
+    assert category.sorted_tokens == sorted(category.tokens)
+    assert len(category) == len(products)
+
+    for _ in range(30):
+        low = rng.randrange(0, 1000000, 1000)
+        high = low + rng.randrange(0, 400000, 1000)
+        bounds = rng.choice([(low, high), (low, None), (None, high), (None, None), (high, low)])
+        expected = brute_range(products, *bounds)
+        offset = rng.randrange(0, 60)
+        total, items = index.by_price("monitor", *bounds, offset=offset, limit=25)
+        assert total == len(expected)
+        assert keys(items) == expected[offset:offset + 25]
+        total, items = index.by_price("monitor", *bounds, offset=offset, limit=25, descending=True)
+        assert keys(items) == expected[::-1][offset:offset + 25]
+
+    words = [word for product in products[:50] for word in tokenize(product.name)]
+    for _ in range(30):
+        query = " ".join(word[:rng.randint(1, len(word))] for word in rng.sample(words, rng.randint(1, 2)))
+        expected = brute_search(products, query)
+        total, items = index.search(query, "monitor", offset=5, limit=40)
+        assert total == len(expected), query
+        assert keys(items) == expected[5:45], query
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(0)
+    products = make_products(rng, 1000)
+    index = ProductIndex()
+    index.begin("monitor")
+    for page in batched(products, 90):
+        index.update("monitor", page)
+    assert index.finish("monitor") == 0
+    check(index, products, rng)
+
+    # 다시 크롤링: 일부는 가격이나 이름이 바뀌고, 일부는 빠지고, 새 상품이 들어옵니다.
+    index.begin("monitor")
+    changed = []
+    for product in products:
+        roll = rng.random()
+        if roll < 0.05:
+            continue
+        if roll < 0.10:
+            product = product._replace(price=product.price + rng.randrange(-50000, 50000, 1000))
+        elif roll < 0.15:
+            product = product._replace(name=" ".join(rng.sample(WORDS, 3)))
+        changed.append(product)
+    changed += make_products(rng, 30, first_pcode=5000)
+    rng.shuffle(changed)
+    for page in batched(changed, 90):
+        index.update("monitor", page)
+    # 끝내기 전에는 빠진 상품도 남아 있습니다.
+    assert len(index.categories["monitor"]) == 1030
+    assert index.finish("monitor") == 1030 - len(changed)
+    check(index, changed, rng)
+
+    # 페이지 하나만 다시 들어온 경우 나머지는 모두 지워집니다.
+    index.begin("monitor")
+    index.update("monitor", changed[:90])
+    index.finish("monitor")
+    check(index, changed[:90], rng)
+
+
+def make_client():
+    index = ProductIndex()
+    index.begin("monitor")
+    index.update("monitor", [Product(f"모니터 {i}", 100000 + i * 1000, f"https://prod.danawa.com/info/?pcode={i}")
+                             for i in range(120)])
+    index.finish("monitor")
+    app = FastAPI()
+    app.include_router(get_product_router(index))
+    return TestClient(app)
+
+
+def test_products_api_pages_by_price():
+    client = make_client()
+    assert client.get("/products").json() == {"monitor": 120}
+
+    body = client.get("/products/monitor", params={"min_price": 150000, "offset": 10, "limit": 20}).json()
+    assert (body["total"], body["offset"], body["limit"]) == (70, 10, 20)
+    assert [item["price"] for item in body["items"]] == [160000 + i * 1000 for i in range(20)]
+
+    body = client.get("/products/monitor", params={"order": "desc", "offset": 110, "limit": 50}).json()
+    assert body["total"] == 120
+    assert [item["price"] for item in body["items"]] == [109000 - i * 1000 for i in range(10)]
+
+    body = client.get("/products/search", params={"q": "모니터 11", "offset": 2, "limit": 5}).json()
+    # "11", "110" ~ "119"
+    assert body["total"] == 11
+    assert [item["name"] for item in body["items"]] == [f"모니터 {i}" for i in range(111, 116)]
+
+
+def test_products_api_errors():
+    client = make_client()
+    response = client.get("/products/chair")
+    assert response.status_code == 404
+    assert "chair" in response.json()["detail"]
+    for params in ({"limit": 0}, {"limit": 201}, {"offset": -1}, {"order": "cheap"}, {"min_price": "abc"}):
+        assert client.get("/products/monitor", params=params).status_code == 422, params
+    assert client.get("/products/search").status_code == 422
+    assert client.get("/products/search", params={"q": ""}).status_code == 422
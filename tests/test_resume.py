@@ -0,0 +1,100 @@
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from replay_server import ReplayServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATEGORIES = ["monitor", "keyboard"]
+
+
+@pytest.fixture
+def server(corpus_manifest):
+    # 페이지마다 지연을 줘서 크롤링 도중에 멈출 시간을 만듭니다.
+    server = ReplayServer(latency=0.05)
+    base = server.start()
+    yield base
+    server.stop()
+
+
+def write_catalog(path, corpus_manifest):
+    # 재생 서버에 있는 카테고리 id만 크롤링합니다.
+    catalog = {name: {"ids": [corpus_manifest[name]["cate"]], "priority": 1, "db_name": name.capitalize()}
+               for name in CATEGORIES}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f)
+
+
+def crawl_env(base, directory, db_async):
+    env = dict(os.environ)
+    env.update({
+        "CATALOG": os.path.join(directory, "categories.json"),
+        "LIST_URL": base + "/list/?cate=",
+        "AJAX_URL": base + "/ajax",
+        "STORAGE": "sqlite",
+        "DB_ASYNC": db_async,
+        "SINK_BATCH_SIZE": "90",
+        "PAGE_CONCURRENCY": "1",
+        "CRAWL_CONCURRENCY": "1",
+        "RATE_LIMIT_PER_HOST": "0",
+    })
+    return env
+
+
+def start(directory, env, *args):
+    return subprocess.Popen([sys.executable, os.path.join(ROOT, "script.py"), *args], cwd=directory, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def read_checkpoint(directory):
+    try:
+        with open(os.path.join(directory, "data", "checkpoint.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_outputs(directory):
+    outputs = {}
+    for name in CATEGORIES:
+        with open(os.path.join(directory, "data", f"{name}.csv"), "rb") as f:
+            outputs[name] = f.read()
+    conn = sqlite3.connect(os.path.join(directory, "data", "equipments.db"))
+    outputs["db"] = conn.execute("SELECT EQUIP_CATE_NO, EQUIP_NM, EQUIP_PRICE, EQUIP_LINK FROM EQUIPMENTS "
+                                 "ORDER BY EQUIP_NM").fetchall()
+    conn.close()
+    return outputs
+
+
+@pytest.mark.parametrize("db_async", ["0", "1"])
+def test_resume_after_kill_matches_full_run(tmp_path, server, corpus_manifest, db_async):
+    full = tmp_path / "full"
+    killed = tmp_path / "killed"
+    for directory in (full, killed):
+        directory.mkdir()
+        write_catalog(directory / "categories.json", corpus_manifest)
+
+    assert start(str(full), crawl_env(server, str(full), db_async)).wait(120) == 0
+
+    # 첫 카테고리의 몇 페이지가 커밋된 뒤에 SIGKILL로 멈춥니다.
+    process = start(str(killed), crawl_env(server, str(killed), db_async))
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        checkpoint = read_checkpoint(str(killed))
+        if checkpoint is not None and checkpoint["category"] == CATEGORIES[0] and checkpoint["page"] >= 3:
+            break
+        time.sleep(0.01)
+    os.kill(process.pid, signal.SIGKILL)
+    assert process.wait(10) == -signal.SIGKILL
+    checkpoint = read_checkpoint(str(killed))
+    assert checkpoint["category"] == CATEGORIES[0]
+    assert checkpoint["page"] < corpus_manifest[CATEGORIES[0]]["pages"]
+
+    assert start(str(killed), crawl_env(server, str(killed), db_async), "--resume").wait(120) == 0
+    assert read_checkpoint(str(killed)) is None
+    assert read_outputs(str(killed)) == read_outputs(str(full))
@@ -0,0 +1,81 @@
+import os
+import pathlib
+import shutil
+import time
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+
+from fetcher import mark_list_stale, wait_list_ready
+
+FIXTURE = pathlib.Path(os.path.dirname(__file__), "fixtures", "delayed_ajax.html").as_uri()
+
+
+@pytest.fixture(scope="module")
+def driver():
+    # 헤드리스 크롬이 없는 환경에서는 건너뜁니다.
+    if shutil.which("chromedriver") is None:
+        pytest.skip("chromedriver가 없습니다.")
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"크롬을 띄울 수 없습니다. ({e.msg})")
+    yield driver
+    driver.quit()
+
+
+def open_fixture(driver, delay, number_delay=0):
+    driver.get(f"{FIXTURE}?delay={delay}&number_delay={number_delay}")
+    wait_list_ready(driver, 1, timeout=5)
+
+
+def move_page(driver, page):
+    mark_list_stale(driver)
+    driver.execute_script(f"javascript:movePage({page});")
+
+
+def item_text(driver):
+    return driver.find_element(By.CSS_SELECTOR, "ul.product_list > li.prod_item").text
+
+
+def test_waits_for_delayed_list(driver):
+    open_fixture(driver, delay=400)
+    move_page(driver, 2)
+    start = time.perf_counter()
+    wait_list_ready(driver, 2, timeout=5)
+    # 이전 목록을 읽지 않고, 응답이 들어온 직후에 끝납니다.
+    assert item_text(driver) == "page 2 item"
+    assert 0.35 <= time.perf_counter() - start < 2
+
+
+def test_waits_for_page_number(driver):
+    # 목록이 먼저 바뀌고 페이지 번호는 나중에 바뀌는 경우에도 번호가 맞을 때까지 기다립니다.
+    open_fixture(driver, delay=100, number_delay=400)
+    move_page(driver, 2)
+    start = time.perf_counter()
+    wait_list_ready(driver, 2, timeout=5)
+    assert driver.find_element(By.CSS_SELECTOR, "div.number_wrap a.now_on").text == "2"
+    assert time.perf_counter() - start >= 0.45
+
+
+def test_stale_list_times_out(driver):
+    # 표시해둔 목록이 바뀌지 않으면 timeout초 뒤에 TimeoutException이 납니다.
+    open_fixture(driver, delay=100)
+    mark_list_stale(driver)
+    with pytest.raises(TimeoutException):
+        wait_list_ready(driver, 1, timeout=1)
+
+
+def test_consecutive_pages(driver):
+    open_fixture(driver, delay=50)
+    for page in range(2, 6):
+        move_page(driver, page)
+        wait_list_ready(driver, page, timeout=5)
+        assert item_text(driver) == f"page {page} item"
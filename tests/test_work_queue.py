@@ -0,0 +1,150 @@
+import os
+
+import pytest
+import work_queue
+from replay_server import ReplayServer
+from test_resume import crawl_env, read_outputs, start, write_catalog
+from work_queue import WorkQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "work_queue.db"), lease_seconds=60, max_attempts=3)
+    yield queue
+    queue.close()
+
+
+def add(queue, pages=3):
+    queue.add_category("monitor", 112757, pages * 90, pages)
+    queue.seal()
+
+
+def rows(page):
+    return [(f"상품 {page}", 1000 * page, f"https://prod.danawa.com/info/?pcode={page}")]
+
+
+def test_expired_lease_goes_to_another_worker(queue, clock):
+    add(queue)
+    first = queue.lease("a", 2)
+    assert [item.page for item in first] == [1, 2]
+    assert [item.page for item in queue.lease("b", 2)] == [3]
+    assert queue.lease("b") == []
+
+    # a가 임대 시간 안에 끝내지 못하면 b가 같은 작업을 다시 가져갑니다.
+    clock.now += 61
+    again = queue.lease("b", 2)
+    assert [(item.page, item.attempts) for item in again] == [(1, 2), (2, 2)]
+
+
+def test_late_fail_after_release_does_nothing(queue, clock):
+    add(queue, 1)
+    item = queue.lease("a")[0]
+    clock.now += 61
+    taken = queue.lease("b")[0]
+    # 임대 시간이 지난 뒤 a가 실패를 알려도 b의 임대는 그대로입니다.
+    queue.fail(item, "a", "시간 초과 뒤 실패")
+    assert queue.counts()["leased"] == 1
+    queue.complete(taken, "b", rows(1))
+    assert queue.counts()["done"] == 1
+    assert queue.finished()
+
+
+def test_first_result_wins(queue, clock):
+    add(queue, 1)
+    item = queue.lease("a")[0]
+    clock.now += 61
+    again = queue.lease("b")[0]
+    queue.complete(again, "b", rows(1))
+    # 늦게 끝난 a의 결과는 버리고, 먼저 들어온 b의 결과를 씁니다.
+    queue.complete(item, "a", [("다른 결과", 1, "https://prod.danawa.com/info/?pcode=9")])
+    assert list(queue.pages(112757)) == [(1, rows(1))]
+
+
+def test_max_attempts_ends_in_failed(queue, clock):
+    add(queue, 2)
+    for attempt in range(3):
+        item = queue.lease("a")[0]
+        assert (item.page, item.attempts) == (1, attempt + 1)
+        queue.fail(item, "a", "오류")
+    assert queue.failures() == [(112757, 1, "오류")]
+
+    # 임대 시간이 지나기만 한 경우도 max_attempts번이 넘으면 failed가 됩니다.
+    for _ in range(3):
+        assert [item.page for item in queue.lease("a")] == [2]
+        clock.now += 61
+    assert queue.lease("a") == []
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 0, "failed": 2}
+    assert queue.finished()
+
+
+def test_pages_stop_at_first_missing_page(queue):
+    add(queue, 4)
+    items = queue.lease("a", 4)
+    for item in items:
+        if item.page == 2:
+            queue.fail(item, "a", "오류")
+        else:
+            queue.complete(item, "a", rows(item.page))
+    assert list(queue.pages(112757)) == [(1, rows(1))]
+    assert list(queue.pages(112757, start_page=3)) == [(3, rows(3)), (4, rows(4))]
+
+
+def test_not_finished_until_sealed(queue):
+    queue.add_category("monitor", 112757, 90, 1)
+    queue.complete(queue.lease("a")[0], "a", rows(1))
+    assert not queue.finished()
+    queue.seal()
+    assert queue.finished()
+
+
+@pytest.fixture
+def server(corpus_manifest):
+    server = ReplayServer()
+    base = server.start()
+    yield base
+    server.stop()
+
+
+def test_merge_refuses_unfinished_queue(tmp_path, server, corpus_manifest):
+    write_catalog(tmp_path / "categories.json", corpus_manifest)
+    env = crawl_env(server, str(tmp_path), "0")
+    assert start(str(tmp_path), env, "--role", "coordinator").wait(120) == 0
+    queue = WorkQueue(str(tmp_path / "data" / "work_queue.db"))
+    assert queue.sealed() and queue.counts()["pending"] > 0
+    queue.close()
+    # 워커가 아직 작업을 끝내지 않았으므로 병합하지 않고 실패로 끝납니다.
+    assert start(str(tmp_path), env, "--role", "merge").wait(120) == 1
+    assert not os.path.exists(tmp_path / "data" / "equipments.db")
+    assert not [name for name in os.listdir(tmp_path / "data") if name.endswith(".csv")]
+
+
+def test_coordinator_worker_merge_matches_crawl(tmp_path, server, corpus_manifest):
+    full = tmp_path / "full"
+    queued = tmp_path / "queued"
+    for directory in (full, queued):
+        directory.mkdir()
+        write_catalog(directory / "categories.json", corpus_manifest)
+    assert start(str(full), crawl_env(server, str(full), "0")).wait(120) == 0
+
+    env = crawl_env(server, str(queued), "0")
+    env["CRAWL_CONCURRENCY"] = "2"
+    assert start(str(queued), env, "--role", "coordinator").wait(120) == 0
+    workers = [start(str(queued), env, "--role", "worker") for _ in range(2)]
+    assert [worker.wait(120) for worker in workers] == [0, 0]
+    assert start(str(queued), env, "--role", "merge").wait(120) == 0
+    assert read_outputs(str(queued)) == read_outputs(str(full))
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+WORK_QUEUE_PATH = os.path.join("data", "work_queue.db")
+
+# 작업 = (카테고리 id, 페이지) 하나. 상태는 pending → leased → done 이고,
+# 실패하거나 임대 시간(LEASE_UNTIL)이 지나면 다시 pending이 되어 다른 워커에게 갑니다. (ATTEMPTS번 넘으면 failed)
+# 결과(WORK_RESULTS)는 (카테고리 id, 페이지)마다 처음 들어온 것만 남기므로, 같은 작업이 두 번 끝나도 결과는 같습니다.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS WORK_CATEGORIES (
+    CAT INTEGER PRIMARY KEY,
+    CATE_NAME TEXT NOT NULL,
+    TOTAL_PRODUCTS INTEGER NOT NULL,
+    PAGES INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS WORK_ITEMS (
+    ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    CAT INTEGER NOT NULL,
+    PAGE INTEGER NOT NULL,
+    STATE TEXT NOT NULL DEFAULT 'pending',
+    OWNER TEXT,
+    LEASE_UNTIL REAL,
+    ATTEMPTS INTEGER NOT NULL DEFAULT 0,
+    ERROR TEXT,
+    UNIQUE (CAT, PAGE)
+);
+CREATE INDEX IF NOT EXISTS IX_WORK_ITEMS_STATE ON WORK_ITEMS (STATE, ID);
+CREATE TABLE IF NOT EXISTS WORK_RESULTS (
+    CAT INTEGER NOT NULL,
+    PAGE INTEGER NOT NULL,
+    ROWS TEXT NOT NULL,
+    WORKER TEXT,
+    PRIMARY KEY (CAT, PAGE)
+);
+CREATE TABLE IF NOT EXISTS WORK_META (
+    NAME TEXT PRIMARY KEY,
+    VALUE TEXT
+);
+"""
+
+WorkItem = namedtuple("WorkItem", ["id", "cat", "page", "attempts"])
+
+
+class WorkQueue:
+    # 여러 프로세스(머신)가 같이 쓰는 작업 큐입니다. SQLite 파일 하나에 작업, 임대, 결과를 모두 담습니다.
+    #   코디네이터 : reset() → add_category()로 카테고리 id마다 페이지 작업을 넣고 → seal()
+    #   워커       : lease()로 작업을 빌려서 → complete() 또는 fail()
+    #   병합       : finished()를 확인하고 pages()로 카테고리 id별 결과를 페이지 순서대로 읽음
+    # 임대는 lease_seconds초 동안 유효하고, 그 안에 끝내지 못한 작업은 다른 워커가 다시 가져갑니다.
+    # 여러 머신에서 같은 파일을 쓸 수 있도록 WAL이 아닌 기본 저널 모드를 사용합니다. (WAL은 공유 메모리가 필요)
+    def __init__(self, path=WORK_QUEUE_PATH, lease_seconds=120, max_attempts=5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        # sqlite3 커넥션은 스레드 사이에 공유할 수 없으므로 스레드마다 따로 엽니다.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # 임대처럼 읽고 바로 고치는 작업은 쓰기 잠금(BEGIN IMMEDIATE)을 먼저 잡아서 두 워커가 같은 작업을 가져가지 않게 합니다.
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def reset(self):
+        with self._transaction() as conn:
+            for table in ("WORK_CATEGORIES", "WORK_ITEMS", "WORK_RESULTS", "WORK_META"):
+                conn.execute(f"DELETE FROM {table}")
+
+    def add_category(self, cate_name, cat, total_products, pages):
+        # 이미 들어있는 작업은 그대로 둡니다. (코디네이터를 다시 실행해도 끝난 작업을 잃지 않음)
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO WORK_CATEGORIES (CAT, CATE_NAME, TOTAL_PRODUCTS, PAGES) "
+                         "VALUES (?, ?, ?, ?)", (cat, cate_name, total_products, pages))
+            conn.executemany("INSERT OR IGNORE INTO WORK_ITEMS (CAT, PAGE) VALUES (?, ?)",
+                             [(cat, page) for page in range(1, pages + 1)])
+
+    def seal(self):
+        # 코디네이터가 작업을 모두 넣었다는 표시. 이 전에는 큐가 비어 보여도 워커가 끝나지 않고 기다립니다.
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO WORK_META (NAME, VALUE) VALUES ('sealed', '1')")
+
+    def sealed(self):
+        row = self.connection().execute("SELECT VALUE FROM WORK_META WHERE NAME = 'sealed'").fetchone()
+        return row is not None
+
+    def lease(self, worker, count=1):
+        # 기다리는 작업(또는 임대 시간이 지난 작업)을 작업 순서대로 count개까지 빌립니다.
+        # 작업 순서는 카테고리 id, 페이지 순이므로 한 워커가 같은 카테고리 id의 연속된 페이지를 받게 됩니다.
+        now = time.time()
+        with self._transaction() as conn:
+            # 임대 시간이 지났는데 이미 max_attempts번 빌려간 작업은 더 돌리지 않습니다.
+            conn.execute("UPDATE WORK_ITEMS SET STATE = 'failed', OWNER = NULL, LEASE_UNTIL = NULL, "
+                         "ERROR = COALESCE(ERROR, '임대 시간 초과') "
+                         "WHERE STATE = 'leased' AND LEASE_UNTIL < ? AND ATTEMPTS >= ?", (now, self.max_attempts))
+            rows = conn.execute("SELECT ID, CAT, PAGE, ATTEMPTS FROM WORK_ITEMS "
+                                "WHERE STATE = 'pending' OR (STATE = 'leased' AND LEASE_UNTIL < ?) "
+                                "ORDER BY ID LIMIT ?", (now, count)).fetchall()
+            conn.executemany("UPDATE WORK_ITEMS SET STATE = 'leased', OWNER = ?, LEASE_UNTIL = ?, "
+                             "ATTEMPTS = ATTEMPTS + 1 WHERE ID = ?",
+                             [(worker, now + self.lease_seconds, row[0]) for row in rows])
+        return [WorkItem(item_id, cat, page, attempts + 1) for item_id, cat, page, attempts in rows]
+
+    def renew(self, items, worker):
+        # 아직 처리하지 못한 작업의 임대 시간을 늘립니다. (다른 워커에게 넘어간 작업은 그대로)
+        with self._transaction() as conn:
+            conn.executemany("UPDATE WORK_ITEMS SET LEASE_UNTIL = ? "
+                             "WHERE ID = ? AND STATE = 'leased' AND OWNER = ?",
+                             [(time.time() + self.lease_seconds, item.id, worker) for item in items])
+
+    def complete(self, item, worker, rows):
+        # rows = [(제품명, 가격, 링크), ...]. 임대 시간이 지난 뒤에 끝났더라도 결과는 받습니다.
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO WORK_RESULTS (CAT, PAGE, ROWS, WORKER) VALUES (?, ?, ?, ?)",
+                         (item.cat, item.page, json.dumps(rows, ensure_ascii=False), worker))
+            conn.execute("UPDATE WORK_ITEMS SET STATE = 'done', OWNER = ?, LEASE_UNTIL = NULL, ERROR = NULL "
+                         "WHERE ID = ?", (worker, item.id))
+
+    def fail(self, item, worker, error):
+        # 내 임대가 아직 유효한 작업만 되돌립니다. max_attempts번 실패하면 failed로 남깁니다.
+        with self._transaction() as conn:
+            conn.execute("UPDATE WORK_ITEMS SET STATE = CASE WHEN ATTEMPTS >= ? THEN 'failed' ELSE 'pending' END, "
+                         "OWNER = NULL, LEASE_UNTIL = NULL, ERROR = ? "
+                         "WHERE ID = ? AND STATE = 'leased' AND OWNER = ?",
+                         (self.max_attempts, str(error), item.id, worker))
+
+    def counts(self):
+        rows = self.connection().execute("SELECT STATE, COUNT(*) FROM WORK_ITEMS GROUP BY STATE").fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(rows)
+        return counts
+
+    def finished(self):
+        # 코디네이터가 작업을 다 넣었고, 남은(기다리거나 임대 중인) 작업이 없으면 끝난 것입니다.
+        counts = self.counts()
+        return self.sealed() and counts["pending"] == 0 and counts["leased"] == 0
+
+    def failures(self):
+        return self.connection().execute("SELECT CAT, PAGE, ERROR FROM WORK_ITEMS WHERE STATE = 'failed' "
+                                         "ORDER BY ID").fetchall()
+
+    def category(self, cat):
+        # (카테고리 이름, 총 상품 개수, 페이지 수). 코디네이터가 열지 못한 카테고리 id는 None
+        return self.connection().execute("SELECT CATE_NAME, TOTAL_PRODUCTS, PAGES FROM WORK_CATEGORIES "
+                                         "WHERE CAT = ?", (cat,)).fetchone()
+
+    def category_names(self):
+        return {row[0] for row in self.connection().execute("SELECT DISTINCT CATE_NAME FROM WORK_CATEGORIES")}
+
+    def pages(self, cat, start_page=1):
+        # start_page부터 (페이지, [(제품명, 가격, 링크), ...])를 페이지 순서대로 돌려줍니다.
+        # 결과가 없는 페이지(실패한 작업)를 만나면 거기서 멈춥니다. (start_crawl에서 오류가 나면 그 id를 멈추는 것과 같음)
+        page = start_page
+        for result_page, rows in self.connection().execute(
+                "SELECT PAGE, ROWS FROM WORK_RESULTS WHERE CAT = ? AND PAGE >= ? ORDER BY PAGE", (cat, start_page)):
+            if result_page != page:
+                break
+            yield page, [tuple(row) for row in json.loads(rows)]
+            page += 1
+        category = self.category(cat)
+        if category is not None and page <= category[2]:
+            logging.warning(f"카테고리 id {cat}의 {page}페이지 결과가 없어 {page - 1}페이지까지만 사용합니다.")
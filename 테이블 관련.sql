@@ -2,6 +2,8 @@
 DROP TABLE "REVIEW" CASCADE CONSTRAINTS;
 DROP TABLE "USER_EQUIPS" CASCADE CONSTRAINTS;
 DROP TABLE "EQUIP_ENV" CASCADE CONSTRAINTS;
+DROP TABLE "EQUIPMENTS_STAGE" CASCADE CONSTRAINTS;
+DROP TABLE "EQUIP_PRICE_HIST" CASCADE CONSTRAINTS;
 DROP TABLE "EQUIPMENTS" CASCADE CONSTRAINTS;
 DROP TABLE "EQUIPMENTS_CATE" CASCADE CONSTRAINTS;
 DROP TABLE "USERS" CASCADE CONSTRAINTS;
@@ -40,6 +42,29 @@ CREATE TABLE "EQUIPMENTS" (
 );
 ALTER TABLE EQUIPMENTS ADD CONSTRAINT UQ_EQUIP_NM UNIQUE (EQUIP_NM);
 
+-- EQUIPMENTS_STAGE 임시 테이블 생성 (크롤러가 한 번에 적재한 뒤 EQUIPMENTS로 MERGE)
+CREATE GLOBAL TEMPORARY TABLE "EQUIPMENTS_STAGE" (
+    "EQUIP_CATE_NO" NUMBER NOT NULL,
+    "EQUIP_NM" VARCHAR2(150),
+    "EQUIP_PRICE" NUMBER,
+    "EQUIP_LINK" VARCHAR2(200)
+) ON COMMIT DELETE ROWS;
+
+-- EQUIP_PRICE_HIST 테이블 생성 (크롤링할 때마다 본 가격을 쌓기만 하는 이력 테이블)
+-- CRAWLED_AT 기준 월별 인터벌 파티션: 기간 조건이 있는 조회는 해당 파티션만 읽음
+CREATE TABLE "EQUIP_PRICE_HIST" (
+    "EQUIP_CATE_NO" NUMBER NOT NULL,
+    "EQUIP_NM" VARCHAR2(150) NOT NULL,
+    "EQUIP_PRICE" NUMBER,
+    "CRAWLED_AT" DATE NOT NULL
+)
+PARTITION BY RANGE ("CRAWLED_AT") INTERVAL (NUMTOYMINTERVAL(1, 'MONTH'))
+(PARTITION "P_INIT" VALUES LESS THAN (DATE '2024-01-01'));
+-- 제품 하나의 마지막 가격 조회용 (파티션과 무관한 전역 인덱스)
+CREATE INDEX "IX_PRICE_HIST_NM" ON "EQUIP_PRICE_HIST" ("EQUIP_NM", "CRAWLED_AT");
+-- 카테고리별 최근 가격 조회용 (파티션별 로컬 인덱스)
+CREATE INDEX "IX_PRICE_HIST_CATE" ON "EQUIP_PRICE_HIST" ("EQUIP_CATE_NO", "CRAWLED_AT") LOCAL;
+
 -- EQUIP_ENV 테이블 생성
 CREATE TABLE "EQUIP_ENV" (
     "EQUIP_ENV_NO" NUMBER GENERATED ALWAYS AS IDENTITY,
@@ -79,6 +104,8 @@ CREATE TABLE "REVIEW" (
 GRANT SELECT, INSERT, UPDATE, DELETE ON USERS TO DEVENVSHARE;
 GRANT SELECT, INSERT, UPDATE, DELETE ON EQUIPMENTS_CATE TO DEVENVSHARE;
 GRANT SELECT, INSERT, UPDATE, DELETE ON EQUIPMENTS TO DEVENVSHARE;
+GRANT SELECT, INSERT, UPDATE, DELETE ON EQUIPMENTS_STAGE TO DEVENVSHARE;
+GRANT SELECT, INSERT ON EQUIP_PRICE_HIST TO DEVENVSHARE;
 GRANT SELECT, INSERT, UPDATE, DELETE ON EQUIP_ENV TO DEVENVSHARE;
 GRANT SELECT, INSERT, UPDATE, DELETE ON USER_EQUIPS TO DEVENVSHARE;
 GRANT SELECT, INSERT, UPDATE, DELETE ON REVIEW TO DEVENVSHARE;